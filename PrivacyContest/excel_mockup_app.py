@@ -1,48 +1,52 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-from presidio_analyzer import AnalyzerEngine, PatternRecognizer, RecognizerRegistry, Pattern
-from presidio_analyzer.nlp_engine import NlpEngineProvider
-from presidio_anonymizer import AnonymizerEngine
+from presidio_anonymizer.entities import OperatorConfig
+
+# O núcleo compartilhado fica na raiz do repositório
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from privacy_partner.anonymize import SpanAnonymizer
+from privacy_partner.cache import content_hash
+from privacy_partner.engines import DEFAULT_CONFIG, build_analyzer
+from privacy_partner.incremental import IncrementalScanner
+from privacy_partner.ingest import UPLOAD_TYPES, read_table
+from privacy_partner.storage import artifact_store, session_state_usage
+from privacy_partner.vault import DEFAULT_VAULT_PATH, PseudonymVault
 
 # --- Presidio Configuration ---
 @st.cache_resource
-def get_analyzer_and_anonymizer():
-    registry = RecognizerRegistry(supported_languages=["pt"])
-    registry.load_predefined_recognizers(languages=["pt"])
-
-    cpf_recognizer = PatternRecognizer(
-        supported_entity="BR_CPF",
-        name="CPF Recognizer",
-        patterns=[Pattern(name="cpf", regex=r"\b(\d{3}\.?\d{3}\.?\d{3}-?\d{2}|\d{11})\b", score=0.9)],
-        supported_language="pt"
-    )
-    registry.add_recognizer(cpf_recognizer)
-    
-    provider_config = {"nlp_engine_name": "spacy", "models": [{"lang_code": "pt", "model_name": "pt_core_news_lg"}]}
-    provider = NlpEngineProvider(nlp_configuration=provider_config)
-    nlp_engine = provider.create_engine()
-    
-    analyzer = AnalyzerEngine(
-        registry=registry,
-        nlp_engine=nlp_engine,
-        supported_languages=["pt"]
-    )
-    anonymizer = AnonymizerEngine()
-    
-    return analyzer, anonymizer
-
-analyzer, anonymizer = get_analyzer_and_anonymizer()
+def get_analyzer():
+    # Reconhecedores e motor de NLP vêm do núcleo compartilhado (o CPF inclusive); PERSON precisa do spaCy
+    return build_analyzer(os.environ.get("PRIVACY_PARTNER_ANALYZER_CONFIG", DEFAULT_CONFIG))
+
+@st.cache_resource
+def get_vault():
+    return PseudonymVault(os.environ.get("PRIVACY_PARTNER_VAULT", DEFAULT_VAULT_PATH))
+
+analyzer = get_analyzer()
+vault = get_vault()
+# Trocam só os spans encontrados, coluna a coluna, em vez de sobrescrever a célula inteira
+span_anonymizer = SpanAnonymizer()
+span_pseudonymizer = SpanAnonymizer({"DEFAULT": OperatorConfig("pseudonymize")}, vault=vault)
 
 # --- Application Interface ---
 st.set_page_config(layout="wide", page_title="Privacy Partner - Excel Mockup")
 
+if 'sheet_name' not in st.session_state:
+    st.session_state.sheet_name = "Sensitive_Test.csv"
+
 st.markdown(
-    """<div style='background-color:#1D6F42;padding:10px;border-radius:5px 5px 0 0;'><h1 style='color:white;text-align:left;font-size:18px;font-weight:normal;margin:0;'>
-       Excel - Sensitive_Test.csv</h1></div>""",
+    f"""<div style='background-color:#1D6F42;padding:10px;border-radius:5px 5px 0 0;'><h1 style='color:white;text-align:left;font-size:18px;font-weight:normal;margin:0;'>
+       Excel - {st.session_state.sheet_name}</h1></div>""",
     unsafe_allow_html=True
 )
 
 tabs = st.tabs(["File", "Home", "Insert", "▶️ Add-ins"])
+file_tab = tabs[0]
 excel_tab = tabs[3]
 
 data = {
@@ -52,14 +56,42 @@ data = {
 df = pd.DataFrame(data)
 
 # Initialize session state
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+# Cópias rasas: com Copy-on-Write os dados só são duplicados nas colunas que mudarem
 if 'df_data' not in st.session_state:
-    st.session_state.df_data = df.copy()
-if 'original_df' not in st.session_state:
-    st.session_state.original_df = df.copy()
+    st.session_state.df_data = df.copy(deep=False)
+# O original (para o Reset) fica no armazém compartilhado, só em memória: é a planilha ainda com PII,
+# então nunca vai para o disco. A sessão guarda só a chave
+if 'original_key' not in st.session_state:
+    st.session_state.original_key = artifact_store.put("sheet-demo", df, st.session_state.session_id, persist=False)
 if 'findings' not in st.session_state:
     st.session_state.findings = []
 if 'data_is_altered' not in st.session_state:
     st.session_state.data_is_altered = False
+if 'incremental_scanner' not in st.session_state:
+    st.session_state.incremental_scanner = IncrementalScanner(analyzer, ["PERSON", "BR_CPF"])
+
+with file_tab:
+    opened_file = st.file_uploader("Open a workbook (.csv, .parquet, .xlsx)", type=UPLOAD_TYPES)
+    if opened_file is not None:
+        opened_hash = content_hash(opened_file)
+        # Só recarrega quando o arquivo muda; a cada rerun o uploader devolve o mesmo arquivo
+        if st.session_state.get("opened_hash") != opened_hash:
+            # Outra sessão que abriu o mesmo arquivo pode já ter deixado a tabela no armazém (em memória)
+            original_key = f"sheet-{opened_hash}"
+            opened_df = artifact_store.get(original_key, st.session_state.session_id)
+            if opened_df is None:
+                opened_df = read_table(opened_file, opened_file.name)
+                artifact_store.put(original_key, opened_df, st.session_state.session_id, persist=False)
+            st.session_state.df_data = opened_df.copy(deep=False)
+            st.session_state.original_key = original_key
+            st.session_state.findings = []
+            st.session_state.data_is_altered = False
+            st.session_state.incremental_scanner = IncrementalScanner(analyzer, ["PERSON", "BR_CPF"])
+            st.session_state.sheet_name = opened_file.name
+            st.session_state.opened_hash = opened_hash
+            st.rerun()
 
 
 # Main container for the "spreadsheet"
@@ -68,15 +100,11 @@ edited_df = st.data_editor(st.session_state.df_data, num_rows="dynamic", key="da
 with excel_tab:
     if st.button("🚀 Privacy Partner Scan", help="Click to scan the spreadsheet for sensitive data."):
         with st.spinner("Analyzing spreadsheet..."):
+            # Só as células adicionadas/modificadas desde a última varredura são analisadas de novo
             findings = []
-            for index, row in edited_df.iterrows():
-                for col_name, cell_value in row.items():
-                    if cell_value and isinstance(cell_value, str):
-                        results = analyzer.analyze(text=cell_value, language="pt", entities=["PERSON", "BR_CPF"])
-                        if results:
-                            findings.append({'row': index, 'col': col_name, 'text': cell_value, 'type': results[0].entity_type})
+            for index, col_name, cell_value, results in st.session_state.incremental_scanner.scan(edited_df):
+                findings.append({'row': index, 'col': col_name, 'text': cell_value, 'type': results[0].entity_type})
             st.session_state.findings = findings
-            st.session_state.last_edited_df = edited_df.copy()
             st.rerun()
 
 # Sidebar acting as the Add-in's task pane
@@ -88,10 +116,14 @@ with st.sidebar:
     # O botão Reset só aparece se os dados tiverem sido alterados
     if st.session_state.data_is_altered:
         if st.button("Reset to Original Data"):
-            st.session_state.df_data = st.session_state.original_df.copy()
-            st.session_state.findings = []
-            st.session_state.data_is_altered = False
-            st.rerun()
+            original_df = artifact_store.get(st.session_state.original_key, st.session_state.session_id)
+            if original_df is None:
+                st.warning("The original data has expired. Please open the workbook again.")
+            else:
+                st.session_state.df_data = original_df.copy(deep=False)
+                st.session_state.findings = []
+                st.session_state.data_is_altered = False
+                st.rerun()
 
     if st.session_state.findings:
         st.warning(f"**Alert!** {len(st.session_state.findings)} sensitive data point(s) found.")
@@ -105,26 +137,44 @@ with st.sidebar:
         st.markdown("---")
         st.markdown("**Recommended Actions:**")
 
+        # Achados do estado atual da planilha: só células editadas depois da varredura são reanalisadas
+        cells = st.session_state.incremental_scanner.scan(edited_df)
+
         col1, col2 = st.columns(2)
         with col1:
             if st.button("Anonymize"):
-                anonymized_df = st.session_state.last_edited_df.copy()
-                for find in st.session_state.findings:
-                    anonymized_df.at[find['row'], find['col']] = f"<{find['type']}>"
-                st.session_state.df_data = anonymized_df
+                st.session_state.df_data = span_anonymizer.anonymize_frame(edited_df, cells)
                 st.session_state.findings = []
                 st.session_state.data_is_altered = True
                 st.rerun()
 
         with col2:
             if st.button("Pseudonymize"):
-                pseudo_df = st.session_state.last_edited_df.copy()
-                for find in st.session_state.findings:
-                    pseudo_text = f"{find['type']}_{abs(hash(find['text'])) % 10000}"
-                    pseudo_df.at[find['row'], find['col']] = pseudo_text
-                st.session_state.df_data = pseudo_df
+                # Um lote por tipo de entidade no cofre; só os spans encontrados viram tokens
+                st.session_state.df_data = span_pseudonymizer.anonymize_frame(edited_df, cells)
                 st.session_state.findings = []
                 st.session_state.data_is_altered = True
                 st.rerun()
+
+        st.markdown("**Export anonymized file:**")
+        # O arquivo é gerado em blocos só no clique, numa thread separada do script
+        export_name = os.path.splitext(st.session_state.sheet_name)[0]
+        col3, col4 = st.columns(2)
+        with col3:
+            st.download_button("CSV", data=lambda: span_anonymizer.export(edited_df, cells, "csv"), file_name=f"{export_name}_anonymized.csv", mime="text/csv")
+        with col4:
+            st.download_button("Parquet", data=lambda: span_anonymizer.export(edited_df, cells, "parquet"), file_name=f"{export_name}_anonymized.parquet", mime="application/octet-stream")
     else:
         st.success("No sensitive data detected.")
+
+    # Uso de memória desta sessão e do armazém compartilhado
+    with st.expander("💾 Memory usage"):
+        store_usage = artifact_store.usage()
+        st.caption(
+            f"Shared store: {store_usage['memory_bytes'] / 2**20:.1f} MB in memory ({store_usage['memory_entries']} entries) · "
+            f"{store_usage['disk_bytes'] / 2**20:.1f} MB on disk ({store_usage['disk_entries']} files) · {store_usage['sessions']} active sessions"
+        )
+        st.dataframe(pd.DataFrame(session_state_usage(st.session_state)), hide_index=True, use_container_width=True)
+        session_artifacts = artifact_store.session_usage(st.session_state.session_id)
+        if session_artifacts:
+            st.dataframe(pd.DataFrame(session_artifacts), hide_index=True, use_container_width=True)
@@ -0,0 +1,156 @@
+"""Benchmark reprodutível dos scanners: arquivos do DLM (cargas "limpas") + tabelas sintéticas com PII.
+
+Cada combinação (carga, modo) roda em um processo novo, para que tempo de partida e pico de RSS
+sejam medidos isoladamente. O resultado vai para um JSON que pode ser comparado entre execuções.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --modes batch pattern-only --workloads synthetic-long --density 0.05
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import WORKLOAD_SHAPES, generate_prompts, generate_table
+from privacy_partner.engines import PATTERN_ENTITIES, PII_ENTITIES
+
+ENTIDADES_PII = PII_ENTITIES
+ENTIDADES_PADRAO = PATTERN_ENTITIES
+
+MODES = ["per-cell", "batch", "profiled", "pattern-only"]
+
+
+def available_workloads():
+    workloads = [f"dlm:{os.path.basename(path)}" for path in sorted(glob.glob("DLM/*.csv"))]
+    return workloads + [f"synthetic-{shape}" for shape in WORKLOAD_SHAPES]
+
+
+def load_workload(name, density, seed):
+    if name.startswith("dlm:"):
+        return pd.read_csv(os.path.join("DLM", name[4:]), encoding="latin-1")
+    return generate_table(density=density, seed=seed, **WORKLOAD_SHAPES[name[len("synthetic-"):]])
+
+
+# --- Processo Filho ---
+def run_child(mode, workload, args):
+    from privacy_partner.engines import build_analyzer, warm_up
+    from privacy_partner.fastpath import analyze_text
+    from privacy_partner.profiler import profile_dataframe
+    from privacy_partner.scanner import scan_dataframe, scan_dataframe_per_cell
+
+    entities = ENTIDADES_PADRAO if mode == "pattern-only" else ENTIDADES_PII
+    df = load_workload(workload, args.density, args.seed)
+    prompts = generate_prompts(args.prompts, args.prompt_density, args.seed)
+
+    start = time.perf_counter()
+    # No modo só-padrões o modelo é lazy: a partida não deveria pagar o carregamento do spaCy
+    analyzer = build_analyzer(args.config, model_name=args.model_name, lazy=mode == "pattern-only")
+    if mode != "pattern-only":
+        warm_up(analyzer)
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if mode == "per-cell":
+        findings = scan_dataframe_per_cell(analyzer, df, entities)
+    elif mode == "profiled":
+        findings = scan_dataframe(analyzer, df, entities, cache=None, profile=profile_dataframe(df))
+    else:
+        findings = scan_dataframe(analyzer, df, entities, cache=None)
+    scan_seconds = time.perf_counter() - start
+
+    latencies = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        analyze_text(analyzer, prompt, entities)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    cells = df.shape[0] * df.shape[1]
+    return {
+        "mode": mode,
+        "workload": workload,
+        "rows": df.shape[0],
+        "columns": df.shape[1],
+        "cells": cells,
+        "findings": len(findings),
+        "startup_s": round(startup, 4),
+        "scan_s": round(scan_seconds, 4),
+        "cells_per_s": round(cells / scan_seconds, 1) if scan_seconds else None,
+        "prompt_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "prompt_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        "prompt_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+        # ru_maxrss vem em KB no Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def child_command(mode, workload, args):
+    command = [
+        sys.executable, "-m", "benchmarks.run_benchmarks", "--child", mode, workload,
+        "--density", str(args.density), "--seed", str(args.seed), "--config", args.config,
+        "--prompts", str(args.prompts), "--prompt-density", str(args.prompt_density),
+    ]
+    if args.model_name:
+        command += ["--model-name", args.model_name]
+    return command
+
+
+# --- Processo Principal ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--workloads", nargs="+", default=None, help="Padrão: todos os CSV do DLM + sintéticos")
+    parser.add_argument("--density", type=float, default=0.01, help="Fração de células de texto com PII")
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--prompt-density", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--config", default="slim", help="Entrada de engines.ANALYZER_CONFIGS")
+    parser.add_argument("--model-name", default=None, help="Sobrescreve o modelo spaCy da configuração")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "WORKLOAD"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], args.child[1], args)))
+        return
+
+    results = []
+    for workload in args.workloads or available_workloads():
+        for mode in args.modes:
+            completed = subprocess.run(child_command(mode, workload, args), capture_output=True, text=True)
+            if completed.returncode != 0:
+                error = (completed.stderr.strip().splitlines() or ["?"])[-1]
+                results.append({"mode": mode, "workload": workload, "error": error})
+                print(f"{workload:<40} {mode:<13} falhou: {error}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(
+                f"{workload:<40} {mode:<13} {result['cells_per_s']:>12} células/s  "
+                f"p50/p95/p99 {result['prompt_ms_p50']}/{result['prompt_ms_p95']}/{result['prompt_ms_p99']} ms  "
+                f"partida {result['startup_s']}s  RSS {result['peak_rss_mb']} MB"
+            )
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ("child", "output")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
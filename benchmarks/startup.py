@@ -0,0 +1,63 @@
+"""Mede o tempo de partida e a memória residente de cada configuração do analisador.
+
+Cada configuração roda em um processo novo, para que o modelo de uma não contamine a medida da outra.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --configs slim small --lazy
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from privacy_partner.engines import ANALYZER_CONFIGS
+
+
+def measure(config, lazy):
+    """Executado no processo filho: constrói, aquece e devolve as medidas em JSON."""
+    start = time.perf_counter()
+    from privacy_partner.engines import build_analyzer, warm_up
+    imported = time.perf_counter()
+    analyzer = build_analyzer(config, lazy=lazy)
+    built = time.perf_counter()
+    warm_up(analyzer)
+    warmed = time.perf_counter()
+    return {
+        "config": config,
+        "lazy": lazy,
+        "import_s": round(imported - start, 3),
+        "build_s": round(built - imported, 3),
+        "first_request_s": round(warmed - built, 3),
+        "model_load_s": round(analyzer.nlp_engine.load_seconds or 0.0, 3),
+        # ru_maxrss vem em KB no Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", nargs="+", default=list(ANALYZER_CONFIGS))
+    parser.add_argument("--lazy", action="store_true", help="Constrói o analisador em modo lazy")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.lazy)))
+        return
+
+    print(f"{'config':<8} {'build (s)':>10} {'1st req (s)':>12} {'model (s)':>10} {'peak RSS (MB)':>14}")
+    for config in args.configs:
+        command = [sys.executable, "-m", "benchmarks.startup", "--child", config] + (["--lazy"] if args.lazy else [])
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"{config:<8} falhou: {(completed.stderr.strip().splitlines() or ['?'])[-1]}")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{config:<8} {result['build_s']:>10} {result['first_request_s']:>12} {result['model_load_s']:>10} {result['peak_rss_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Gerador determinístico (com semente) de tabelas e prompts com PII brasileira sintética."""
+import random
+
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = ["Ana", "Maria", "João", "Carlos", "Fernanda", "Lucas", "Juliana", "Pedro", "Beatriz", "Rafael", "Camila", "Gabriel"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Pereira", "Costa", "Rodrigues", "Almeida", "Nascimento", "Lima"]
+STREETS = ["Rua das Flores", "Avenida Paulista", "Rua Augusta", "Travessa do Comércio", "Estrada Velha", "Av. Brasil"]
+DOMAINS = ["exemplo.com.br", "empresa.com", "mail.com.br"]
+FILLER = [
+    "Cliente solicitou retorno na próxima semana",
+    "Campanha de verão aprovada pelo comitê",
+    "Pedido entregue sem ocorrências",
+    "Revisar metas do trimestre",
+    "Produto com boa aceitação no Sudeste",
+    "Aguardando aprovação do orçamento",
+]
+
+
+# --- Valores de PII ---
+def fake_cpf(rng):
+    digits = [rng.randrange(10) for _ in range(11)]
+    return "{}{}{}.{}{}{}.{}{}{}-{}{}".format(*digits)
+
+
+def fake_phone(rng):
+    return f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+
+
+def fake_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def fake_address(rng):
+    return f"{rng.choice(STREETS)}, {rng.randint(1, 2000)}, São Paulo"
+
+
+def fake_email(rng):
+    return f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}{rng.randint(1, 999)}@{rng.choice(DOMAINS)}"
+
+
+PII_GENERATORS = {
+    "BR_CPF": fake_cpf,
+    "PHONE_NUMBER": fake_phone,
+    "PERSON": fake_name,
+    "STREET_ADDRESS": fake_address,
+    "EMAIL_ADDRESS": fake_email,
+}
+
+
+def pii_sentence(rng):
+    entity = rng.choice(list(PII_GENERATORS))
+    return f"{rng.choice(FILLER)}; contato: {PII_GENERATORS[entity](rng)}"
+
+
+# --- Tabelas ---
+def generate_table(rows=10_000, text_columns=3, numeric_columns=5, density=0.01, seed=42):
+    """Tabela com colunas de texto livre (com PII injetada em `density` das células), numéricas e de data.
+
+    Tabelas "longas" têm muitas linhas e poucas colunas; "largas" o contrário (ver WORKLOAD_SHAPES).
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(text_columns):
+        data[f"observacao_{i}"] = [pii_sentence(rng) if rng.random() < density else rng.choice(FILLER) for _ in range(rows)]
+    for i in range(numeric_columns):
+        data[f"valor_{i}"] = np_rng.normal(100, 25, rows).round(2)
+    data["data"] = pd.date_range("2020-01-01", periods=rows, freq="h").strftime("%Y-%m-%d")
+    return pd.DataFrame(data)
+
+
+WORKLOAD_SHAPES = {
+    "long": {"rows": 20_000, "text_columns": 2, "numeric_columns": 4},
+    "wide": {"rows": 1_000, "text_columns": 40, "numeric_columns": 40},
+}
+
+
+# --- Prompts ---
+def generate_prompts(count=200, density=0.3, seed=42):
+    """Prompts de chat curtos; uma fração `density` contém PII."""
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(count):
+        text = f"Resuma os dados de vendas. {rng.choice(FILLER)}."
+        if rng.random() < density:
+            text += f" Por favor envie para {pii_sentence(rng)}."
+        prompts.append(text)
+    return prompts
@@ -0,0 +1 @@
+"""Núcleo compartilhado do Privacy Partner (motores, reconhecedores e varredura)."""
@@ -0,0 +1,150 @@
+import io
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from presidio_anonymizer.entities import OperatorConfig
+
+DEFAULT_EXPORT_ROWS = 50_000
+SPOOL_BYTES = 32 * 1024 * 1024  # exportações maiores que isso vão para um arquivo temporário em disco
+
+# Operador padrão, como o "replace" do AnonymizerEngine: o span vira <TIPO>
+DEFAULT_OPERATORS = {"DEFAULT": OperatorConfig("replace")}
+
+
+# --- Operadores de Span ---
+def _select_spans(results):
+    """Spans sem sobreposição, preferindo os de maior score (como o AnonymizerEngine faz com conflitos)."""
+    kept = []
+    for result in sorted(results, key=lambda r: (-r.score, r.start, -r.end)):
+        if all(result.end <= other.start or result.start >= other.end for other in kept):
+            kept.append(result)
+    return sorted(kept, key=lambda r: r.start)
+
+
+def _apply_operator(config, entity_type, value, tokens):
+    params = config.params or {}
+    if config.operator_name == "replace":
+        return params.get("new_value") or f"<{entity_type}>"
+    if config.operator_name == "redact":
+        return ""
+    if config.operator_name == "mask":
+        chars = min(params.get("chars_to_mask", len(value)), len(value))
+        mask = params.get("masking_char", "*") * chars
+        return value[:len(value) - chars] + mask if params.get("from_end") else mask + value[chars:]
+    if config.operator_name == "pseudonymize":
+        return tokens[entity_type, value]
+    raise ValueError(f"Operador não suportado: {config.operator_name}")
+
+
+class SpanAnonymizer:
+    """Anonimiza células de planilha trocando só os spans encontrados, com operadores por entidade.
+
+    operators segue o formato do AnonymizerEngine ({"TIPO" ou "DEFAULT": OperatorConfig}) e aceita
+    "replace", "redact", "mask" e "pseudonymize" (este último grava os valores no cofre). Cada texto
+    distinto é reescrito uma única vez, e os tokens do cofre saem num lote por entidade.
+    """
+
+    def __init__(self, operators=None, vault=None):
+        self.operators = {**DEFAULT_OPERATORS, **(operators or {})}
+        self.vault = vault
+        if vault is None and any(config.operator_name == "pseudonymize" for config in self.operators.values()):
+            raise ValueError("O operador pseudonymize precisa de um cofre (vault)")
+
+    def _operator(self, entity_type):
+        return self.operators.get(entity_type, self.operators["DEFAULT"])
+
+    def rewrite(self, cells):
+        """Recebe (índice, coluna, texto, resultados) e retorna {texto original: texto anonimizado}."""
+        spans_by_text = {}
+        for _, _, text, results in cells:
+            if text not in spans_by_text:
+                spans_by_text[text] = _select_spans(results)
+
+        tokens = {}
+        if self.vault is not None:  # só há operador pseudonymize com cofre (ver __init__)
+            values_by_entity = {}
+            for text, spans in spans_by_text.items():
+                for span in spans:
+                    if self._operator(span.entity_type).operator_name == "pseudonymize":
+                        values_by_entity.setdefault(span.entity_type, []).append(text[span.start:span.end])
+            for entity_type, values in values_by_entity.items():
+                for value, token in zip(values, self.vault.tokenize_many(values, entity_type)):
+                    tokens[entity_type, value] = token
+
+        rewritten = {}
+        for text, spans in spans_by_text.items():
+            parts = []
+            position = 0
+            for span in spans:
+                value = text[span.start:span.end]
+                parts.append(text[position:span.start])
+                parts.append(_apply_operator(self._operator(span.entity_type), span.entity_type, value, tokens))
+                position = span.end
+            parts.append(text[position:])
+            rewritten[text] = "".join(parts)
+        return rewritten
+
+    def anonymize_frame(self, df, cells):
+        """Retorna um novo DataFrame com as células anonimizadas, escrevendo uma vez por coluna.
+
+        As colunas sem achados são compartilhadas com df (Copy-on-Write), então a memória extra é
+        só a das colunas alteradas.
+        """
+        rewritten = self.rewrite(cells)
+        rows_by_column = {}
+        for index, col_name, text, _ in cells:
+            rows_by_column.setdefault(col_name, ([], []))
+            rows_by_column[col_name][0].append(index)
+            rows_by_column[col_name][1].append(rewritten[text])
+
+        result = df.copy(deep=False)
+        for col_name, (rows, values) in rows_by_column.items():
+            column = df[col_name]
+            if not pd.api.types.is_object_dtype(column) and not pd.api.types.is_string_dtype(column):
+                # Números com achados (ex.: um CPF em int64) passam a texto para receber o valor anonimizado
+                column = column.astype("string")
+            column = column.copy()
+            column.loc[rows] = values
+            result[col_name] = column
+        return result
+
+    # --- Exportação em Blocos ---
+    def iter_anonymized(self, df, cells, chunk_rows=DEFAULT_EXPORT_ROWS):
+        """Gera blocos de linhas já anonimizados; só um bloco anonimizado existe por vez."""
+        cells_by_chunk = {}
+        positions = df.index.get_indexer([cell[0] for cell in cells])
+        for position, cell in zip(positions, cells):
+            cells_by_chunk.setdefault(position // chunk_rows, []).append(cell)
+        # Um DataFrame vazio ainda gera um bloco, para o arquivo sair com o cabeçalho/schema
+        for number, start in enumerate(range(0, max(len(df), 1), chunk_rows)):
+            chunk = df.iloc[start:start + chunk_rows]
+            chunk_cells = cells_by_chunk.get(number)
+            yield self.anonymize_frame(chunk, chunk_cells) if chunk_cells else chunk
+
+    def export(self, df, cells, file_format="csv", chunk_rows=DEFAULT_EXPORT_ROWS):
+        """Escreve o arquivo anonimizado (CSV ou Parquet) bloco a bloco e o retorna como arquivo binário
+        posicionado no início, pronto para o st.download_button.
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        if file_format == "parquet":
+            # Um schema só, do DataFrame inteiro: inferido bloco a bloco, uma coluna toda nula no primeiro
+            # bloco viraria tipo null e os seguintes não caberiam nela. Colunas com achados saem como texto.
+            rewritten_columns = {cell[1] for cell in cells}
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            for column in rewritten_columns:
+                position = schema.get_field_index(column)
+                schema = schema.set(position, pa.field(column, pa.string()))
+            with pq.ParquetWriter(output, schema) as writer:
+                for chunk in self.iter_anonymized(df, cells, chunk_rows):
+                    chunk = chunk.astype({column: "string" for column in rewritten_columns})
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        else:
+            text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+            for number, chunk in enumerate(self.iter_anonymized(df, cells, chunk_rows)):
+                chunk.to_csv(text_output, header=number == 0, index=False)
+            text_output.flush()
+            text_output.detach()
+        output.seek(0)
+        return output
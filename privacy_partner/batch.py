@@ -0,0 +1,238 @@
+"""Varredura em lote, sem Streamlit: percorre uma árvore de arquivos tabulares e gera um relatório por arquivo.
+
+Os arquivos são varridos em paralelo, um por processo trabalhador (cada um com seu AnalyzerEngine).
+Um manifesto (JSON Lines, uma linha por arquivo concluído) guarda o hash do conteúdo e a versão da
+configuração: numa nova execução os arquivos inalterados são pulados, e uma execução interrompida
+continua de onde parou.
+
+Uso (a partir da raiz do repositório):
+    python -m privacy_partner.batch DLM --output scan_reports --workers 4
+    python -m privacy_partner.batch /mnt/exports --output /srv/reports --format json --terms termos.txt
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from privacy_partner.cache import content_hash
+from privacy_partner.engines import ANALYZER_CONFIGS, DEFAULT_CONFIG, analyzer_fingerprint, build_analyzer, default_entities
+from privacy_partner.findings import REPORT_FORMATS, TXT
+from privacy_partner.parallel import init_worker, worker_analyzer
+from privacy_partner.streaming import GATE, REPORT, scan_file_stream
+
+# Extensões varridas (as mesmas que o ingest sabe ler)
+SCAN_EXTENSIONS = (".csv", ".parquet", ".pq", ".xlsx", ".xlsm")
+MANIFEST_NAME = "manifest.jsonl"
+REPORTS_DIR = "reports"
+
+# Sobe quando o conteúdo dos relatórios mudar: força a regeração mesmo com arquivos inalterados
+REPORT_VERSION = 1
+
+OK = "ok"
+ERROR = "error"
+
+
+# --- Arquivos ---
+def find_files(root, exclude=()):
+    """Caminhos (relativos a root, em ordem) dos arquivos tabulares da árvore; diretórios em exclude são ignorados."""
+    exclude = {os.path.abspath(path) for path in exclude}
+    found = []
+    for directory, subdirectories, names in os.walk(root):
+        subdirectories[:] = sorted(
+            name for name in subdirectories
+            if not name.startswith(".") and os.path.abspath(os.path.join(directory, name)) not in exclude
+        )
+        for name in sorted(names):
+            if name.lower().endswith(SCAN_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(directory, name), root))
+    return found
+
+
+def config_version(analyzer, entities, mode, exhaustive, report_format):
+    """Hash de tudo o que muda o relatório: reconhecedores (e lista de termos), entidades, modo e formato."""
+    parts = [analyzer_fingerprint(analyzer), ",".join(sorted(entities)), mode, str(exhaustive), report_format, str(REPORT_VERSION)]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+# --- Manifesto ---
+class ScanManifest:
+    """Registro das varreduras concluídas, em JSON Lines só de acréscimo.
+
+    Cada arquivo concluído (ou com erro) vira uma linha gravada e sincronizada na hora, então uma
+    interrupção perde no máximo o arquivo em andamento. Ao abrir, vale a última linha de cada caminho.
+    Tamanho e mtime também são guardados: se não mudaram, o hash anterior é reaproveitado sem reler o arquivo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        # Uma interrupção no meio da escrita deixa a última linha sem \n: a próxima começa numa linha nova
+        self._needs_newline = False
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    self._needs_newline = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # linha truncada por uma interrupção no meio da escrita
+                    self.entries[entry["path"]] = entry
+
+    def file_hash(self, root, relative_path):
+        path = os.path.join(root, relative_path)
+        stat = os.stat(path)
+        entry = self.entries.get(relative_path)
+        if entry is not None and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry["hash"], stat
+        with open(path, "rb") as f:
+            return content_hash(f), stat
+
+    def is_current(self, relative_path, file_hash, config, output_dir):
+        entry = self.entries.get(relative_path)
+        return (
+            entry is not None and entry["status"] == OK and entry["hash"] == file_hash and entry["config"] == config
+            and os.path.exists(os.path.join(output_dir, entry["report"]))
+        )
+
+    def record(self, entry):
+        self.entries[entry["path"]] = entry
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(("\n" if self._needs_newline else "") + json.dumps(entry, ensure_ascii=False) + "\n")
+            self._needs_newline = False
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# --- Varredura de um Arquivo ---
+def scan_file(analyzer, source_path, report_path, entities, mode=REPORT, exhaustive=False, report_format=TXT):
+    """Varre um arquivo e grava o relatório (escrita atômica); retorna os totais para o manifesto."""
+    start = time.perf_counter()
+    scan = scan_file_stream(analyzer, source_path, entities, mode=mode, exhaustive=exhaustive)
+    findings = scan["findings"]
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    report = findings.export(report_format, title=f"Privacy Risk Report - File: {source_path}", profile=scan["profile"])
+    temporary = f"{report_path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        shutil.copyfileobj(report, f)
+    os.replace(temporary, report_path)
+    return {
+        "rows": scan["rows"],
+        "complete": scan["complete"],
+        "findings": len(findings),
+        "by_type": findings.count_by("type"),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _scan_in_worker(source_path, report_path, entities, mode, exhaustive, report_format):
+    return scan_file(worker_analyzer(), source_path, report_path, entities, mode, exhaustive, report_format)
+
+
+# --- Execução ---
+def scan_tree(root, output_dir, entities=None, mode=REPORT, exhaustive=False, report_format=TXT, workers=None,
+              config=DEFAULT_CONFIG, terms_path=None, force=False, log=print):
+    """Varre os arquivos de root que mudaram desde a última execução e retorna as entradas gravadas no manifesto.
+
+    workers <= 1 varre no próprio processo; senão cada trabalhador monta seu analisador uma vez
+    (como em parallel.ParallelScanner) e recebe um arquivo por vez.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    factory_kwargs = {"config": config, "lazy": True, "terms_path": terms_path}
+    # Lazy: o fingerprint não precisa do spaCy, então o processo principal não carrega o modelo
+    analyzer = build_analyzer(**factory_kwargs)
+    entities = entities or default_entities(terms_path=terms_path)
+    version = config_version(analyzer, entities, mode, exhaustive, report_format)
+    manifest = ScanManifest(os.path.join(output_dir, MANIFEST_NAME))
+
+    files = find_files(root, exclude=[output_dir])
+    pending = []
+    for relative_path in files:
+        file_hash, stat = manifest.file_hash(root, relative_path)
+        if not force and manifest.is_current(relative_path, file_hash, version, output_dir):
+            continue
+        report = os.path.join(REPORTS_DIR, f"{relative_path}.{report_format}")
+        pending.append((relative_path, file_hash, stat, report))
+    log(f"{len(pending)} arquivo(s) a varrer, {len(files) - len(pending)} inalterado(s)")
+
+    def entry_for(relative_path, file_hash, stat, report, result=None, error=None):
+        entry = {
+            "path": relative_path, "hash": file_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "config": version, "report": report, "status": ERROR if error else OK, "scanned_at": time.time(),
+        }
+        entry.update(result or {"error": error})
+        manifest.record(entry)
+        status = f"ERRO: {error}" if error else f"{entry['findings']} achado(s) em {entry['rows']} linha(s), {entry['seconds']}s"
+        log(f"{relative_path}: {status}")
+        return entry
+
+    recorded = []
+    if workers is None or workers <= 1:
+        for relative_path, file_hash, stat, report in pending:
+            try:
+                result = scan_file(analyzer, os.path.join(root, relative_path), os.path.join(output_dir, report), entities, mode, exhaustive, report_format)
+                recorded.append(entry_for(relative_path, file_hash, stat, report, result))
+            except Exception as error:
+                recorded.append(entry_for(relative_path, file_hash, stat, report, error=repr(error)))
+        return recorded
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(build_analyzer, factory_kwargs)) as executor:
+        # No máximo 2 arquivos por trabalhador em voo: a fila não cresce com o tamanho da árvore
+        queue = iter(pending)
+        in_flight = {}
+        try:
+            while True:
+                for item in queue:
+                    relative_path, _, _, report = item
+                    future = executor.submit(
+                        _scan_in_worker, os.path.join(root, relative_path), os.path.join(output_dir, report),
+                        entities, mode, exhaustive, report_format,
+                    )
+                    in_flight[future] = item
+                    if len(in_flight) >= 2 * workers:
+                        break
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    try:
+                        recorded.append(entry_for(*item, result=future.result()))
+                    except Exception as error:
+                        recorded.append(entry_for(*item, error=repr(error)))
+        except KeyboardInterrupt:
+            # O que já terminou está no manifesto; a próxima execução retoma o resto
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    return recorded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("root", help="diretório com os arquivos (.csv, .parquet, .xlsx) a varrer")
+    parser.add_argument("--output", default="scan_reports", help="diretório dos relatórios e do manifesto")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos em paralelo (1 = sem pool)")
+    parser.add_argument("--entities", nargs="+", default=None, help="entidades a procurar (padrão: engines.default_entities)")
+    parser.add_argument("--mode", choices=[REPORT, GATE], default=REPORT, help="gate para no primeiro achado de cada arquivo")
+    parser.add_argument("--exhaustive", action="store_true", help="varre todas as colunas, ignorando o perfil")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default=TXT, help="formato dos relatórios")
+    parser.add_argument("--config", choices=sorted(ANALYZER_CONFIGS), default=DEFAULT_CONFIG)
+    parser.add_argument("--terms", default=os.environ.get("PRIVACY_PARTNER_TERMS"), help="lista de termos de negócio (um por linha)")
+    parser.add_argument("--force", action="store_true", help="varre de novo mesmo os arquivos inalterados")
+    args = parser.parse_args(argv)
+
+    recorded = scan_tree(
+        args.root, args.output, args.entities, args.mode, args.exhaustive, args.format, args.workers,
+        args.config, args.terms, args.force,
+    )
+    errors = sum(1 for entry in recorded if entry["status"] == ERROR)
+    with_findings = sum(1 for entry in recorded if entry.get("findings"))
+    print(f"{len(recorded)} arquivo(s) varrido(s): {with_findings} com achados, {errors} com erro")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
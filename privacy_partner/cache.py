@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+# --- Cache LRU ---
+class LRUCache:
+    """Cache LRU limitado por número de entradas, seguro entre threads, com contadores de acerto/erro."""
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Cache global do processo: resultados de analyze() por (fingerprint do analisador, idioma, entidades, texto)
+analysis_cache = LRUCache()
+
+
+# --- Cache com TTL e Limite de Tamanho ---
+class TTLCache:
+    """Cache LRU com expiração (ttl em segundos) e limite de tamanho total estimado, com contadores."""
+
+    def __init__(self, ttl=3600, max_entries=256, max_bytes=256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._data = OrderedDict()  # chave -> (valor, tamanho, expira_em)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=1):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, size, time.monotonic() + self.ttl)
+            self.total_bytes += size
+            self._evict()
+
+    def _pop(self, key):
+        _, size, _ = self._data.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [key for key, (_, _, expires_at) in self._data.items() if expires_at < now]:
+            self._pop(key)
+            self.evictions += 1
+        while self._data and (len(self._data) > self.max_entries or self.total_bytes > self.max_bytes):
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[2] >= time.monotonic()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# --- Cache de Varreduras de Arquivos ---
+def content_hash(fileobj, block_size=1024 * 1024):
+    """SHA-256 do conteúdo de um arquivo aberto, lido em blocos; a posição original é restaurada."""
+    position = fileobj.tell()
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(block_size), b""):
+        digest.update(block)
+    fileobj.seek(position)
+    return digest.hexdigest()
+
+
+def scan_key(file_hash, entities, config_fingerprint, **options):
+    """Chave de uma varredura: conteúdo + entidades + configuração dos reconhecedores + opções (modo etc.)."""
+    return (file_hash, tuple(sorted(entities or ())), config_fingerprint, tuple(sorted(options.items())))
+
+
+def estimate_scan_size(scan):
+    """Tamanho aproximado (bytes) do resultado de streaming.scan_csv_stream, para o limite do cache."""
+    findings = scan["findings"]
+    if hasattr(findings, "nbytes"):  # findings.FindingsStore
+        return 1024 + findings.nbytes + 200 * len(scan["profile"])
+    return 1024 + sum(200 + len(find["text"]) for find in findings) + 200 * len(scan["profile"])
+
+
+# Cache global do processo: resultados de varredura por conteúdo do arquivo
+scan_cache = TTLCache()
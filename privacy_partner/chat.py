@@ -0,0 +1,126 @@
+import abc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from privacy_partner.context import DEFAULT_TOKEN_BUDGET, build_prompt
+from privacy_partner.windowed import analyze_long_text
+
+# Compartilhado por todas as sessões: só roda análise de prompt e montagem de contexto, ambas curtas
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="privacy-partner-chat")
+
+
+# --- Clientes de Modelo ---
+class ModelClient(abc.ABC):
+    """Interface dos backends de modelo: stream(prompt) produz o texto da resposta em pedaços."""
+
+    @abc.abstractmethod
+    def stream(self, prompt):
+        """Gera o texto da resposta ao prompt, em pedaços."""
+
+
+class GeminiClient(ModelClient):
+    def __init__(self, model):
+        self.model = model
+
+    def stream(self, prompt):
+        response = self.model.generate_content(prompt, stream=True)
+        for chunk in response:
+            # Pedaços sem texto (ex.: só metadados de segurança) são ignorados
+            text = chunk.text if chunk.parts else ""
+            if text:
+                yield text
+
+
+class FakeModelClient(ModelClient):
+    """Backend local para testes e demonstrações offline: responde em pedaços, com atraso opcional.
+
+    Guarda os prompts recebidos em `prompts`, o que permite verificar o que teria sido enviado ao modelo.
+    """
+
+    def __init__(self, reply=None, chunk_chars=16, delay=0.0):
+        self.reply = reply
+        self.chunk_chars = chunk_chars
+        self.delay = delay
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        reply = self.reply if self.reply is not None else f"(resposta simulada para um prompt de {len(prompt)} caracteres)"
+        for start in range(0, len(reply), self.chunk_chars):
+            if self.delay:
+                time.sleep(self.delay)
+            yield reply[start:start + self.chunk_chars]
+
+
+# --- Pipeline do Chat ---
+class ChatTurn:
+    """Uma pergunta do chat: a checagem de PII e a montagem do contexto começam juntas, em threads,
+    assim que o turno é criado; a geração só começa depois que a checagem libera o prompt.
+    """
+
+    def __init__(self, analyzer, client, prompt, entities, language="pt", file_context=None, token_budget=DEFAULT_TOKEN_BUDGET,
+                 scan_client=None):
+        self.prompt = prompt
+        self.client = client
+        self._cancelled = threading.Event()
+        self._stream = None
+        if scan_client is not None:
+            # Checagem no serviço de varredura (service.ScanService); se ele falhar, findings levanta ScanServiceError
+            self._findings = _executor.submit(scan_client.analyze, prompt, entities, language)
+        else:
+            self._findings = _executor.submit(analyze_long_text, analyzer, prompt, entities, language)
+        # O contexto é montado só localmente; nada sai da máquina antes da checagem terminar
+        self._full_prompt = _executor.submit(build_prompt, prompt, file_context, token_budget)
+
+    @property
+    def findings(self):
+        return self._findings.result()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Interrompe a geração em andamento; o próximo pedaço não é mais lido do modelo."""
+        self._cancelled.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except ValueError:
+                pass  # o gerador está executando em outra thread; ele para ao ver o cancelamento
+
+    def stream(self):
+        """Pedaços da resposta do modelo, à medida que chegam. Não produz nada se o prompt tiver PII."""
+        if self.findings or self.cancelled:
+            return
+        self._stream = self.client.stream(self._full_prompt.result())
+        try:
+            for chunk in self._stream:
+                if self.cancelled:
+                    break
+                yield chunk
+        finally:
+            self._stream.close()
+
+
+class ChatPipeline:
+    """Cria os turnos do chat de uma sessão e cancela o turno anterior quando chega uma nova pergunta.
+
+    Com um scan_client (service.ScanClient) os prompts são checados no serviço local, e não no analyzer.
+    """
+
+    def __init__(self, analyzer, client, entities, language="pt", scan_client=None):
+        self.analyzer = analyzer
+        self.client = client
+        self.entities = entities
+        self.language = language
+        self.scan_client = scan_client
+        self.active = None
+
+    def start(self, prompt, file_context=None, token_budget=DEFAULT_TOKEN_BUDGET):
+        if self.active is not None:
+            self.active.cancel()
+        self.active = ChatTurn(self.analyzer, self.client, prompt, self.entities, self.language, file_context, token_budget, self.scan_client)
+        return self.active
@@ -0,0 +1,143 @@
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_MAX_INDEX_ROWS = 200_000
+CHARS_PER_TOKEN = 4  # estimativa grosseira, suficiente para respeitar o orçamento
+
+WORD = re.compile(r"\w+")
+
+
+# --- Texto ---
+def normalize(text):
+    """Minúsculas e sem acentos, para que "preço" e "PRECO" casem."""
+    text = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return WORD.findall(normalize(text))
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+# --- Resumo das Colunas ---
+def _number(value):
+    # Inteiros por extenso (códigos, anos, semanas epidemiológicas); reais com 4 algarismos significativos
+    return str(value) if float(value).is_integer() and abs(value) < 1e15 else f"{value:.4g}"
+
+
+def summarize_column(series):
+    """Uma linha de resumo por coluna: tipo, preenchimento, cardinalidade e estatísticas básicas."""
+    non_null = series.dropna()
+    parts = [f"{len(non_null)} valores", f"{non_null.nunique()} distintos"]
+    if pd.api.types.is_bool_dtype(series):
+        parts.append(f"verdadeiros: {int(non_null.sum())}")
+    elif pd.api.types.is_numeric_dtype(series) and len(non_null):
+        parts.append(f"mín {_number(non_null.min())}, máx {_number(non_null.max())}, média {non_null.mean():.4g}")
+    elif len(non_null):
+        top = non_null.astype(str).value_counts().head(3)
+        parts.append("mais frequentes: " + ", ".join(f"{value[:40]} ({count})" for value, count in top.items()))
+    return f"- {series.name} ({series.dtype}): " + "; ".join(parts)
+
+
+# --- Contexto do Arquivo ---
+class FileContext:
+    """Contexto compacto de um arquivo para o LLM, calculado uma vez por arquivo.
+
+    Guarda um resumo por coluna e um índice léxico (BM25) das linhas; a cada pergunta, monta um
+    texto com o resumo, as colunas citadas e as linhas mais relevantes, dentro de um orçamento
+    de tokens. Tudo roda localmente, sem chamar o modelo.
+    """
+
+    def __init__(self, df, max_index_rows=DEFAULT_MAX_INDEX_ROWS):
+        self.df = df
+        self.summaries = [summarize_column(df[col_name]) for col_name in df.columns]
+        self.column_tokens = {col_name: set(tokenize(str(col_name).replace("_", " "))) for col_name in df.columns}
+        self.indexed_rows = min(len(df), max_index_rows)
+        self._build_index()
+
+    def _build_index(self):
+        self.postings = defaultdict(list)  # token -> [(posição da linha, frequência)]
+        self.row_lengths = []
+        columns = [self.df[col_name].iloc[:self.indexed_rows].astype(str).tolist() for col_name in self.df.columns]
+        for position, values in enumerate(zip(*columns)):
+            counts = Counter(token for value in values for token in tokenize(value))
+            for token, count in counts.items():
+                self.postings[token].append((position, count))
+            self.row_lengths.append(sum(counts.values()))
+        self.average_length = (sum(self.row_lengths) / len(self.row_lengths)) if self.row_lengths else 0.0
+
+    def search(self, question, limit=50, k1=1.5, b=0.75):
+        """Posições das linhas mais relevantes para a pergunta (BM25), da mais para a menos relevante."""
+        scores = defaultdict(float)
+        total = len(self.row_lengths)
+        for token in set(tokenize(question)):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                length_norm = k1 * (1 - b + b * self.row_lengths[position] / self.average_length)
+                scores[position] += idf * count * (k1 + 1) / (count + length_norm)
+        return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+    def relevant_columns(self, question, positions=()):
+        """Colunas citadas pelo nome na pergunta ou em que os termos da pergunta aparecem nas linhas encontradas."""
+        question_tokens = set(tokenize(question))
+        relevant = []
+        for col_name, tokens in self.column_tokens.items():
+            if tokens & question_tokens:
+                relevant.append(col_name)
+            elif len(positions) and any(
+                question_tokens.intersection(tokenize(value)) for value in self.df[col_name].iloc[list(positions)].astype(str)
+            ):
+                relevant.append(col_name)
+        return relevant
+
+    def build(self, question, token_budget=DEFAULT_TOKEN_BUDGET):
+        """Texto de contexto para a pergunta, limitado a token_budget tokens (estimados)."""
+        header = f"Arquivo com {len(self.df)} linhas e {len(self.df.columns)} colunas."
+        lines = [header, "Resumo das colunas:"]
+        used = estimate_tokens(header) + 5
+        for summary in self.summaries:
+            cost = estimate_tokens(summary)
+            if used + cost > token_budget:
+                lines.append("- ... (demais colunas omitidas)")
+                return "\n".join(lines)
+            lines.append(summary)
+            used += cost
+
+        positions = self.search(question)
+        columns = self.relevant_columns(question, positions) or list(self.df.columns)
+        if positions:
+            title = f"Linhas mais relevantes para a pergunta (colunas: {', '.join(map(str, columns))}):"
+        else:
+            title = f"Primeiras linhas (colunas: {', '.join(map(str, columns))}):"
+            positions = range(min(len(self.df), 50))
+        lines.append(title)
+        used += estimate_tokens(title)
+
+        rows = self.df[columns].iloc[list(positions)]
+        for position, values in zip(positions, rows.itertuples(index=False, name=None)):
+            row_text = f"linha {position + 1}: " + " | ".join(str(value) for value in values)
+            cost = estimate_tokens(row_text)
+            if used + cost > token_budget:
+                break
+            lines.append(row_text)
+            used += cost
+        return "\n".join(lines)
+
+
+def build_prompt(question, file_context=None, token_budget=DEFAULT_TOKEN_BUDGET):
+    """Prompt final enviado ao modelo, no mesmo formato que os apps já usavam."""
+    if file_context is None:
+        return question
+    context = file_context.build(question, token_budget)
+    return f"Com base neste contexto:\n---\n{context}\n---\n\nResponda à seguinte pergunta: {question}"
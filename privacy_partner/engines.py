@@ -0,0 +1,194 @@
+import hashlib
+import threading
+import time
+
+import spacy
+from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
+from presidio_analyzer.nlp_engine import SpacyNlpEngine
+from presidio_analyzer.recognizer_registry import RecognizerRegistry
+
+from privacy_partner.terms import BUSINESS_TERM, BusinessTermRecognizer
+
+# --- Reconhecedores Customizados ---
+# PREFILTER: regex barata que qualquer texto com a entidade precisa conter (usada pelo caminho rápido)
+class CustomBrCpfRecognizer(PatternRecognizer):
+    PATTERNS = [Pattern(name="cpf", regex=r"\b(\d{3}\.?\d{3}\.?\d{3}-?\d{2}|\d{11})\b", score=0.9)]
+    PREFILTER = r"\d"
+    def __init__(self, **kwargs):
+        super().__init__(supported_entity="BR_CPF", name="Custom CPF Recognizer", patterns=self.PATTERNS, **kwargs)
+
+class CustomAddressRecognizer(PatternRecognizer):
+    PATTERNS = [Pattern(name="endereco", regex=r"\b(Rua|Av\.|Avenida|Travessa|Praça|Est|Estrada)\s[\w\s,.-]+", score=0.7)]
+    PREFILTER = r"\b(?:Rua|Av\.|Avenida|Travessa|Praça|Est|Estrada)\s"
+    def __init__(self, **kwargs):
+        super().__init__(supported_entity="STREET_ADDRESS", name="Custom Address Recognizer", patterns=self.PATTERNS, **kwargs)
+
+class CustomBrPhoneRecognizer(PatternRecognizer):
+    PATTERNS = [Pattern(name="telefone_formatado", regex=r"\b(\(\d{2}\)\s?\d{4,5}-?\d{4}|\d{2}\s\d{4,5}-?\d{4})\b", score=0.4)]
+    PREFILTER = r"\d"
+    def __init__(self, **kwargs):
+        super().__init__(supported_entity="PHONE_NUMBER", name="Custom Phone Recognizer", patterns=self.PATTERNS, **kwargs)
+
+# --- Motor de NLP com Partida Rápida ---
+class FastStartSpacyNlpEngine(SpacyNlpEngine):
+    """SpacyNlpEngine que carrega só os componentes necessários do pipeline e, com lazy=True,
+    só no primeiro pedido que realmente precise do spaCy (o caminho rápido de regex não precisa).
+    """
+
+    def __init__(self, models, exclude=(), lazy=False, ner_model_configuration=None):
+        super().__init__(models=models, ner_model_configuration=ner_model_configuration)
+        self.exclude = list(exclude)
+        self.lazy = lazy
+        self.load_seconds = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        start = time.perf_counter()
+        # Como no SpacyNlpEngine.load(): usa a GPU se o presidio detectar uma
+        self._enable_gpu()
+        nlp = {}
+        for model in self.models:
+            self._validate_model_params(model)
+            self._download_spacy_model_if_needed(model["model_name"])
+            nlp[model["lang_code"]] = spacy.load(model["model_name"], exclude=self.exclude)
+        self.nlp = nlp
+        self.load_seconds = time.perf_counter() - start
+
+    def is_loaded(self):
+        # Com lazy, o AnalyzerEngine não dispara o carregamento na construção
+        return self.lazy or self.nlp is not None
+
+    def ensure_loaded(self):
+        if self.nlp is None:
+            with self._load_lock:
+                if self.nlp is None:
+                    self.load()
+
+    def process_text(self, text, language):
+        self.ensure_loaded()
+        return super().process_text(text, language)
+
+    def process_batch(self, texts, language, **kwargs):
+        self.ensure_loaded()
+        return super().process_batch(texts, language, **kwargs)
+
+    def is_stopword(self, word, language):
+        self.ensure_loaded()
+        return super().is_stopword(word, language)
+
+    def is_punct(self, word, language):
+        self.ensure_loaded()
+        return super().is_punct(word, language)
+
+    def get_nlp(self, language):
+        self.ensure_loaded()
+        return super().get_nlp(language)
+
+
+# Entidades de alto risco usadas pelos apps, pela linha de comando e pelos benchmarks
+PATTERN_ENTITIES = ["BR_CPF", "PHONE_NUMBER", "EMAIL_ADDRESS", "STREET_ADDRESS"]
+PII_ENTITIES = PATTERN_ENTITIES + ["PERSON"]  # PERSON vem do NER do spaCy
+
+
+def default_entities(ner=True, terms_path=None):
+    """Lista de entidades a procurar: as de padrão, PERSON se ner=True e BUSINESS_TERM se houver lista de termos."""
+    entities = list(PII_ENTITIES if ner else PATTERN_ENTITIES)
+    if terms_path:
+        entities.append(BUSINESS_TERM)
+    return entities
+
+
+# Configurações prontas de build_analyzer(**ANALYZER_CONFIGS[nome])
+ANALYZER_CONFIGS = {
+    # Pipeline completo, como era antes
+    "full": {"model_name": "pt_core_news_lg", "exclude": []},
+    # Sem o parser de dependências, que nenhum reconhecedor usa
+    "slim": {"model_name": "pt_core_news_lg", "exclude": ["parser"]},
+    # Só tokenização + NER: sem lemas, as palavras de contexto deixam de reforçar o score
+    "ner": {"model_name": "pt_core_news_lg", "exclude": ["parser", "morphologizer", "lemmatizer", "attribute_ruler"]},
+    # Modelo pequeno para configurações quase só de padrões (requer pt_core_news_sm instalado)
+    "small": {"model_name": "pt_core_news_sm", "exclude": ["parser"]},
+}
+DEFAULT_CONFIG = "slim"
+
+
+# --- Motor de Análise ---
+def build_analyzer(config=DEFAULT_CONFIG, model_name=None, exclude=None, lazy=False, terms_path=None):
+    """Cria o AnalyzerEngine com os reconhecedores brasileiros, sem depender do Streamlit.
+
+    config escolhe uma entrada de ANALYZER_CONFIGS; model_name e exclude sobrescrevem a escolha.
+    terms_path, se dado, registra um BusinessTermRecognizer com a lista de termos desse arquivo.
+    """
+    settings = ANALYZER_CONFIGS[config]
+    model_name = model_name or settings["model_name"]
+    exclude = settings["exclude"] if exclude is None else exclude
+
+    registry = RecognizerRegistry(supported_languages=["pt"])
+    registry.load_predefined_recognizers(languages=["pt"])
+
+    # Adicionamos nossos especialistas, garantindo que eles suportem português
+    registry.add_recognizer(CustomBrCpfRecognizer(supported_language="pt"))
+    registry.add_recognizer(CustomAddressRecognizer(supported_language="pt"))
+    registry.add_recognizer(CustomBrPhoneRecognizer(supported_language="pt"))
+    if terms_path:
+        registry.add_recognizer(BusinessTermRecognizer(terms_path))
+
+    # Removemos os reconhecedores padrão que são muito genéricos
+    registry.remove_recognizer("PhoneRecognizer")
+    registry.remove_recognizer("DateRecognizer")
+
+    nlp_engine = FastStartSpacyNlpEngine(models=[{"lang_code": "pt", "model_name": model_name}], exclude=exclude, lazy=lazy)
+
+    return AnalyzerEngine(
+        registry=registry,
+        nlp_engine=nlp_engine,
+        supported_languages=["pt"]
+    )
+
+
+def build_presidio_analyzer(model_name="pt_core_news_lg", lazy=False, terms_path=None):
+    """AnalyzerEngine só com os reconhecedores nativos do Presidio (o motor do privacy_partner_app.py),
+    mais o BusinessTermRecognizer se terms_path for dado.
+    """
+    registry = RecognizerRegistry(supported_languages=["pt"])
+    registry.load_predefined_recognizers(languages=["pt"])
+    if terms_path:
+        registry.add_recognizer(BusinessTermRecognizer(terms_path))
+    nlp_engine = FastStartSpacyNlpEngine(models=[{"lang_code": "pt", "model_name": model_name}], exclude=[], lazy=lazy)
+    return AnalyzerEngine(registry=registry, nlp_engine=nlp_engine, supported_languages=["pt"])
+
+
+def warm_up(analyzer, language="pt"):
+    """Carrega o modelo e os reconhecedores antes do primeiro usuário (ex.: na subida do processo)."""
+    # Sem lista de entidades o analyze() passa pelo spaCy e por todos os reconhecedores
+    analyzer.analyze(text="Ana Silva, CPF 123.456.789-00, Rua das Flores 12, (11) 99999-8888, ana@exemplo.com", language=language)
+    return analyzer
+
+
+def analyzer_fingerprint(analyzer, language="pt"):
+    """Hash curto da configuração do analisador (modelos + reconhecedores + padrões), usado em chaves de cache.
+
+    A versão do reconhecedor entra no hash: recarregar a lista de termos invalida os resultados antigos,
+    e a verificação de mudança no arquivo de termos roda a cada chamada (ver reload_if_changed).
+    O hash fica guardado no analisador e só é recalculado quando o conjunto de reconhecedores ou a
+    versão de algum deles muda, então pode ser chamado a cada análise (ao contrário de id(analyzer),
+    ele não é reaproveitado por outro analisador depois de um coletado).
+    """
+    recognizers = sorted(analyzer.registry.get_recognizers(language=language, all_fields=True), key=lambda r: r.name)
+    for recognizer in recognizers:
+        # Listas recarregáveis (terms.BusinessTermRecognizer) são verificadas aqui, e não só no analyze():
+        # textos que já estão em cache nunca chegam ao analyze(), mas passam por esta chave
+        reload_if_changed = getattr(recognizer, "reload_if_changed", None)
+        if reload_if_changed is not None:
+            reload_if_changed()
+    versions = (language, tuple((recognizer.name, recognizer.version) for recognizer in recognizers))
+    cached = getattr(analyzer, "_privacy_partner_fingerprint", None)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    parts = [repr(getattr(analyzer.nlp_engine, "models", None))]
+    for recognizer in recognizers:
+        patterns = [(pattern.regex, pattern.score) for pattern in getattr(recognizer, "patterns", [])]
+        parts.append(repr((recognizer.name, recognizer.version, sorted(recognizer.supported_entities), patterns)))
+    fingerprint = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+    analyzer._privacy_partner_fingerprint = (versions, fingerprint)
+    return fingerprint
@@ -0,0 +1,116 @@
+import regex as re
+from presidio_analyzer import PatternRecognizer
+from presidio_analyzer.nlp_engine import NlpArtifacts
+
+from privacy_partner.engines import analyzer_fingerprint
+
+# Pré-filtros dos reconhecedores nativos do Presidio (os customizados declaram PREFILTER)
+DEFAULT_PREFILTERS = {"EMAIL_ADDRESS": "@"}
+
+# Artefatos vazios: o AnalyzerEngine pula o spaCy quando recebe nlp_artifacts prontos
+EMPTY_NLP_ARTIFACTS = NlpArtifacts(entities=[], tokens=[], tokens_indices=[], lemmas=[], nlp_engine=None, language="pt")
+
+
+# --- Detecção do Modo ---
+def get_recognizers(analyzer, entities, language="pt"):
+    return analyzer.registry.get_recognizers(language=language, entities=entities, all_fields=not entities)
+
+
+def needs_nlp(analyzer, entities, language="pt"):
+    """Indica se alguma entidade pedida depende de um reconhecedor que não é de padrão (NER do spaCy).
+
+    Obs.: no caminho rápido não há tokens, então palavras de contexto não reforçam o score.
+    Reconhecedores que não são de padrão mas declaram NEEDS_NLP = False (ex.: BusinessTermRecognizer)
+    também rodam no caminho rápido.
+    """
+    return any(
+        getattr(recognizer, "NEEDS_NLP", not isinstance(recognizer, PatternRecognizer))
+        for recognizer in get_recognizers(analyzer, entities, language)
+    )
+
+
+# --- Matcher Combinado ---
+class PatternOnlyScanner:
+    """Analisa textos só com os reconhecedores de padrão, sem passar pelo pipeline do spaCy.
+
+    Cada texto passa por dois portões baratos antes do analyze(): um pré-filtro de caracteres
+    (ex.: "tem dígito, @ ou palavra de endereço?") e uma única regex pré-compilada com todos
+    os padrões em alternância. Só os textos que passam pelos dois são analisados de fato.
+
+    Sem o spaCy não há tokens nem lemas, então o LemmaContextAwareEnhancer não roda: palavras de
+    contexto ("cpf", "telefone"...) não reforçam o score, e os scores podem sair menores que os do
+    caminho completo. Os spans encontrados são os mesmos.
+    """
+
+    def __init__(self, analyzer, entities, language="pt"):
+        self.analyzer = analyzer
+        self.entities = entities
+        self.language = language
+        recognizers = get_recognizers(analyzer, entities, language)
+        self.prefilter = self._build_prefilter(recognizers)
+        self.combined = self._build_combined(recognizers)
+
+    @staticmethod
+    def _build_prefilter(recognizers):
+        fragments = []
+        for recognizer in recognizers:
+            fragment = getattr(recognizer, "PREFILTER", None)
+            if fragment is None:
+                fragment = DEFAULT_PREFILTERS.get(recognizer.supported_entities[0])
+            if fragment is None:
+                # Um reconhecedor sem pré-filtro conhecido desativa o portão
+                return None
+            fragments.append(fragment)
+        return re.compile("|".join(dict.fromkeys(fragments)), flags=re.IGNORECASE)
+
+    @staticmethod
+    def _build_combined(recognizers):
+        if not all(isinstance(recognizer, PatternRecognizer) for recognizer in recognizers):
+            # Termos de dicionário não entram numa regex: o portão fica desligado
+            return None
+        flags = {recognizer.global_regex_flags for recognizer in recognizers}
+        patterns = [pattern.regex for recognizer in recognizers for pattern in recognizer.patterns]
+        if len(flags) != 1 or not patterns:
+            return None
+        try:
+            return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags=flags.pop())
+        except re.error:
+            return None
+
+    def may_contain_pii(self, text):
+        if self.prefilter is not None and not self.prefilter.search(text):
+            return False
+        if self.combined is not None and not self.combined.search(text):
+            return False
+        return True
+
+    def analyze(self, text):
+        if not self.may_contain_pii(text):
+            return []
+        return self.analyzer.analyze(text=text, language=self.language, entities=self.entities, nlp_artifacts=EMPTY_NLP_ARTIFACTS)
+
+
+def get_pattern_scanner(analyzer, entities, language="pt"):
+    """Retorna o PatternOnlyScanner do par (analisador, entidades), ou None se as entidades exigirem NER.
+
+    Os scanners ficam no próprio analisador (vão embora com ele) e são refeitos quando o fingerprint
+    muda, por exemplo quando a lista de termos é recarregada.
+    """
+    fingerprint = analyzer_fingerprint(analyzer, language)
+    by_language = analyzer.__dict__.setdefault("_privacy_partner_scanners", {})
+    cached_fingerprint, scanners = by_language.get(language, (None, None))
+    if cached_fingerprint != fingerprint:
+        scanners = {}
+        by_language[language] = (fingerprint, scanners)
+    key = frozenset(entities or ())
+    if key not in scanners:
+        scanners[key] = None if needs_nlp(analyzer, entities, language) else PatternOnlyScanner(analyzer, entities, language)
+    return scanners[key]
+
+
+def analyze_text(analyzer, text, entities, language="pt"):
+    """Substituto de analyzer.analyze() que usa o caminho rápido quando nenhuma entidade precisa do spaCy."""
+    scanner = get_pattern_scanner(analyzer, entities, language)
+    if scanner is not None:
+        return scanner.analyze(text)
+    return analyzer.analyze(text=text, language=language, entities=entities)
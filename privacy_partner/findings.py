@@ -0,0 +1,244 @@
+import io
+import json
+import tempfile
+from array import array
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+DEFAULT_PAGE_ROWS = 100
+DEFAULT_EXPORT_ROWS = 100_000
+SPOOL_BYTES = 32 * 1024 * 1024  # relatórios maiores que isso vão para um arquivo temporário em disco
+
+# Formatos de exportação
+CSV = "csv"
+JSON = "json"
+PARQUET = "parquet"
+TXT = "txt"
+REPORT_FORMATS = [CSV, JSON, PARQUET, TXT]
+MIME_TYPES = {CSV: "text/csv", JSON: "application/json", PARQUET: "application/octet-stream", TXT: "text/plain"}
+
+
+class FindingsStore:
+    """Achados de uma varredura em colunas compactas, no lugar de uma lista de dicts.
+
+    Cada achado ocupa 26 bytes: linha (int64), id da coluna (int32), código do tipo (int16),
+    offsets do span (int32) e score (float32). Nomes de coluna e tipos de entidade são internados (guardados
+    uma vez). O texto da célula não é guardado: o relatório aponta a posição e quem precisar do
+    valor o lê do arquivo. Agregações rodam em numpy sobre as colunas, sem criar um objeto por
+    achado, e as exportações são escritas em blocos.
+
+    Iterar gera dicts como os de scanner.scan_dataframe (sem "text"), para o código antigo continuar funcionando.
+    """
+
+    def __init__(self):
+        self.columns = []  # id -> nome da coluna
+        self.types = []  # código -> tipo de entidade
+        self._column_ids = {}
+        self._type_codes = {}
+        self.rows = array("q")
+        self.column_ids = array("i")
+        self.type_codes = array("h")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.scores = array("f")
+
+    # --- Inclusão ---
+    def _intern(self, value, names, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def add(self, row, column, entity_type, start, end, score):
+        self.rows.append(row)
+        self.column_ids.append(self._intern(column, self.columns, self._column_ids))
+        self.type_codes.append(self._intern(entity_type, self.types, self._type_codes))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.scores.append(score)
+
+    def extend(self, findings):
+        """Acrescenta achados no formato de scanner.scan_dataframe (dicts) ou de outro FindingsStore."""
+        for finding in findings:
+            self.add(finding["row"], finding["column"], finding["type"], finding["start"], finding["end"], finding["score"])
+        return self
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return len(self.rows) > 0
+
+    @property
+    def nbytes(self):
+        arrays = (self.rows, self.column_ids, self.type_codes, self.starts, self.ends, self.scores)
+        return sum(len(values) * values.itemsize for values in arrays) + sum(len(name) + 50 for name in self.columns + self.types)
+
+    def _finding(self, position):
+        return {
+            "row": self.rows[position],
+            "column": self.columns[self.column_ids[position]],
+            "type": self.types[self.type_codes[position]],
+            "start": self.starts[position],
+            "end": self.ends[position],
+            "score": round(self.scores[position], 4),
+        }
+
+    def __iter__(self):
+        return (self._finding(position) for position in range(len(self)))
+
+    # --- Agregações ---
+    def _numpy(self):
+        # Visões sem cópia sobre os arrays (válidas enquanto nada for acrescentado)
+        return (
+            np.frombuffer(self.rows, dtype=np.int64),
+            np.frombuffer(self.column_ids, dtype=np.int32),
+            np.frombuffer(self.type_codes, dtype=np.int16),
+        )
+
+    def _mask(self, row_range):
+        if row_range is None:
+            return slice(None)
+        rows = self._numpy()[0]
+        start, stop = row_range
+        return (rows >= start) & (rows < stop)
+
+    def count_by(self, by="type", row_range=None):
+        """{valor: contagem} por "column" ou "type", opcionalmente só nas linhas [início, fim)."""
+        if not self:
+            return {}
+        _, column_ids, type_codes = self._numpy()
+        codes, names = (column_ids, self.columns) if by == "column" else (type_codes, self.types)
+        counts = np.bincount(codes[self._mask(row_range)], minlength=len(names))
+        return {names[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def summary(self, row_range=None):
+        """Uma linha por (coluna, tipo): contagem, primeira e última linha e score médio."""
+        if not self:
+            return []
+        rows, column_ids, type_codes = self._numpy()
+        mask = self._mask(row_range)
+        rows, scores = rows[mask], np.frombuffer(self.scores, dtype=np.float32)[mask]
+        groups = column_ids[mask].astype(np.int64) * len(self.types) + type_codes[mask]
+        keys, inverse, counts = np.unique(groups, return_inverse=True, return_counts=True)
+        first_rows = np.full(len(keys), np.iinfo(np.int64).max)
+        last_rows = np.full(len(keys), np.iinfo(np.int64).min)
+        np.minimum.at(first_rows, inverse, rows)
+        np.maximum.at(last_rows, inverse, rows)
+        score_sums = np.bincount(inverse, weights=scores, minlength=len(keys))
+        return [
+            {
+                "column": self.columns[key // len(self.types)],
+                "type": self.types[key % len(self.types)],
+                "count": int(count),
+                "first_row": int(first),
+                "last_row": int(last),
+                "mean_score": round(float(total / count), 3),
+            }
+            for key, count, first, last, total in zip(keys, counts, first_rows, last_rows, score_sums)
+        ]
+
+    # --- Visão Detalhada ---
+    def to_arrow(self, start=0, stop=None):
+        """Achados [start, stop) como tabela Arrow; coluna e tipo viram dictionary arrays (os nomes internados)."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        # Cópias das fatias: uma visão exportada impediria os arrays de crescer depois
+        rows, column_ids, type_codes = (values[start:stop].copy() for values in self._numpy())
+        starts, ends, scores = (
+            np.frombuffer(values, dtype=dtype)[start:stop].copy()
+            for values, dtype in ((self.starts, np.int32), (self.ends, np.int32), (self.scores, np.float32))
+        )
+        # Nomes de coluna podem não ser str (ex.: cabeçalhos numéricos de uma planilha lida pelo pd.read_excel)
+        columns = pa.array([str(column) for column in self.columns], type=pa.string())
+        types = pa.array(self.types, type=pa.string())
+        return pa.table({
+            "row": pa.array(rows),
+            "column": pa.DictionaryArray.from_arrays(pa.array(column_ids), columns),
+            "type": pa.DictionaryArray.from_arrays(pa.array(type_codes), types),
+            "start": pa.array(starts),
+            "end": pa.array(ends),
+            # float32 no armazenamento; na saída, arredondado (0.9 e não 0.8999999761581421)
+            "score": pc.round(pa.array(scores.astype(np.float64)), 4),
+        })
+
+    def page(self, number, page_rows=DEFAULT_PAGE_ROWS):
+        """DataFrame só com a página pedida (a partir de 0): a interface nunca materializa o resto."""
+        start = number * page_rows
+        return self.to_arrow(start, start + page_rows).to_pandas()
+
+    def page_count(self, page_rows=DEFAULT_PAGE_ROWS):
+        return max(-(-len(self) // page_rows), 1)
+
+    def iter_batches(self, chunk_rows=DEFAULT_EXPORT_ROWS):
+        # Um store vazio ainda gera um lote, para o arquivo sair com o cabeçalho/schema
+        for start in range(0, max(len(self), 1), chunk_rows):
+            yield self.to_arrow(start, start + chunk_rows)
+
+    # --- Exportação ---
+    def export(self, file_format=CSV, title=None, profile=None, chunk_rows=DEFAULT_EXPORT_ROWS):
+        """Escreve o relatório (resumo + detalhe) bloco a bloco e o retorna como arquivo binário
+        posicionado no início, pronto para o st.download_button.
+
+        CSV e Parquet trazem só o detalhe (uma linha por achado; o resumo sai de summary());
+        JSON traz {"title", "profile", "summary", "findings"}; TXT é o relatório legível, com o
+        perfil das colunas, o resumo e uma linha por achado (linha do arquivo = row + 2).
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        if file_format == PARQUET:
+            writer = None
+            for batch in self.iter_batches(chunk_rows):
+                if writer is None:
+                    writer = pq.ParquetWriter(output, batch.schema)
+                writer.write_table(batch)
+            writer.close()
+        elif file_format == CSV:
+            for number, batch in enumerate(self.iter_batches(chunk_rows)):
+                pa_csv.write_csv(batch, output, write_options=pa_csv.WriteOptions(include_header=number == 0))
+        else:
+            text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+            if file_format == JSON:
+                self._write_json(text_output, title, profile, chunk_rows)
+            elif file_format == TXT:
+                self._write_text(text_output, title, profile, chunk_rows)
+            else:
+                raise ValueError(f"Formato de relatório não suportado: {file_format}")
+            text_output.flush()
+            text_output.detach()
+        output.seek(0)
+        return output
+
+    def _write_json(self, output, title, profile, chunk_rows):
+        header = {"title": title, "profile": profile or [], "summary": self.summary()}
+        output.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "findings": [')
+        for number, batch in enumerate(self.iter_batches(chunk_rows)):
+            if batch.num_rows:
+                # O to_json do pandas serializa o bloco inteiro em C; só os colchetes da lista são retirados
+                records = batch.to_pandas().to_json(orient="records", force_ascii=False)
+                output.write(("," if number else "") + records[1:-1])
+        output.write("]}")
+
+    def _write_text(self, output, title, profile, chunk_rows):
+        output.write(f"{title or 'Privacy Risk Report'}\n{'=' * 50}\n")
+        if profile:
+            output.write("Column profile:\n")
+            for column_profile in profile:
+                output.write(f"- Column '{column_profile['column']}' ({column_profile['dtype']}): {column_profile['mode']} - {column_profile['reason']}\n")
+            output.write(f"{'=' * 50}\n")
+        output.write("Summary:\n")
+        for group in self.summary():
+            output.write(f"- Column '{group['column']}', {group['type']}: {group['count']} finding(s), rows {group['first_row'] + 2}-{group['last_row'] + 2}\n")
+        output.write(f"{'=' * 50}\n")
+        for batch in self.iter_batches(chunk_rows):
+            # Linhas montadas pelo Arrow, bloco a bloco (linha do arquivo = row + 2: cabeçalho e base 1)
+            lines = pc.binary_join_element_wise(
+                "- Row ", pc.cast(pc.add(batch.column("row"), 2), pa.string()),
+                ", Column '", pc.cast(batch.column("column"), pa.string()),
+                "': Found data of type ", pc.cast(batch.column("type"), pa.string()), ".\n",
+                "",
+            )
+            output.write("".join(lines.to_pylist()))
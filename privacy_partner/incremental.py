@@ -0,0 +1,73 @@
+import pandas as pd
+
+from privacy_partner.scanner import analyze_distinct
+
+
+# --- Impressões Digitais das Células ---
+def fingerprint_cells(df):
+    """Hash de 64 bits de cada célula (vetorizado por coluna), com o mesmo índice e colunas do DataFrame."""
+    return pd.DataFrame(
+        {col_name: pd.util.hash_pandas_object(df[col_name], index=False).to_numpy() for col_name in df.columns},
+        index=df.index,
+    )
+
+
+# --- Varredura Incremental ---
+class IncrementalScanner:
+    """Guarda a impressão digital do último estado varrido e, a cada nova varredura, analisa só as
+    células adicionadas ou modificadas, descartando os achados de linhas/colunas removidas.
+
+    O diff das impressões é vetorizado; o custo de análise cresce com o tamanho da edição.
+    """
+
+    def __init__(self, analyzer, entities, language="pt"):
+        self.analyzer = analyzer
+        self.entities = entities
+        self.language = language
+        self.fingerprints = None
+        self.results_by_cell = {}  # (índice, coluna) -> (texto, resultados), só células com achados
+        self.last_scanned_cells = 0
+
+    def _changed_cells(self, fingerprints):
+        if self.fingerprints is None:
+            return list(fingerprints.stack().index)
+        # fill_value mantém o dtype uint64 (com NaN viraria float e perderia bits do hash)
+        previous = self.fingerprints.reindex(index=fingerprints.index, columns=fingerprints.columns, fill_value=0)
+        changed = previous.ne(fingerprints).stack()
+        return list(changed.index[changed.to_numpy()])
+
+    def scan(self, df):
+        fingerprints = fingerprint_cells(df)
+        changed = self._changed_cells(fingerprints)
+
+        # Achados de células removidas ou modificadas deixam de valer
+        live_rows = set(df.index)
+        live_columns = set(df.columns)
+        for cell in changed:
+            self.results_by_cell.pop(cell, None)
+        for cell in [cell for cell in self.results_by_cell if cell[0] not in live_rows or cell[1] not in live_columns]:
+            del self.results_by_cell[cell]
+
+        texts_by_cell = {}
+        for index, col_name in changed:
+            cell_value = df.at[index, col_name]
+            if isinstance(cell_value, str) and cell_value:
+                texts_by_cell[index, col_name] = cell_value
+        results_by_text = analyze_distinct(self.analyzer, texts_by_cell.values(), self.entities, self.language)
+        for cell, text in texts_by_cell.items():
+            if results_by_text[text]:
+                self.results_by_cell[cell] = (text, results_by_text[text])
+
+        self.fingerprints = fingerprints
+        self.last_scanned_cells = len(texts_by_cell)
+        return self.cells(df)
+
+    def cells(self, df):
+        """Lista (índice, coluna, texto, resultados) das células com achados, na ordem da planilha."""
+        cells = list(self.results_by_cell)
+        if not cells:
+            return []
+        row_positions = df.index.get_indexer([index for index, _ in cells])
+        column_positions = df.columns.get_indexer([col_name for _, col_name in cells])
+        order = sorted(range(len(cells)), key=lambda i: (row_positions[i], column_positions[i]))
+        return [(cells[i][0], cells[i][1]) + self.results_by_cell[cells[i]] for i in order]
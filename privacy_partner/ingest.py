@@ -0,0 +1,249 @@
+import codecs
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from privacy_partner.profiler import SKIP
+
+CSV = "csv"
+PARQUET = "parquet"
+XLSX = "xlsx"
+UPLOAD_TYPES = [CSV, PARQUET, XLSX]  # para o type= dos st.file_uploader
+
+SAMPLE_BYTES = 64 * 1024
+DEFAULT_BLOCK_BYTES = 1024 * 1024  # bloco do leitor CSV do Arrow; o leitor mantém vários em leitura antecipada
+DEFAULT_BATCH_ROWS = 20_000  # Parquet/XLSX, no lugar do chunksize do read_csv
+
+
+# --- Detecção de Formato e Codificação ---
+def peek(source, size=SAMPLE_BYTES):
+    """Primeiros bytes da fonte (caminho ou arquivo binário), sem mudar a posição de leitura."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read(size)
+    position = source.tell()
+    sample = source.read(size)
+    source.seek(position)
+    return sample
+
+
+def detect_encoding(sample):
+    """Codificação a partir de uma amostra de bytes: BOM, senão UTF-8 se decodificar, senão latin-1."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as error:
+        # A amostra pode cortar um caractere multibyte no final; isso não é sinal de outra codificação
+        if error.reason != "unexpected end of data":
+            return "latin-1"
+    return "utf-8"
+
+
+def detect_source_encoding(source, sample, block_bytes=DEFAULT_BLOCK_BYTES):
+    """Codificação da fonte inteira: como detect_encoding, mas validando o UTF-8 até o fim do arquivo.
+
+    Um CSV em latin-1 pode ter os primeiros acentos bem depois da amostra; lido como UTF-8, a
+    conversão para string falharia no meio da varredura. A validação é uma passada só de bytes
+    (decodificador incremental, em C), antes de qualquer leitor do Arrow ser aberto na fonte.
+    """
+    encoding = detect_encoding(sample)
+    if encoding != "utf-8":
+        return encoding
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    handle = open(source, "rb") if isinstance(source, (str, os.PathLike)) else None
+    stream = handle or source
+    position = stream.tell()
+    try:
+        stream.seek(0)
+        for block in iter(lambda: stream.read(block_bytes), b""):
+            decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "latin-1"
+    finally:
+        if handle is not None:
+            handle.close()
+        else:
+            stream.seek(position)
+    return "utf-8"
+
+
+def detect_format(name, sample):
+    extension = os.path.splitext(name or "")[1].lower().lstrip(".")
+    if extension in (PARQUET, "pq") or sample.startswith(b"PAR1"):
+        return PARQUET
+    if extension in (XLSX, "xlsm") or sample.startswith(b"PK\x03\x04"):
+        return XLSX
+    return CSV
+
+
+def _arrow_encoding(encoding):
+    # O leitor do Arrow já descarta o BOM do UTF-8
+    return "utf8" if encoding in ("utf-8", "utf-8-sig", "utf8") else encoding
+
+
+def _is_scanned_type(arrow_type):
+    """Tipos que podem conter PII: texto e números (um CPF ou telefone em int64); booleanos, datas e decimais não.
+
+    Colunas float continuam: um inteiro com nulos vira float64 no pandas, e o perfil decide (profiler).
+    """
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    return (
+        pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_null(arrow_type)
+        or pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+    )
+
+
+def _column_name(name, position):
+    # Mesmo nome que o pandas dá a colunas sem cabeçalho
+    return name or f"Unnamed: {position}"
+
+
+def _skipped_profile(name, arrow_type):
+    return {"column": name, "dtype": str(arrow_type), "mode": SKIP, "reason": "non-text dtype", "sampled": 0}
+
+
+def _split_schema(schema, exhaustive):
+    """(colunas a ler, perfil das descartadas) a partir do schema do Arrow."""
+    keep = [field.name for field in schema if exhaustive or _is_scanned_type(field.type)]
+    skipped = [
+        _skipped_profile(_column_name(field.name, position), field.type)
+        for position, field in enumerate(schema) if field.name not in keep
+    ]
+    return keep, skipped
+
+
+def _to_frames(batches, positions):
+    """Converte os lotes do Arrow em DataFrames com índice contínuo, como o chunksize do read_csv.
+
+    Sem colunas a ler, cada bloco vira um DataFrame vazio com o mesmo número de linhas.
+    """
+    offset = 0
+    for batch in batches:
+        frame = batch.to_pandas() if positions else pd.DataFrame()
+        frame.index = pd.RangeIndex(offset, offset + batch.num_rows)
+        frame.columns = [_column_name(name, position) for name, position in zip(frame.columns, positions)]
+        offset += batch.num_rows
+        yield frame
+
+
+# --- Leitura em Blocos ---
+def _csv_batches(source, encoding, block_bytes, columns=None, column_types=None):
+    read_options = pa_csv.ReadOptions(encoding=_arrow_encoding(encoding), block_size=block_bytes)
+    # Células vazias (e "NA", "null"...) viram nulos: assim uma coluna de medidas com buracos ainda é numérica
+    convert_options = pa_csv.ConvertOptions(include_columns=columns, column_types=column_types, strings_can_be_null=True)
+    return pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+
+
+def _as_measurement(column):
+    """A coluna (string) como float64 se, no bloco, ela só tiver números e algum deles tiver fração.
+
+    Medidas (ex.: 79.94869123456) não devem chegar aos padrões como texto: a fração casaria os 11 dígitos
+    do CPF. Colunas só de inteiros continuam texto, com zeros à esquerda, e passam pelos padrões.
+    """
+    if column.null_count == len(column):
+        return column
+    try:
+        numbers = pc.cast(column, pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return column
+    if pc.all(pc.equal(pc.floor(numbers), numbers)).as_py() is not False:
+        return column
+    return numbers
+
+
+def _with_measurements(batches):
+    for batch in batches:
+        yield pa.RecordBatch.from_arrays([_as_measurement(column) for column in batch.columns], names=batch.schema.names)
+
+
+def _first_lines(source, encoding, size):
+    """Linhas completas do início da fonte (até size bytes), recodificadas em UTF-8."""
+    sample = peek(source, size)
+    text = sample.decode(encoding, errors="ignore")
+    if len(sample) == size and "\n" in text:
+        # A amostra cortou o arquivo: a última linha pode estar pela metade
+        text = text[:text.rindex("\n") + 1]
+    return text.encode("utf-8")
+
+
+def _rewind(source):
+    if not isinstance(source, (str, os.PathLike)):
+        source.seek(0)
+    return source
+
+
+def _file_format(source, name, sample):
+    if name is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", None)
+    return detect_format(os.fspath(name) if name is not None else None, sample)
+
+
+def open_chunks(source, name=None, encoding=None, exhaustive=False, block_bytes=DEFAULT_BLOCK_BYTES, batch_rows=DEFAULT_BATCH_ROWS):
+    """Abre a fonte para varredura e retorna (blocos, nomes de todas as colunas, perfil das descartadas).
+
+    blocos é um iterador de DataFrames com só as colunas que podem conter PII (texto e números),
+    em strings do Arrow (sem um objeto Python por célula). Só o Parquet é projetado antes da
+    leitura, porque o schema dele vale para o arquivo inteiro: colunas booleanas e de data nem
+    chegam a ser convertidas. No CSV todas as colunas são lidas como string e nenhuma é descartada
+    de antemão; em cada bloco, as que só têm números com fração voltam a ser float64 (o perfil as
+    trata como medidas). Com exhaustive=True nada é descartado. XLSX é lido inteiro (requer openpyxl) e
+    depois fatiado.
+    """
+    sample = peek(source)
+    file_format = _file_format(source, name, sample)
+
+    if file_format == PARQUET:
+        parquet_file = pq.ParquetFile(source)
+        schema = parquet_file.schema_arrow
+        keep, skipped = _split_schema(schema, exhaustive)
+        positions = [schema.get_field_index(column) for column in keep]
+        # Sem colunas a ler, o iter_batches ainda informa o número de linhas de cada lote
+        columns = [_column_name(field.name, position) for position, field in enumerate(schema)]
+        return _to_frames(parquet_file.iter_batches(batch_size=batch_rows, columns=keep), positions), columns, skipped
+
+    if file_format == XLSX:
+        df = pd.read_excel(source, dtype_backend="pyarrow")
+        return (df.iloc[start:start + batch_rows] for start in range(0, len(df), batch_rows)), list(df.columns), []
+
+    encoding = encoding or detect_source_encoding(source, sample, block_bytes)
+    # No CSV não há schema do arquivo inteiro: os tipos inferidos do primeiro bloco não dizem nada
+    # sobre o resto (uma coluna só de números no início pode ter texto mais adiante). Por isso todas
+    # as colunas são lidas como string e o perfil de cada bloco decide o que varrer. O primeiro bloco
+    # só fornece os nomes, e é lido de uma cópia em memória: um leitor aberto na própria fonte
+    # continuaria lendo à frente em outra thread (mesmo depois de fechado) e embaralharia a leitura.
+    names = _csv_batches(io.BytesIO(_first_lines(source, encoding, block_bytes)), "utf-8", block_bytes).schema.names
+    reader = _csv_batches(_rewind(source), encoding, block_bytes, column_types={column: pa.string() for column in names})
+    return _to_frames(_with_measurements(reader), range(len(names))), [_column_name(name, position) for position, name in enumerate(names)], []
+
+
+def read_table(source, name=None, encoding=None):
+    """Lê o arquivo inteiro (todas as colunas, com tipos) num DataFrame, ex.: para o contexto do chat."""
+    sample = peek(source)
+    file_format = _file_format(source, name, sample)
+    if file_format == PARQUET:
+        return pq.read_table(source).to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+    if file_format == XLSX:
+        return pd.read_excel(source)
+
+    encoding = encoding or detect_source_encoding(source, sample)
+    try:
+        read_options = pa_csv.ReadOptions(encoding=_arrow_encoding(encoding), block_size=DEFAULT_BLOCK_BYTES)
+        table = pa_csv.read_csv(source, read_options=read_options)
+        # self_destruct libera cada coluna do Arrow assim que convertida; datas viram datetime64, não objetos
+        df = table.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+        del table
+        df.columns = [_column_name(name, position) for position, name in enumerate(df.columns)]
+        return df
+    except pa.ArrowInvalid:
+        # Os tipos do Arrow vêm do primeiro bloco; uma coluna que muda de tipo depois cai no parser do pandas
+        return pd.read_csv(_rewind(source), encoding=encoding)
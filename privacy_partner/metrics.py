@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from privacy_partner.cache import analysis_cache, scan_cache
+
+_NULL_CONTEXT = nullcontext()
+
+
+# --- Registro de Métricas ---
+class Metrics:
+    """Contadores por reconhecedor e tempos por fase (read, profile, scan, report), exportáveis no
+    formato texto do Prometheus. Desligado, cada ponto de medição custa só um if.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # nome do reconhecedor -> [chamadas, segundos, caracteres de entrada, achados]
+            self.recognizers = defaultdict(lambda: [0, 0.0, 0, 0])
+            # fase -> [execuções, segundos]
+            self.phases = defaultdict(lambda: [0, 0.0])
+
+    def record_recognizer(self, name, seconds, input_chars, findings):
+        with self._lock:
+            stats = self.recognizers[name]
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += input_chars
+            stats[3] += findings
+
+    def record_phase(self, phase, seconds):
+        with self._lock:
+            stats = self.phases[phase]
+            stats[0] += 1
+            stats[1] += seconds
+
+    def phase(self, phase):
+        """Context manager que soma o tempo do bloco na fase informada."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed_phase(phase)
+
+    @contextmanager
+    def _timed_phase(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - start)
+
+    def timed_iter(self, iterable, phase):
+        """Repassa os itens de um iterável somando na fase o tempo gasto para produzir cada um."""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.record_phase(phase, time.perf_counter() - start)
+            yield item
+
+    # --- Exportação ---
+    def rows(self):
+        """Linhas para exibição (ex.: st.dataframe no painel de debug)."""
+        with self._lock:
+            rows = [
+                {"kind": "recognizer", "name": name, "calls": calls, "seconds": round(seconds, 4), "input_chars": chars, "findings": findings}
+                for name, (calls, seconds, chars, findings) in sorted(self.recognizers.items())
+            ]
+            rows += [
+                {"kind": "phase", "name": phase, "calls": calls, "seconds": round(seconds, 4), "input_chars": None, "findings": None}
+                for phase, (calls, seconds) in sorted(self.phases.items())
+            ]
+        return rows
+
+    def to_prometheus(self):
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            recognizers = sorted(self.recognizers.items())
+            phases = sorted(self.phases.items())
+        family("privacy_partner_recognizer_calls_total", "counter", "Chamadas por reconhecedor.",
+               [({"recognizer": name}, stats[0]) for name, stats in recognizers])
+        family("privacy_partner_recognizer_seconds_total", "counter", "Tempo gasto por reconhecedor.",
+               [({"recognizer": name}, f"{stats[1]:.6f}") for name, stats in recognizers])
+        family("privacy_partner_recognizer_input_chars_total", "counter", "Caracteres analisados por reconhecedor.",
+               [({"recognizer": name}, stats[2]) for name, stats in recognizers])
+        family("privacy_partner_recognizer_findings_total", "counter", "Achados por reconhecedor.",
+               [({"recognizer": name}, stats[3]) for name, stats in recognizers])
+        family("privacy_partner_phase_calls_total", "counter", "Execuções por fase do processamento de arquivos.",
+               [({"phase": phase}, stats[0]) for phase, stats in phases])
+        family("privacy_partner_phase_seconds_total", "counter", "Tempo por fase do processamento de arquivos.",
+               [({"phase": phase}, f"{stats[1]:.6f}") for phase, stats in phases])
+        for cache_name, cache in (("analysis", analysis_cache), ("scan", scan_cache)):
+            cache_stats = cache.stats()
+            family(f"privacy_partner_{cache_name}_cache_hits_total", "counter", f"Acertos do cache {cache_name}.", [({}, cache_stats["hits"])])
+            family(f"privacy_partner_{cache_name}_cache_misses_total", "counter", f"Faltas do cache {cache_name}.", [({}, cache_stats["misses"])])
+            family(f"privacy_partner_{cache_name}_cache_entries", "gauge", f"Entradas no cache {cache_name}.", [({}, cache_stats["size"])])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Registro global do processo; ligado com PRIVACY_PARTNER_METRICS=1
+metrics = Metrics(enabled=os.environ.get("PRIVACY_PARTNER_METRICS") == "1")
+
+
+# --- Instrumentação do Analisador ---
+def _wrap_recognizer(recognizer):
+    analyze = recognizer.analyze
+
+    def instrumented_analyze(text, entities, nlp_artifacts=None, *args, **kwargs):
+        if not metrics.enabled:
+            return analyze(text, entities, nlp_artifacts, *args, **kwargs)
+        start = time.perf_counter()
+        results = analyze(text, entities, nlp_artifacts, *args, **kwargs)
+        metrics.record_recognizer(recognizer.name, time.perf_counter() - start, len(text), len(results or ()))
+        return results
+
+    recognizer.analyze = instrumented_analyze
+
+
+def _wrap_nlp_engine(nlp_engine):
+    process_text = nlp_engine.process_text
+    process_batch = nlp_engine.process_batch
+
+    def instrumented_process_text(text, language):
+        if not metrics.enabled:
+            return process_text(text, language)
+        start = time.perf_counter()
+        artifacts = process_text(text, language)
+        metrics.record_recognizer("spacy", time.perf_counter() - start, len(text), len(artifacts.entities))
+        return artifacts
+
+    def instrumented_process_batch(texts, language, **kwargs):
+        # O tempo do spaCy no lote aparece como a fase "nlp_batch"
+        return metrics.timed_iter(process_batch(texts, language, **kwargs), "nlp_batch")
+
+    nlp_engine.process_text = instrumented_process_text
+    nlp_engine.process_batch = instrumented_process_batch
+
+
+def instrument_analyzer(analyzer):
+    """Envolve o spaCy e cada reconhecedor do registry para medir chamadas, tempo, tamanho e achados.
+
+    Só instala os wrappers se as métricas estiverem ligadas; é idempotente.
+    """
+    if not metrics.enabled or getattr(analyzer, "_instrumented", False):
+        return analyzer
+    for recognizer in analyzer.registry.recognizers:
+        _wrap_recognizer(recognizer)
+    _wrap_nlp_engine(analyzer.nlp_engine)
+    analyzer._instrumented = True
+    return analyzer
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from privacy_partner.engines import build_analyzer
+from privacy_partner.scanner import scan_dataframe
+
+DEFAULT_SHARD_ROWS = 5_000
+CANCEL_SLOTS = 64  # varreduras simultâneas que podem ser interrompidas (as demais só cancelam o que não saiu da fila)
+
+# Analisador do processo trabalhador, criado uma única vez pelo initializer
+_worker_analyzer = None
+# Flags compartilhadas com o processo principal: 1 no slot de uma varredura que já terminou
+_cancel_flags = None
+
+
+# --- Processo Trabalhador ---
+def init_worker(factory, factory_kwargs, cancel_flags=None):
+    """Initializer de um processo trabalhador: cria o analisador dele com factory(**factory_kwargs).
+
+    Serve para qualquer ProcessPoolExecutor que vá usar worker_analyzer() (ex.: o batch).
+    """
+    global _worker_analyzer, _cancel_flags
+    _worker_analyzer = factory(**factory_kwargs)
+    _cancel_flags = cancel_flags
+
+
+def worker_analyzer():
+    """O analisador deste processo trabalhador (para funções submetidas por outros módulos)."""
+    return _worker_analyzer
+
+
+def _scan_shard(shard, entities, profile, slot=None):
+    if slot is not None and _cancel_flags[slot]:
+        return None  # a varredura já parou (ex.: gate com achado): ninguém vai ler este resultado
+    return scan_dataframe(_worker_analyzer, shard, entities, profile=profile)
+
+
+# --- Executor ---
+class ParallelScanner:
+    """Distribui a varredura de linhas/blocos entre processos, cada um com seu próprio AnalyzerEngine.
+
+    O analisador é montado pela factory (por padrão engines.build_analyzer, com o mesmo registry de
+    reconhecedores customizados) uma vez por processo e reutilizado por toda a vida do trabalhador.
+    Os achados voltam na mesma ordem da varredura serial.
+    """
+
+    def __init__(self, workers=None, factory=build_analyzer, factory_kwargs=None, mp_context=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._cancel_flags = (mp_context or multiprocessing.get_context()).RawArray("b", CANCEL_SLOTS)
+        self._free_slots = list(range(CANCEL_SLOTS))
+        self._slots_lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(factory, factory_kwargs or {}, self._cancel_flags),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def imap_chunks(self, chunks, entities):
+        """Varre um iterável de (bloco, perfil) e gera (bloco, perfil, achados) na ordem de entrada.
+
+        No máximo 2 blocos por trabalhador ficam em voo, então a memória não cresce com o arquivo.
+        Se quem consome parar antes do fim (ex.: o modo gate achou algo) e fechar o gerador, os blocos
+        que não começaram são descartados: os que ainda estão na fila do executor são cancelados e os
+        que já foram entregues aos trabalhadores (o ProcessPoolExecutor os marca como em execução)
+        veem a flag da varredura e retornam sem analisar. Só os blocos em análise vão até o fim.
+        """
+        slot = self._acquire_slot()
+        pending = deque()
+        try:
+            for chunk, profile in chunks:
+                pending.append((chunk, profile, self._executor.submit(_scan_shard, chunk, entities, profile, slot)))
+                if len(pending) >= 2 * self.workers:
+                    chunk, profile, future = pending.popleft()
+                    yield chunk, profile, future.result()
+            while pending:
+                chunk, profile, future = pending.popleft()
+                yield chunk, profile, future.result()
+        finally:
+            if pending and slot is not None:
+                self._cancel_flags[slot] = 1
+            for _, _, future in pending:
+                future.cancel()
+            self._release_slot(slot)
+
+    def _acquire_slot(self):
+        with self._slots_lock:
+            if not self._free_slots:
+                return None
+            slot = self._free_slots.pop()
+        # Blocos atrasados do dono anterior do slot voltam a rodar: desperdício, nunca um resultado perdido
+        self._cancel_flags[slot] = 0
+        return slot
+
+    def _release_slot(self, slot):
+        if slot is not None:
+            with self._slots_lock:
+                self._free_slots.append(slot)
+
+    def scan_dataframe(self, df, entities, profile=None, shard_rows=DEFAULT_SHARD_ROWS):
+        """Equivalente paralelo de scanner.scan_dataframe: fatia o DataFrame em blocos de linhas."""
+        shards = ((df.iloc[start:start + shard_rows], profile) for start in range(0, len(df), shard_rows))
+        findings = []
+        for _, _, shard_findings in self.imap_chunks(shards, entities):
+            findings.extend(shard_findings)
+        return findings
@@ -0,0 +1,91 @@
+import re
+
+import pandas as pd
+
+from privacy_partner.fastpath import needs_nlp
+
+DEFAULT_SAMPLE_SIZE = 200
+
+# Modos de varredura por coluna
+SKIP = "skip"
+PATTERN_ONLY = "pattern"
+FULL_NLP = "nlp"
+
+# Valores sem letras (números, datas, telefones...) ou booleanos escritos por extenso
+NON_TEXT_VALUE = re.compile(r"[\d\s.,:;/+\-()%]*|true|false|sim|não|nao|yes|no|nan|null", re.IGNORECASE)
+
+
+# --- Perfil das Colunas ---
+def _has_text(series):
+    """Indica se alguma célula da coluna é um texto não vazio (não só as da amostra)."""
+    return any(isinstance(value, str) and value for value in series.tolist())
+
+
+def _integer_valued(series):
+    """Indica se todos os valores não nulos de uma coluna numérica são inteiros (ex.: int64 com nulos, em float64)."""
+    values = series.dropna()
+    return len(values) > 0 and bool((values % 1 == 0).all())
+
+
+def profile_column(series, sample_size=DEFAULT_SAMPLE_SIZE):
+    """Classifica uma coluna como skip, pattern ou nlp a partir do dtype e de uma amostra de valores."""
+    profile = {"column": series.name, "dtype": str(series.dtype), "mode": FULL_NLP, "reason": "", "sampled": 0}
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        profile.update(mode=SKIP, reason="non-text dtype")
+        return profile
+    if pd.api.types.is_numeric_dtype(series):
+        # CPFs e telefones guardados como número (int64): o scanner converte os valores em texto
+        # (scanner.iter_text_cells) e a coluna passa pelos reconhecedores de padrão. Medidas com casas
+        # decimais não: a fração de 79.94869123456 casaria o \d{11} do CPF
+        if pd.api.types.is_integer_dtype(series):
+            profile.update(mode=PATTERN_ONLY, reason="integer dtype")
+        elif _integer_valued(series):
+            profile.update(mode=PATTERN_ONLY, reason="integer-valued numbers")
+        else:
+            profile.update(mode=SKIP, reason="non-integer numeric dtype")
+        return profile
+
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.sample(sample_size, random_state=0)
+    texts = [value for value in values.tolist() if isinstance(value, str) and value]
+    profile["sampled"] = len(texts)
+    if not texts and not _has_text(series):
+        profile.update(mode=SKIP, reason="no text")
+    elif not texts:
+        # Texto raro demais para cair na amostra: ainda passa pelos padrões
+        profile.update(mode=PATTERN_ONLY, reason="sparse text")
+    elif all(NON_TEXT_VALUE.fullmatch(text.strip()) for text in texts):
+        profile.update(mode=PATTERN_ONLY, reason="numeric/date-like text")
+    else:
+        profile["reason"] = "free text"
+    return profile
+
+
+def profile_dataframe(df, sample_size=DEFAULT_SAMPLE_SIZE, exhaustive=False):
+    """Gera o perfil de todas as colunas. Com exhaustive=True (auditorias) todas vão para a varredura completa."""
+    if exhaustive:
+        return [
+            {"column": col_name, "dtype": str(df[col_name].dtype), "mode": FULL_NLP, "reason": "exhaustive scan", "sampled": 0}
+            for col_name in df.columns
+        ]
+    return [profile_column(df[col_name], sample_size) for col_name in df.columns]
+
+
+# --- Plano de Varredura ---
+def plan_scan(analyzer, profile, entities, language="pt"):
+    """Converte o perfil em (colunas a varrer, {coluna: entidades}) para o scanner.
+
+    Colunas pattern são analisadas só com as entidades que dispensam NER.
+    """
+    entities = entities or analyzer.get_supported_entities(language=language)
+    pattern_entities = [entity for entity in entities if not needs_nlp(analyzer, [entity], language)]
+    columns = []
+    column_entities = {}
+    for column_profile in profile:
+        if column_profile["mode"] == SKIP or (column_profile["mode"] == PATTERN_ONLY and not pattern_entities):
+            continue
+        columns.append(column_profile["column"])
+        if column_profile["mode"] == PATTERN_ONLY:
+            column_entities[column_profile["column"]] = pattern_entities
+    return columns, column_entities
@@ -0,0 +1,151 @@
+import pandas as pd
+
+from privacy_partner.cache import analysis_cache
+from privacy_partner.engines import analyzer_fingerprint
+from privacy_partner.fastpath import get_pattern_scanner
+from privacy_partner.profiler import plan_scan
+
+DEFAULT_BATCH_SIZE = 256
+
+
+# --- Células de Texto ---
+def _integer_text(value):
+    """Texto de um número inteiro (também 12345678900.0); nulos e números com fração ficam de fora."""
+    if pd.isna(value):
+        return None
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else None
+    return str(value)
+
+
+def _column_values(column):
+    """Valores da coluna; nas numéricas os inteiros viram texto (um CPF em int64 também precisa ser encontrado)."""
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return [_integer_text(value) for value in column.tolist()]
+    return column.tolist()
+
+
+def iter_text_cells(df, columns=None):
+    """Percorre as células de texto não vazias na mesma ordem do antigo loop com iterrows().
+
+    Colunas numéricas entram só com os valores inteiros, convertidos em texto; frações (medidas) não
+    são varridas.
+    """
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    columns = list(df.columns if columns is None else columns)
+    values = [_column_values(df[col]) for col in columns]
+    for position, index in enumerate(df.index):
+        for col_name, column_values in zip(columns, values):
+            cell_value = column_values[position]
+            if isinstance(cell_value, str) and cell_value:
+                yield index, col_name, cell_value
+
+
+# --- Varredura em Lote ---
+def analysis_key(fingerprint, entities, language, text):
+    """Chave do cache: o mesmo texto com a mesma configuração de analisador (engines.analyzer_fingerprint)
+    e o mesmo conjunto de entidades dá o mesmo resultado.
+    """
+    return (fingerprint, language, frozenset(entities or ()), text)
+
+
+def analyze_distinct(analyzer, texts, entities, language="pt", batch_size=DEFAULT_BATCH_SIZE, cache=analysis_cache):
+    """Analisa cada texto distinto uma única vez, reaproveitando o cache LRU, e retorna {texto: resultados}."""
+    results_by_text = {}
+    pending = []
+    # Antes de qualquer consulta ao cache: o fingerprint também dispara a recarga da lista de termos
+    fingerprint = analyzer_fingerprint(analyzer, language)
+    for text in dict.fromkeys(texts):
+        cached = cache.get(analysis_key(fingerprint, entities, language, text)) if cache is not None else None
+        if cached is None:
+            pending.append(text)
+        else:
+            results_by_text[text] = cached
+
+    pattern_scanner = get_pattern_scanner(analyzer, entities, language)
+    if pattern_scanner is not None:
+        # Só reconhecedores de padrão: o pipeline do spaCy é dispensado
+        analyzed = ((text, pattern_scanner.analyze(text)) for text in pending)
+    else:
+        batches = analyzer.nlp_engine.process_batch(pending, language, batch_size=batch_size)
+        analyzed = (
+            (text, analyzer.analyze(text=text, language=language, entities=entities, nlp_artifacts=nlp_artifacts))
+            for text, (_, nlp_artifacts) in zip(pending, batches)
+        )
+    for text, results in analyzed:
+        results_by_text[text] = results
+        if cache is not None:
+            cache.put(analysis_key(fingerprint, entities, language, text), results)
+    return results_by_text
+
+
+def scan_cells(analyzer, df, entities, language="pt", batch_size=DEFAULT_BATCH_SIZE, columns=None, cache=analysis_cache, column_entities=None):
+    """Analisa as células em lotes (nlp.pipe) e gera (índice, coluna, texto, resultados) das que têm achados.
+
+    Valores repetidos são analisados uma vez e o resultado é replicado para todas as células que os contêm.
+    column_entities permite restringir as entidades de colunas específicas (ver profiler.plan_scan).
+    """
+    column_entities = column_entities or {}
+    cells = list(iter_text_cells(df, columns))
+    texts_by_entities = {}
+    for _, col_name, text in cells:
+        entities_key = tuple(column_entities.get(col_name, entities) or ())
+        texts_by_entities.setdefault(entities_key, []).append(text)
+
+    results_by_key = {}
+    for entities_key, texts in texts_by_entities.items():
+        group_results = analyze_distinct(analyzer, texts, list(entities_key) or None, language, batch_size, cache)
+        for text, results in group_results.items():
+            results_by_key[entities_key, text] = results
+
+    for index, col_name, text in cells:
+        results = results_by_key[tuple(column_entities.get(col_name, entities) or ()), text]
+        if results:
+            yield index, col_name, text, results
+
+
+def scan_dataframe(analyzer, df, entities, language="pt", batch_size=DEFAULT_BATCH_SIZE, columns=None, cache=analysis_cache, profile=None):
+    """Retorna um achado por resultado, no formato usado pelos relatórios dos apps.
+
+    Com um perfil (profiler.profile_dataframe), colunas skip são ignoradas e colunas pattern
+    são analisadas só com as entidades de padrão.
+    """
+    column_entities = None
+    if profile is not None:
+        columns, column_entities = plan_scan(analyzer, profile, entities, language)
+    findings = []
+    for index, col_name, text, results in scan_cells(analyzer, df, entities, language, batch_size, columns, cache, column_entities):
+        for result in results:
+            findings.append({
+                "row": index,
+                "column": col_name,
+                "text": text,
+                "type": result.entity_type,
+                "start": result.start,
+                "end": result.end,
+                "score": result.score,
+            })
+    return findings
+
+
+# --- Referência: loop célula a célula ---
+def scan_dataframe_per_cell(analyzer, df, entities, language="pt"):
+    """Implementação antiga (uma chamada analyze() por célula), mantida para comparação."""
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    findings = []
+    for index, row in df.iterrows():
+        for col_name, cell_value in row.items():
+            if cell_value and isinstance(cell_value, str):
+                for result in analyzer.analyze(text=cell_value, language=language, entities=entities):
+                    findings.append({
+                        "row": index,
+                        "column": col_name,
+                        "text": cell_value,
+                        "type": result.entity_type,
+                        "start": result.start,
+                        "end": result.end,
+                        "score": result.score,
+                    })
+    return findings
@@ -0,0 +1,372 @@
+"""Serviço local de varredura: um processo com o analisador aquecido, chamado pelos apps via HTTP (localhost).
+
+Cada worker do Streamlit deixa de carregar o próprio modelo para checar prompts: todos enviam o
+texto a este serviço. As requisições que chegam com poucos milissegundos de diferença são reunidas
+num lote e analisadas numa única chamada ao pipeline (nlp.pipe); a fila tem limite, e quando ela
+enche o serviço responde 503 em vez de acumular trabalho (o cliente tenta de novo com espera).
+
+Endpoints (JSON):
+    POST /analyze    {"text", "entities"?, "language"?} -> {"results": [{"entity_type", "start", "end", "score"}]}
+    POST /anonymize  idem + "operators"? ({"TIPO" ou "DEFAULT": {"type": "replace", ...}}) -> {"text", "results"}
+    GET  /health     contadores do serviço (requisições, lotes, recusas, tamanho da fila)
+
+Uso (a partir da raiz do repositório):
+    python -m privacy_partner.service --port 8765 --config full
+e nos apps: PRIVACY_PARTNER_SCAN_SERVICE=http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer.entities import OperatorConfig
+
+from privacy_partner.anonymize import SpanAnonymizer
+from privacy_partner.engines import ANALYZER_CONFIGS, DEFAULT_CONFIG, build_analyzer, warm_up
+from privacy_partner.scanner import analyze_distinct
+from privacy_partner.vault import PseudonymVault
+from privacy_partner.windowed import DEFAULT_WINDOW_CHARS, analyze_long_text
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_WAIT_MS = 5  # quanto o primeiro pedido de um lote espera por companhia
+DEFAULT_MAX_BATCH = 64
+DEFAULT_QUEUE_LIMIT = 256  # pedidos aguardando análise; acima disso, 503
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServiceOverloaded(Exception):
+    """A fila do serviço está cheia."""
+
+
+class ScanServiceError(Exception):
+    """O serviço de varredura não respondeu ou recusou o pedido."""
+
+
+# --- Serialização ---
+def results_to_json(results):
+    return [{"entity_type": r.entity_type, "start": r.start, "end": r.end, "score": round(r.score, 4)} for r in results]
+
+
+def results_from_json(items):
+    return [RecognizerResult(item["entity_type"], item["start"], item["end"], item["score"]) for item in items]
+
+
+def operators_to_json(operators):
+    return {entity: {"type": config.operator_name, **(config.params or {})} for entity, config in (operators or {}).items()}
+
+
+def operators_from_json(items):
+    operators = {}
+    for entity, params in (items or {}).items():
+        params = dict(params)
+        operators[entity] = OperatorConfig(params.pop("type"), params)
+    return operators
+
+
+# --- Micro-lotes ---
+class MicroBatcher:
+    """Fila limitada de pedidos de análise, consumida em lotes por uma única thread de análise.
+
+    O primeiro pedido de um lote espera até batch_wait_ms por outros (ou até max_batch); enquanto um
+    lote está sendo analisado os pedidos seguintes se acumulam, então sob carga os lotes crescem
+    sozinhos. Textos com as mesmas entidades e idioma vão juntos para scanner.analyze_distinct
+    (um nlp.pipe por grupo, com o cache LRU); textos longos passam pelo analyze_long_text.
+    """
+
+    def __init__(self, analyzer, max_batch=DEFAULT_MAX_BATCH, batch_wait_ms=DEFAULT_BATCH_WAIT_MS, queue_limit=DEFAULT_QUEUE_LIMIT):
+        self.analyzer = analyzer
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait_ms / 1000
+        self.queue = asyncio.Queue(maxsize=queue_limit)
+        # Uma thread só: o analisador (spaCy) nunca é usado por duas análises ao mesmo tempo
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="privacy-partner-service")
+        self.stats = {"requests": 0, "rejected": 0, "batches": 0, "batched_texts": 0}
+
+    async def analyze(self, text, entities=None, language="pt"):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((text, tuple(entities) if entities else None, language, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise ServiceOverloaded() from None
+        self.stats["requests"] += 1
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Pedidos cujo cliente já desistiu não são analisados
+            batch = [item for item in batch if not item[3].done()]
+            if not batch:
+                continue
+            self.stats["batches"] += 1
+            self.stats["batched_texts"] += len(batch)
+            outcomes = await loop.run_in_executor(self._executor, self._analyze_batch, [item[:3] for item in batch])
+            for (_, _, _, future), outcome in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+
+    def _analyze_batch(self, requests):
+        """Recebe (texto, entidades, idioma) e retorna, na mesma ordem, os resultados (ou a exceção) de cada um."""
+        outcomes = [None] * len(requests)
+        groups = {}
+        for position, (text, entities, language) in enumerate(requests):
+            if len(text) > DEFAULT_WINDOW_CHARS:
+                try:
+                    outcomes[position] = analyze_long_text(self.analyzer, text, list(entities) if entities else None, language)
+                except Exception as error:
+                    outcomes[position] = error
+            else:
+                groups.setdefault((entities, language), []).append(position)
+        for (entities, language), positions in groups.items():
+            try:
+                results_by_text = analyze_distinct(self.analyzer, [requests[p][0] for p in positions], list(entities) if entities else None, language)
+                for position in positions:
+                    outcomes[position] = results_by_text[requests[position][0]]
+            except Exception as error:
+                for position in positions:
+                    outcomes[position] = error
+        return outcomes
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Servidor ---
+class ScanService:
+    """Servidor HTTP/1.1 mínimo (asyncio, conexões keep-alive) na frente de um MicroBatcher."""
+
+    def __init__(self, analyzer, vault=None, **batcher_kwargs):
+        self.analyzer = analyzer
+        self.vault = vault
+        self.batcher_kwargs = batcher_kwargs
+        self.batcher = None
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        # O batcher é criado aqui para que a fila pertença ao event loop do servidor
+        self.batcher = MicroBatcher(self.analyzer, **self.batcher_kwargs)
+        worker = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+            self.batcher.shutdown()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    self._write_response(writer, 413, {"error": f"Corpo maior que {MAX_BODY_BYTES} bytes"}, keep_alive=False)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method, path.split("?")[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # cliente desconectou ou mandou uma requisição malformada
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {**self.batcher.stats, "queued": self.batcher.queue.qsize()}
+        if path not in ("/analyze", "/anonymize"):
+            return 404, {"error": f"Endpoint desconhecido: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST"}
+        # Todo o pedido é validado antes da análise: só erros daqui viram 400; uma exceção do
+        # analisador ou do cofre é falha do serviço (500), não do pedido
+        try:
+            request = json.loads(body or b"{}")
+            text, entities, language = request["text"], request.get("entities"), request.get("language", "pt")
+            if not isinstance(text, str) or not isinstance(language, str):
+                raise TypeError("text e language devem ser strings")
+            if entities is not None and not (isinstance(entities, list) and all(isinstance(e, str) for e in entities)):
+                raise TypeError("entities deve ser uma lista de strings")
+            anonymizer = None
+            if path == "/anonymize":
+                anonymizer = SpanAnonymizer(operators_from_json(request.get("operators")), vault=self.vault)
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            return 400, {"error": f"Pedido inválido: {error!r}"}
+
+        try:
+            results = await self.batcher.analyze(text, entities, language)
+            if anonymizer is None:
+                return 200, {"results": results_to_json(results)}
+            # Com pseudonymize o cofre (SQLite) é consultado: fora do event loop
+            rewritten = await asyncio.get_running_loop().run_in_executor(None, anonymizer.rewrite, [(None, None, text, results)])
+            return 200, {"text": rewritten[text], "results": results_to_json(results)}
+        except ServiceOverloaded:
+            return 503, {"error": "Fila de análise cheia, tente novamente"}
+        except Exception as error:
+            return 500, {"error": repr(error)}
+
+
+# --- Cliente ---
+def _retry_after(response, limit):
+    """Segundos pedidos pelo Retry-After do servidor (0 se ausente ou em formato de data), até limit."""
+    try:
+        return min(max(float(response.getheader("Retry-After", 0)), 0.0), limit)
+    except ValueError:
+        return 0.0
+
+
+class ScanClient:
+    """Cliente do ScanService para os apps: uma conexão keep-alive por thread.
+
+    Falhas de conexão e respostas 503 são repetidas até `retries` vezes, com espera crescente; num
+    503 a espera é a do Retry-After do servidor (limitada a max_retry_wait). Depois disso é levantado
+    ScanServiceError (quem chama decide: os apps bloqueiam o prompt).
+    """
+
+    def __init__(self, url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=30.0, retries=3, backoff=0.05, max_retry_wait=5.0):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname or DEFAULT_HOST
+        self.port = parts.port or DEFAULT_PORT
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_wait = max_retry_wait
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def _discard_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json; charset=utf-8"} if body is not None else {}
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                connection = self._connection()
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as error:
+                # Inclui a conexão keep-alive fechada pelo servidor entre dois pedidos
+                self._discard_connection()
+                if attempt == self.retries:
+                    raise ScanServiceError(f"Serviço de varredura indisponível em {self.url}: {error!r}") from error
+            else:
+                if response.status == 200:
+                    return json.loads(data)
+                if response.status != 503 or attempt == self.retries:
+                    raise ScanServiceError(f"Serviço de varredura respondeu {response.status}: {data.decode('utf-8', 'replace')}")
+                delay = max(delay, _retry_after(response, self.max_retry_wait))
+            time.sleep(delay)
+
+    def analyze(self, text, entities=None, language="pt"):
+        """Como analyzer.analyze(): lista de RecognizerResult com offsets relativos a text."""
+        response = self._request("POST", "/analyze", {"text": text, "entities": entities, "language": language})
+        return results_from_json(response["results"])
+
+    def anonymize(self, text, entities=None, operators=None, language="pt"):
+        """Retorna (texto anonimizado, resultados); operators no formato do AnonymizerEngine ({"TIPO": OperatorConfig})."""
+        response = self._request("POST", "/anonymize", {
+            "text": text, "entities": entities, "language": language, "operators": operators_to_json(operators),
+        })
+        return response["text"], results_from_json(response["results"])
+
+    def health(self):
+        return self._request("GET", "/health")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default=DEFAULT_HOST, help="endereço de escuta (padrão: só localhost)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--config", choices=sorted(ANALYZER_CONFIGS), default=os.environ.get("PRIVACY_PARTNER_ANALYZER_CONFIG", DEFAULT_CONFIG))
+    parser.add_argument("--terms", default=os.environ.get("PRIVACY_PARTNER_TERMS"), help="lista de termos de negócio (um por linha)")
+    parser.add_argument("--vault", default=os.environ.get("PRIVACY_PARTNER_VAULT"), help="cofre para o operador pseudonymize")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument("--batch-wait-ms", type=float, default=DEFAULT_BATCH_WAIT_MS)
+    parser.add_argument("--queue-limit", type=int, default=DEFAULT_QUEUE_LIMIT)
+    args = parser.parse_args(argv)
+
+    analyzer = build_analyzer(args.config, terms_path=args.terms)
+    # O modelo é carregado e aquecido antes de aceitar conexões: o primeiro prompt não paga o custo
+    warm_up(analyzer)
+    service = ScanService(
+        analyzer, vault=PseudonymVault(args.vault) if args.vault else None,
+        max_batch=args.max_batch, batch_wait_ms=args.batch_wait_ms, queue_limit=args.queue_limit,
+    )
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready=lambda address: print(f"Serviço de varredura em http://{address[0]}:{address[1]}")))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+import os
+import pickle
+import re
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from privacy_partner.cache import TTLCache
+
+# Um diretório por usuário: o armazém guarda dados dos arquivos enviados e pickles
+DEFAULT_STORE_DIR = os.path.join(tempfile.gettempdir(), f"privacy_partner_store-{os.getuid()}" if hasattr(os, "getuid") else "privacy_partner_store")
+DEFAULT_TTL = 3600
+DEFAULT_MEMORY_BYTES = 512 * 1024 * 1024
+DEFAULT_DISK_BYTES = 4 * 1024 * 1024 * 1024
+
+# As chaves viram nomes de arquivo: só caracteres seguros (ex.: "context-<sha256>")
+KEY_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+FRAME_SUFFIX = ".arrow"
+OBJECT_SUFFIX = ".pkl"
+
+
+# --- Tamanho Estimado ---
+def _weight(item):
+    # Peso de um item na extrapolação: 1, mais os elementos se ele for uma coleção
+    return 1 + len(item) if isinstance(item, (dict, list, tuple, set)) else 1
+
+
+def estimate_size(value, sample=100, _seen=None):
+    """Bytes aproximados de um valor guardado na sessão; coleções grandes são estimadas por amostra.
+
+    Objetos comuns (ex.: context.FileContext) somam os atributos, cada objeto contado uma vez. Numa
+    coleção grande a amostra é extrapolada pelo número de elementos de cada item, e não pelo número
+    de itens: um índice invertido tem poucas listas enormes e muitas pequenas.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        items = [item for pair in value.items() for item in pair]
+    elif isinstance(value, (list, tuple, set)):
+        items = list(value)
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        _seen = set() if _seen is None else _seen
+        if id(value) in _seen:
+            return 0
+        _seen.add(id(value))
+        return sys.getsizeof(value) + estimate_size(vars(value), sample, _seen)
+    else:
+        return sys.getsizeof(value)
+    if len(items) <= sample:
+        return sys.getsizeof(value) + sum(estimate_size(item, sample, _seen) for item in items)
+    # Amostra espaçada ao longo da coleção: as primeiras entradas nem sempre são típicas
+    sampled = items[::len(items) // sample][:sample]
+    sampled_bytes = sum(estimate_size(item, sample, _seen) for item in sampled)
+    total_weight = sum(_weight(item) for item in items)
+    return sys.getsizeof(value) + sampled_bytes * total_weight // sum(_weight(item) for item in sampled)
+
+
+# --- Diretório Privado ---
+def private_dir(root):
+    """Cria (ou confere) o diretório do armazém: precisa ser do usuário atual e fechado para os outros (0700).
+
+    Um diretório de outro usuário (ex.: criado antes, de propósito, num /tmp compartilhado) ou um link
+    simbólico levantam PermissionError em vez de serem usados.
+    """
+    os.makedirs(root, mode=0o700, exist_ok=True)
+    info = os.lstat(root)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"O armazém precisa ser um diretório, não um link ou arquivo: {root}")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"O diretório do armazém pertence a outro usuário: {root}")
+        if info.st_mode & 0o077:
+            # Diretório nosso, de uma versão anterior: só fecha as permissões
+            os.chmod(root, 0o700)
+    return root
+
+
+# --- Armazém de Artefatos ---
+class ArtifactStore:
+    """Armazém compartilhado, por processo, para artefatos grandes das sessões (tabelas, contextos).
+
+    A sessão guarda só a chave (o "handle"); a mesma chave, derivada do hash do conteúdo, é
+    compartilhada por todas as sessões que enviarem o mesmo arquivo. Os valores ficam numa camada em
+    memória limitada (TTLCache) e, com persist=True, em disco, num diretório privado do usuário
+    (private_dir): DataFrames em Arrow IPC e outros objetos em pickle. Só são lidos de volta os
+    pickles escritos por este processo; um .pkl deixado por outro é tratado como ausente. As duas
+    camadas expiram por TTL desde o último acesso e por orçamento de bytes; get() devolve None para
+    o que já saiu, e quem chamou reconstrói o artefato a partir do arquivo original.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, ttl=DEFAULT_TTL, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.disk_bytes = disk_bytes
+        self.memory = TTLCache(ttl=ttl, max_entries=10_000, max_bytes=memory_bytes)
+        self._lock = threading.Lock()
+        self._files = {}  # chave -> (caminho, bytes, último acesso)
+        self._sessions = {}  # id da sessão -> {chave: último acesso}
+        self._pickled = set()  # chaves dos pickles escritos por este processo, os únicos que get() carrega
+        # O diretório só é criado no primeiro put que vá ao disco (importar o módulo não mexe no /tmp)
+        self._root_ready = False
+        self._root_lock = threading.Lock()
+
+    def _open_root(self, create):
+        """Confere o diretório (private_dir) e carrega o índice na primeira vez que o disco é usado.
+
+        Com create=False (leituras) um diretório que ainda não existe não é criado; retorna se ele está em uso.
+        """
+        if self._root_ready:
+            return True
+        with self._root_lock:
+            if not self._root_ready:
+                if not create and not os.path.isdir(self.root):
+                    return False
+                private_dir(self.root)
+                self._load_index()
+                self._root_ready = True
+        return True
+
+    def _load_index(self):
+        # Outros processos (ou uma execução anterior) podem ter deixado arquivos no diretório. Eles entram
+        # no índice para contar no orçamento e expirar; os pickles, porém, nunca são carregados (ver get)
+        for name in os.listdir(self.root):
+            key, suffix = os.path.splitext(name)
+            if suffix in (FRAME_SUFFIX, OBJECT_SUFFIX):
+                path = os.path.join(self.root, name)
+                info = os.stat(path)
+                with self._lock:
+                    self._files.setdefault(key, (path, info.st_size, info.st_mtime))
+
+    def _path(self, key, value):
+        if not KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Chave inválida para o armazém: {key!r}")
+        suffix = FRAME_SUFFIX if isinstance(value, pd.DataFrame) else OBJECT_SUFFIX
+        return os.path.join(self.root, key + suffix)
+
+    # --- Escrita e Leitura ---
+    def put(self, key, value, session_id=None, persist=True):
+        """Guarda o valor (se a chave ainda não existir) e retorna a chave, que é o handle da sessão.
+
+        Com persist=False o valor fica só na camada em memória e nunca vai para o disco (ex.: dados
+        brutos ainda não anonimizados).
+        """
+        if key not in self and not persist:
+            if not KEY_PATTERN.fullmatch(key):
+                raise ValueError(f"Chave inválida para o armazém: {key!r}")
+            self.memory.put(key, value, size=estimate_size(value))
+        elif key not in self:
+            path = self._path(key, value)
+            self._open_root(create=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if isinstance(value, pd.DataFrame):
+                table = pa.Table.from_pandas(value, preserve_index=True)
+                with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            else:
+                with open(temporary, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            # Troca atômica: leitores de outros processos nunca veem um arquivo pela metade
+            os.replace(temporary, path)
+            with self._lock:
+                self._files[key] = (path, os.path.getsize(path), time.time())
+                if path.endswith(OBJECT_SUFFIX):
+                    self._pickled.add(key)
+            # A camada em memória guarda o objeto vivo: o orçamento dela usa o tamanho em memória, não o do arquivo
+            self.memory.put(key, value, size=estimate_size(value))
+            self.sweep()
+        if session_id is not None:
+            self.attach(session_id, key)
+        return key
+
+    def get(self, key, session_id=None):
+        if key is None:
+            return None
+        if session_id is not None:
+            self.attach(session_id, key)
+        value = self.memory.get(key)
+        if value is not None:
+            self._touch(key)
+            return value
+        if not self._open_root(create=False):
+            return None
+        with self._lock:
+            entry = self._readable_entry(key)
+        if entry is None:
+            return None
+        path, _, _ = entry
+        if path.endswith(FRAME_SUFFIX):
+            # O memory map evita ler o arquivo inteiro num buffer à parte, mas o to_pandas() ainda copia:
+            # as colunas de texto viram objetos str do Python no heap deste processo
+            table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+            value = table.to_pandas()
+        else:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        self._touch(key)
+        self.memory.put(key, value, size=estimate_size(value))
+        return value
+
+    def __contains__(self, key):
+        if key in self.memory:
+            return True
+        if not self._open_root(create=False):
+            return False
+        with self._lock:
+            return self._readable_entry(key) is not None
+
+    def _readable_entry(self, key):
+        # Chamado com o lock: pickle.load executa código, então só vale o que este processo escreveu
+        entry = self._files.get(key)
+        if entry is None or not os.path.exists(entry[0]):
+            return None
+        if entry[0].endswith(OBJECT_SUFFIX) and key not in self._pickled:
+            return None
+        return entry
+
+    def _touch(self, key):
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is not None:
+                self._files[key] = (entry[0], entry[1], time.time())
+
+    # --- Expiração ---
+    def sweep(self):
+        """Remove do disco o que passou do TTL e, se o total passar do orçamento, os menos acessados."""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, _, accessed) in self._files.items() if accessed + self.ttl < now]
+            by_access = sorted(self._files.items(), key=lambda item: item[1][2])
+            total = sum(size for _, size, _ in self._files.values())
+            for key, (_, size, _) in by_access:
+                if total <= self.disk_bytes:
+                    break
+                if key not in expired:
+                    expired.append(key)
+                    total -= size
+            removed = [self._files.pop(key) for key in expired]
+            self._pickled.difference_update(expired)
+            for sessions in self._sessions.values():
+                for key in expired:
+                    sessions.pop(key, None)
+            # Sessões sem acesso há mais de um TTL são consideradas encerradas
+            for session_id in [sid for sid, keys in self._sessions.items() if not keys or max(keys.values()) + self.ttl < now]:
+                del self._sessions[session_id]
+        for path, _, _ in removed:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(removed)
+
+    # --- Uso de Memória ---
+    def attach(self, session_id, key):
+        with self._lock:
+            self._sessions.setdefault(session_id, {})[key] = time.time()
+
+    def usage(self):
+        """Totais do processo: bytes e entradas em memória e em disco, e sessões ativas."""
+        memory_stats = self.memory.stats()
+        with self._lock:
+            disk = sum(size for _, size, _ in self._files.values())
+            return {
+                "memory_bytes": memory_stats["bytes"],
+                "memory_entries": memory_stats["size"],
+                "disk_bytes": disk,
+                "disk_entries": len(self._files),
+                "sessions": len(self._sessions),
+            }
+
+    def session_usage(self, session_id):
+        """Linhas (chave, bytes, compartilhada com quantas sessões) dos artefatos de uma sessão."""
+        with self._lock:
+            keys = list(self._sessions.get(session_id, {}))
+            rows = []
+            for key in keys:
+                entry = self._files.get(key)
+                owners = sum(1 for sessions in self._sessions.values() if key in sessions)
+                rows.append({"key": key, "bytes": entry[1] if entry else 0, "shared_with": owners})
+        return rows
+
+
+def session_state_usage(session_state):
+    """Bytes estimados de cada valor do st.session_state, do maior para o menor."""
+    rows = [{"key": str(key), "bytes": estimate_size(value)} for key, value in session_state.items()]
+    return sorted(rows, key=lambda row: row["bytes"], reverse=True)
+
+
+# Armazém global do processo; diretório e limites configuráveis por variável de ambiente
+artifact_store = ArtifactStore(
+    root=os.environ.get("PRIVACY_PARTNER_STORE", DEFAULT_STORE_DIR),
+    ttl=int(os.environ.get("PRIVACY_PARTNER_STORE_TTL", DEFAULT_TTL)),
+    memory_bytes=int(os.environ.get("PRIVACY_PARTNER_STORE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)),
+    disk_bytes=int(os.environ.get("PRIVACY_PARTNER_STORE_DISK_BYTES", DEFAULT_DISK_BYTES)),
+)
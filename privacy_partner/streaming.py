@@ -0,0 +1,154 @@
+import os
+
+import pandas as pd
+
+from privacy_partner.findings import FindingsStore
+from privacy_partner.ingest import open_chunks
+from privacy_partner.metrics import metrics
+from privacy_partner.profiler import FULL_NLP, PATTERN_ONLY, SKIP, profile_dataframe
+from privacy_partner.scanner import scan_dataframe
+
+DEFAULT_CHUNKSIZE = 20_000
+
+# Modos de varredura do arquivo
+GATE = "gate"  # para no primeiro bloco com achado: o chat só precisa saber se deve travar
+REPORT = "report"  # percorre o arquivo inteiro e coleta todos os achados
+
+_MODE_RANK = {SKIP: 0, PATTERN_ONLY: 1, FULL_NLP: 2}
+
+# Linha dos achados no cabeçalho: nos relatórios (linha do arquivo = row + 2) vira a linha 1
+HEADER_ROW = -1
+
+
+def _source_size(source):
+    """Tamanho em bytes do objeto de arquivo, ou None se não der para saber."""
+    size = getattr(source, "size", None)
+    if size is None and hasattr(source, "seek") and hasattr(source, "tell"):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    return size
+
+
+def merge_profiles(merged, profile):
+    """Acumula os perfis dos blocos mantendo, por coluna, o modo mais completo já visto."""
+    by_column = {column_profile["column"]: column_profile for column_profile in merged}
+    for column_profile in profile:
+        current = by_column.get(column_profile["column"])
+        if current is None:
+            merged.append(dict(column_profile))
+            by_column[column_profile["column"]] = merged[-1]
+        elif _MODE_RANK[column_profile["mode"]] > _MODE_RANK[current["mode"]]:
+            current.update(column_profile)
+    return merged
+
+
+# --- Varredura em Blocos ---
+def _profile_chunk(chunk, exhaustive):
+    with metrics.phase("profile"):
+        return profile_dataframe(chunk, exhaustive=exhaustive)
+
+
+def _scan_chunk(analyzer, chunk, entities, chunk_profile):
+    with metrics.phase("scan"):
+        return scan_dataframe(analyzer, chunk, entities, profile=chunk_profile)
+
+
+def _scan_headers(analyzer, columns, entities, pool):
+    """Achados nos nomes das colunas, que também chegam ao modelo (antes, pelo df.to_string())."""
+    headers = pd.DataFrame([[str(column) for column in columns]], columns=range(len(columns)), index=[HEADER_ROW])
+    with metrics.phase("scan"):
+        if pool is not None:
+            findings = pool.scan_dataframe(headers, entities)
+        else:
+            findings = scan_dataframe(analyzer, headers, entities)
+    return [{**finding, "column": columns[finding["column"]]} for finding in findings]
+
+
+def _scan_chunks(analyzer, chunks, entities, mode, exhaustive, progress, pool, fraction_read, profile=None, columns=None):
+    """Laço comum das varreduras em blocos: perfil, varredura e progresso de cada bloco.
+
+    columns, se informado (todas as colunas, inclusive as descartadas pelo ingest), tem o cabeçalho
+    varrido antes do primeiro bloco: um arquivo sem linhas de dados também tem os nomes checados.
+    Sem ele, os nomes vêm do primeiro bloco.
+    """
+    profile = list(profile or [])
+    # Colunas descartadas pelo ingest também têm nome: entram na varredura do cabeçalho
+    skipped_columns = [column_profile["column"] for column_profile in profile]
+    findings = FindingsStore()
+    rows = 0
+    complete = True
+    headers_scanned = columns is not None
+    if headers_scanned:
+        findings.extend(_scan_headers(analyzer, columns, entities, pool))
+    # Cada bloco tem seu perfil: o dtype de uma coluna pode mudar ao longo do arquivo
+    profiled = ((chunk, _profile_chunk(chunk, exhaustive)) for chunk in metrics.timed_iter(chunks, "read"))
+    if pool is None:
+        scanned = ((chunk, chunk_profile, _scan_chunk(analyzer, chunk, entities, chunk_profile)) for chunk, chunk_profile in profiled)
+    else:
+        scanned = pool.imap_chunks(profiled, entities)
+
+    for chunk, chunk_profile, chunk_findings in scanned:
+        if not headers_scanned:
+            findings.extend(_scan_headers(analyzer, list(chunk.columns) + skipped_columns, entities, pool))
+            headers_scanned = True
+        merge_profiles(profile, chunk_profile)
+        findings.extend(chunk_findings)
+        rows += len(chunk)
+        if progress is not None:
+            progress(fraction_read(), rows)
+        if mode == GATE and findings:
+            complete = False
+            break
+    # Fecha já o gerador: com um pool, os blocos ainda na fila são cancelados em vez de varridos à toa
+    scanned.close()
+
+    if progress is not None and complete:
+        progress(1.0, rows)
+    return {"findings": findings, "profile": profile, "rows": rows, "complete": complete}
+
+
+def _fraction_read(source):
+    size = _source_size(source)
+
+    def fraction_read():
+        if not size or not hasattr(source, "tell"):
+            return None
+        # Os parsers leem à frente em buffers, então a posição é uma aproximação
+        return min(source.tell() / size, 1.0)
+
+    return fraction_read
+
+
+def scan_csv_stream(analyzer, source, entities, mode=REPORT, chunksize=DEFAULT_CHUNKSIZE, encoding="latin-1", exhaustive=False, progress=None, pool=None, **read_csv_kwargs):
+    """Lê o CSV em blocos de tamanho fixo e varre cada bloco assim que chega.
+
+    A memória fica limitada a um bloco (mais os achados, no modo report). progress, se informado,
+    é chamado como progress(fração_lida, linhas_varridas) após cada bloco; a fração é None quando
+    o tamanho da fonte é desconhecido. Com pool (parallel.ParallelScanner) os blocos são varridos
+    em outros processos e analyzer pode ser None. Os achados voltam num findings.FindingsStore.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            return scan_csv_stream(analyzer, handle, entities, mode, chunksize, encoding, exhaustive, progress, pool, **read_csv_kwargs)
+
+    with pd.read_csv(source, encoding=encoding, chunksize=chunksize, **read_csv_kwargs) as reader:
+        return _scan_chunks(analyzer, reader, entities, mode, exhaustive, progress, pool, _fraction_read(source))
+
+
+def scan_file_stream(analyzer, source, entities, name=None, mode=REPORT, encoding=None, exhaustive=False, progress=None, pool=None):
+    """Como scan_csv_stream, mas lendo CSV, Parquet ou XLSX pelo Arrow (ver ingest.open_chunks).
+
+    O formato vem da extensão de name (ou dos primeiros bytes) e a codificação do CSV, se não
+    informada, de uma amostra. No Parquet, colunas booleanas e de data não são lidas; elas aparecem
+    no perfil como skip. No CSV todas as colunas são lidas como texto e o perfil de cada bloco decide. Os nomes das colunas também são varridos (achados na linha HEADER_ROW).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as handle:
+            return scan_file_stream(analyzer, handle, entities, name or os.fspath(source), mode, encoding, exhaustive, progress, pool)
+
+    # O tamanho é medido (seek até o fim e volta) antes de abrir o leitor: depois disso a leitura
+    # antecipada do Arrow já está consumindo a fonte em outra thread
+    fraction_read = _fraction_read(source)
+    chunks, columns, skipped_profile = open_chunks(source, name, encoding, exhaustive)
+    return _scan_chunks(analyzer, chunks, entities, mode, exhaustive, progress, pool, fraction_read, skipped_profile, columns)
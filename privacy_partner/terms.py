@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from array import array
+
+from presidio_analyzer import EntityRecognizer, RecognizerResult
+
+BUSINESS_TERM = "BUSINESS_TERM"
+DEFAULT_SCORE = 0.9  # casamento exato com um termo cadastrado: tão confiável quanto o regex do CPF
+DEFAULT_CHECK_SECONDS = 5.0  # intervalo mínimo entre verificações de mudança no arquivo de termos
+
+_CHAR_SHIFT = 21  # ord() de qualquer caractere Unicode cabe em 21 bits
+
+
+# --- Normalização ---
+_folded = {}
+
+
+def fold_char(char):
+    """Minúsculas sem acentos ("Ç" -> "c", "É" -> "e"); todo espaço vira " ". Pode gerar 0 ou 2+ caracteres."""
+    folded = _folded.get(char)
+    if folded is None:
+        if char.isspace():
+            folded = " "
+        else:
+            decomposed = unicodedata.normalize("NFD", char.casefold())
+            folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+        _folded[char] = folded
+    return folded
+
+
+def normalize_term(term):
+    """Forma normalizada de um termo: dobrado caractere a caractere, com espaços internos colapsados."""
+    return " ".join("".join(fold_char(char) for char in term).split())
+
+
+def normalize_with_offsets(text):
+    """(texto normalizado, posição no original de cada caractere normalizado); espaços seguidos viram um só."""
+    if text.isascii():
+        normalized = "".join(" " if char.isspace() else char for char in text.lower())
+        if "  " not in normalized:
+            # Caso comum: um caractere para um, sem precisar de mapa
+            return normalized, None
+    parts = []
+    offsets = array("i")
+    previous = ""
+    for position, char in enumerate(text):
+        folded = fold_char(char)
+        if folded == " " and previous == " ":
+            continue
+        parts.append(folded)
+        offsets.extend([position] * len(folded))
+        previous = folded or previous
+    return "".join(parts), offsets
+
+
+# --- Autômato ---
+class TermAutomaton:
+    """Autômato de Aho–Corasick sobre termos já normalizados: acha todas as ocorrências numa única passada.
+
+    As transições ficam num único dict com chave inteira (nó << 21 | ord(caractere)) e os links de
+    falha e de saída em arrays, o que cabe em memória com centenas de milhares de termos, ao contrário
+    de um dict por nó ou de uma regex em alternância.
+    """
+
+    def __init__(self, terms):
+        goto = {}
+        lengths = array("i", [0])  # tamanho do termo que termina no nó (0: nenhum)
+        for term in terms:
+            node = 0
+            for char in term:
+                key = node << _CHAR_SHIFT | ord(char)
+                child = goto.get(key)
+                if child is None:
+                    child = len(lengths)
+                    goto[key] = child
+                    lengths.append(0)
+                node = child
+            lengths[node] = len(term)
+
+        children = [[] for _ in range(len(lengths))]
+        for key, child in goto.items():
+            children[key >> _CHAR_SHIFT].append((key & ((1 << _CHAR_SHIFT) - 1), child))
+
+        # Busca em largura: o link de falha de um nó é o maior sufixo próprio que também é prefixo de algum termo
+        fail = array("i", [0]) * len(lengths)
+        output = array("i", [0]) * len(lengths)  # próximo nó, pela cadeia de falhas, em que termina um termo
+        queue = [child for _, child in children[0]]
+        for node in queue:
+            for code, child in children[node]:
+                state = fail[node]
+                while state and (state << _CHAR_SHIFT | code) not in goto:
+                    state = fail[state]
+                target = goto.get(state << _CHAR_SHIFT | code, 0)
+                fail[child] = target if target != child else 0
+                output[child] = fail[child] if lengths[fail[child]] else output[fail[child]]
+                queue.append(child)
+
+        self.goto = goto
+        self.fail = fail
+        self.output = output
+        self.lengths = lengths
+        self.size = sum(1 for length in lengths if length)
+
+    def iter_matches(self, text):
+        """Gera (início, fim) de cada ocorrência de termo em text (já normalizado), inclusive sobrepostas."""
+        goto, fail, output, lengths = self.goto, self.fail, self.output, self.lengths
+        node = 0
+        for position, char in enumerate(text):
+            code = ord(char)
+            while node and (node << _CHAR_SHIFT | code) not in goto:
+                node = fail[node]
+            node = goto.get(node << _CHAR_SHIFT | code, 0)
+            match = node if lengths[node] else output[node]
+            while match:
+                yield position + 1 - lengths[match], position + 1
+                match = output[match]
+
+
+def _is_word_char(text, position):
+    return 0 <= position < len(text) and text[position].isalnum()
+
+
+def find_terms(automaton, text):
+    """Ocorrências de termos inteiros (não dentro de outra palavra), preferindo as mais longas, em offsets do original."""
+    normalized, offsets = normalize_with_offsets(text)
+    matches = []
+    for start, end in automaton.iter_matches(normalized):
+        if _is_word_char(normalized, start) and _is_word_char(normalized, start - 1):
+            continue
+        if _is_word_char(normalized, end - 1) and _is_word_char(normalized, end):
+            continue
+        matches.append((start, end))
+
+    spans = []
+    last_end = 0
+    for start, end in sorted(matches, key=lambda match: (match[0], -match[1])):
+        if start >= last_end:
+            spans.append((start, end) if offsets is None else (offsets[start], offsets[end - 1] + 1))
+            last_end = end
+    return spans
+
+
+def load_terms(path):
+    """Termos de um arquivo UTF-8, um por linha; linhas vazias e comentários (#) são ignorados."""
+    with open(path, encoding="utf-8-sig") as f:
+        terms = (normalize_term(line) for line in f if line.strip() and not line.lstrip().startswith("#"))
+        return sorted({term for term in terms if term})
+
+
+# --- Reconhecedor ---
+class BusinessTermRecognizer(EntityRecognizer):
+    """Reconhece termos de negócio (nomes de projetos, fórmulas...) de uma lista grande, sem regex.
+
+    O arquivo de termos (um por linha) vira um TermAutomaton; maiúsculas e acentos são ignorados
+    ("Projeto Aurora" casa "PROJETO AURORA" e "projeto áurora"). Quando o arquivo muda, um novo
+    autômato é montado numa thread e trocado de uma vez, sem reiniciar o analisador; até lá o
+    anterior continua respondendo. Não depende do spaCy, então o caminho rápido continua valendo.
+    """
+
+    NEEDS_NLP = False
+
+    def __init__(self, path, supported_entity=BUSINESS_TERM, score=DEFAULT_SCORE, check_seconds=DEFAULT_CHECK_SECONDS,
+                 supported_language="pt", name="Business Term Recognizer"):
+        self.path = path
+        self.score = score
+        self.check_seconds = check_seconds
+        self._automaton = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        super().__init__(supported_entities=[supported_entity], name=name, supported_language=supported_language)
+
+    def load(self):
+        # Chamado pelo EntityRecognizer.__init__
+        self.reload()
+
+    def reload(self):
+        """Relê o arquivo e troca o autômato; retorna o número de termos carregados."""
+        with self._reload_lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            terms = load_terms(self.path)
+            automaton = TermAutomaton(terms)
+            self.version = hashlib.sha256("\n".join(terms).encode("utf-8")).hexdigest()[:16]
+            self._automaton = automaton
+            self._mtime = mtime
+        # Resultados em cache da lista anterior não precisam ser apagados: a nova versão muda o
+        # fingerprint do analisador (engines.analyzer_fingerprint) e com ele as chaves do cache
+        return automaton.size
+
+    def reload_if_changed(self, wait=False):
+        """Recarrega em segundo plano se o arquivo mudou (no máximo uma verificação a cada check_seconds)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = now
+        try:
+            changed = os.stat(self.path).st_mtime_ns != self._mtime
+        except FileNotFoundError:
+            return  # arquivo sendo substituído: mantém a lista atual
+        if changed and not self._reload_lock.locked():
+            worker = threading.Thread(target=self.reload, name="privacy-partner-terms-reload", daemon=True)
+            worker.start()
+            if wait:
+                worker.join()
+
+    @property
+    def term_count(self):
+        return self._automaton.size
+
+    def analyze(self, text, entities, nlp_artifacts=None):
+        self.reload_if_changed()
+        entity_type = self.supported_entities[0]
+        if entities and entity_type not in entities:
+            return []
+        return [
+            RecognizerResult(entity_type, start, end, self.score, recognition_metadata={
+                RecognizerResult.RECOGNIZER_NAME_KEY: self.name,
+                RecognizerResult.RECOGNIZER_IDENTIFIER_KEY: self.id,
+            })
+            for start, end in find_terms(self._automaton, text)
+        ]
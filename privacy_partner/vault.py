@@ -0,0 +1,151 @@
+import hmac
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+
+import pandas as pd
+
+DEFAULT_VAULT_PATH = "privacy_vault.sqlite3"
+TOKEN_HEX_CHARS = 20  # 80 bits: colisões desprezíveis mesmo com dezenas de milhões de valores
+SQL_BATCH = 900  # abaixo do limite de variáveis por consulta das versões antigas do SQLite
+
+TOKEN_PATTERN = re.compile(rf"\b[A-Z][A-Z0-9_]*_[0-9a-f]{{{TOKEN_HEX_CHARS}}}\b")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    token TEXT PRIMARY KEY,
+    entity TEXT NOT NULL,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS tokens_by_value ON tokens (entity, value);
+"""
+
+
+def load_or_create_key(path):
+    """Lê a chave HMAC do arquivo (ou de PRIVACY_PARTNER_VAULT_KEY); cria uma nova se não existir."""
+    env_key = os.environ.get("PRIVACY_PARTNER_VAULT_KEY")
+    if env_key:
+        return env_key.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    key = secrets.token_bytes(32)
+    # A chave é escrita num arquivo temporário e publicada com link(): quem perder a corrida para
+    # outro processo lê a chave dele, nunca um arquivo ainda vazio
+    descriptor, temporary = tempfile.mkstemp(prefix=".vault-key-", dir=os.path.dirname(path) or ".")  # modo 0o600
+    with os.fdopen(descriptor, "wb") as f:
+        f.write(key)
+    try:
+        os.link(temporary, path)
+    except FileExistsError:
+        with open(path, "rb") as f:
+            key = f.read()
+    finally:
+        os.unlink(temporary)
+    return key
+
+
+# --- Cofre de Pseudônimos ---
+class PseudonymVault:
+    """Cofre local e persistente (SQLite) que mapeia valores para tokens e tokens de volta para valores.
+
+    Os tokens são determinísticos e com chave (HMAC-SHA256), então o mesmo valor recebe o mesmo
+    token em qualquer processo que use a mesma chave, e a reversão pode ser feita em outro processo.
+    As duas direções são indexadas (token é a chave primária; (entidade, valor) tem índice único).
+    """
+
+    def __init__(self, path=DEFAULT_VAULT_PATH, key=None, key_path=None):
+        self.path = path
+        self.key = key or load_or_create_key(key_path or os.path.splitext(path)[0] + ".key")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL permite que outros processos leiam (detokenizem) enquanto este escreve
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA cache_size=-65536")  # 64 MB de páginas em memória
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def make_token(self, value, entity):
+        digest = hmac.digest(self.key, f"{entity}\x1f{value}".encode("utf-8"), "sha256").hex()
+        return f"{entity}_{digest[:TOKEN_HEX_CHARS]}"
+
+    # --- Operações em Lote ---
+    def tokenize_many(self, values, entity):
+        """Pseudonimiza uma lista de valores de uma entidade numa única transação; retorna os tokens na mesma ordem.
+
+        Um valor que já está no cofre recebe o token guardado, mesmo que a chave tenha mudado desde
+        então (o token novo seria descartado pelo índice único e não poderia ser revertido).
+        """
+        values = [str(value) for value in values]
+        tokens_by_value = {value: self.make_token(value, entity) for value in dict.fromkeys(values)}
+        # Inserir em ordem de token mantém as escritas na chave primária sequenciais
+        rows = sorted((token, entity, value) for value, token in tokens_by_value.items())
+        distinct = list(tokens_by_value)
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO tokens (token, entity, value) VALUES (?, ?, ?)", rows)
+            for start in range(0, len(distinct), SQL_BATCH):
+                batch = distinct[start:start + SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                stored = self._conn.execute(f"SELECT value, token FROM tokens WHERE entity = ? AND value IN ({placeholders})", [entity, *batch])
+                tokens_by_value.update(stored)
+        return [tokens_by_value[value] for value in values]
+
+    def detokenize_many(self, tokens):
+        """Reverte uma lista de tokens; tokens desconhecidos voltam como None."""
+        tokens = list(tokens)
+        distinct = list(dict.fromkeys(tokens))
+        values_by_token = {}
+        with self._lock:
+            for start in range(0, len(distinct), SQL_BATCH):
+                batch = distinct[start:start + SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT token, value FROM tokens WHERE token IN ({placeholders})", batch)
+                values_by_token.update(rows)
+        return [values_by_token.get(token) for token in tokens]
+
+    def tokenize(self, value, entity):
+        return self.tokenize_many([value], entity)[0]
+
+    def detokenize(self, token):
+        return self.detokenize_many([token])[0]
+
+    # --- Colunas e Textos ---
+    def tokenize_series(self, series, entity):
+        """Pseudonimiza uma coluna inteira numa chamada (nulos são preservados)."""
+        mask = series.notna()
+        uniques = pd.unique(series[mask].astype(str))
+        mapping = dict(zip(uniques, self.tokenize_many(uniques, entity)))
+        result = series.astype(object).copy()
+        result[mask] = series[mask].astype(str).map(mapping)
+        return result
+
+    def detokenize_series(self, series):
+        """Reverte uma coluna de tokens; valores que não são tokens do cofre ficam como estão."""
+        mask = series.notna()
+        uniques = pd.unique(series[mask].astype(str))
+        mapping = {token: value for token, value in zip(uniques, self.detokenize_many(uniques)) if value is not None}
+        result = series.astype(object).copy()
+        result[mask] = series[mask].astype(str).map(lambda token: mapping.get(token, token))
+        return result
+
+    def detokenize_text(self, text):
+        """Substitui os tokens encontrados num texto livre (ex.: resposta da IA) pelos valores originais."""
+        found = list(dict.fromkeys(TOKEN_PATTERN.findall(text)))
+        mapping = {token: value for token, value in zip(found, self.detokenize_many(found)) if value is not None}
+        return TOKEN_PATTERN.sub(lambda match: mapping.get(match.group(0), match.group(0)), text)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
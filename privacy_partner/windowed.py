@@ -0,0 +1,98 @@
+import re
+
+import pandas as pd
+from presidio_analyzer import RecognizerResult
+
+from privacy_partner.fastpath import analyze_text, get_pattern_scanner
+from privacy_partner.scanner import scan_dataframe
+
+DEFAULT_WINDOW_CHARS = 10_000  # bem abaixo do max_length do spaCy; o custo por janela fica constante
+DEFAULT_OVERLAP_CHARS = 500  # maior que qualquer entidade esperada (nomes, endereços, CPFs)
+
+# Fim de linha ou de frase: os cortes preferidos entre janelas
+BOUNDARY = re.compile(r"\n+|(?<=[.!?;])\s+")
+WHITESPACE = re.compile(r"\s+")
+
+
+# --- Janelas ---
+def _last_cut(text, lo, hi):
+    """Última posição de corte em text[lo:hi]: fronteira de linha/frase, senão espaço, senão hi."""
+    for pattern in (BOUNDARY, WHITESPACE):
+        cut = None
+        for match in pattern.finditer(text, lo, hi):
+            cut = match.end()
+        if cut is not None and lo < cut < hi:
+            return cut
+    return hi
+
+
+def split_windows(text, window_chars=DEFAULT_WINDOW_CHARS, overlap_chars=DEFAULT_OVERLAP_CHARS):
+    """Divide o texto em janelas sobrepostas e retorna a lista de (início, fim).
+
+    Cada janela termina, sempre que possível, numa quebra de linha ou fim de frase da sua segunda
+    metade; a seguinte começa numa fronteira cerca de overlap_chars antes desse fim.
+    """
+    if overlap_chars * 4 > window_chars:
+        raise ValueError("overlap_chars deve ser no máximo 1/4 de window_chars")
+    windows = []
+    start = 0
+    while start + window_chars < len(text):
+        end = _last_cut(text, start + window_chars // 2, start + window_chars)
+        windows.append((start, end))
+        start = _last_cut(text, end - 2 * overlap_chars, end - overlap_chars)
+    windows.append((start, len(text)))
+    return windows
+
+
+def _merge(results):
+    """Une spans sobrepostos da mesma entidade (ex.: detectados em duas janelas) mantendo o maior score."""
+    merged = []
+    for result in sorted(results, key=lambda r: (r.entity_type, r.start, -r.end)):
+        last = merged[-1] if merged else None
+        if last is not None and last.entity_type == result.entity_type and result.start < last.end:
+            last.end = max(last.end, result.end)
+            last.score = max(last.score, result.score)
+        else:
+            merged.append(RecognizerResult(result.entity_type, result.start, result.end, result.score))
+    return sorted(merged, key=lambda r: (r.start, r.end))
+
+
+# --- Análise de Textos Longos ---
+def analyze_long_text(analyzer, text, entities=None, language="pt", window_chars=DEFAULT_WINDOW_CHARS,
+                      overlap_chars=DEFAULT_OVERLAP_CHARS, pool=None):
+    """Substituto de analyzer.analyze() para textos longos, com offsets relativos ao texto original.
+
+    O texto é dividido em janelas sobrepostas (split_windows), analisadas em lote (nlp.pipe) ou, com
+    um ParallelScanner em `pool`, em paralelo nos processos dele; o pool deve ter sido criado com uma
+    factory equivalente a `analyzer`. Cada janela só contribui com os achados que começam na sua
+    parte "própria" (até o meio da sobreposição com a vizinha), e spans repetidos são unidos.
+    Textos curtos, ou entidades só de padrão (regex é linear), são analisados de uma vez.
+    """
+    if len(text) <= window_chars or get_pattern_scanner(analyzer, entities, language) is not None:
+        if entities:
+            return analyze_text(analyzer, text, entities, language)
+        return analyzer.analyze(text=text, language=language)
+
+    windows = split_windows(text, window_chars, overlap_chars)
+    window_df = pd.DataFrame({"text": [text[start:end] for start, end in windows]})
+    if pool is not None:
+        shard_rows = -(-len(windows) // pool.workers)
+        findings = pool.scan_dataframe(window_df, entities, shard_rows=shard_rows)
+    else:
+        findings = scan_dataframe(analyzer, window_df, entities, language, cache=None)
+
+    # Fronteiras de posse: o meio de cada sobreposição
+    owned = []
+    for number, (start, end) in enumerate(windows):
+        own_start = 0 if number == 0 else owned[-1][1]
+        own_end = (end + windows[number + 1][0]) // 2 if number + 1 < len(windows) else len(text)
+        owned.append((own_start, own_end))
+
+    results = []
+    for finding in findings:
+        offset = windows[finding["row"]][0]
+        own_start, own_end = owned[finding["row"]]
+        start = finding["start"] + offset
+        if own_start <= start < own_end:
+            results.append(RecognizerResult(finding["type"], start, finding["end"] + offset, finding["score"]))
+    return _merge(results)
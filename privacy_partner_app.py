@@ -1,35 +1,48 @@
+import os
 import streamlit as st
-from presidio_analyzer import AnalyzerEngine
-from presidio_analyzer.nlp_engine import NlpEngineProvider
 from presidio_anonymizer import AnonymizerEngine
 from presidio_anonymizer.entities import OperatorConfig
+from privacy_partner.engines import build_presidio_analyzer
+from privacy_partner.parallel import ParallelScanner
+from privacy_partner.service import ScanClient, ScanServiceError
+from privacy_partner.vault import DEFAULT_VAULT_PATH, PseudonymVault
+from privacy_partner.windowed import analyze_long_text
 
 # --- Configuração dos Motores (Corrigida) ---
 @st.cache_resource
 def get_analyzer():
-    """Cria e configura o motor de análise do Presidio."""
-    provider_config = {
-        "nlp_engine_name": "spacy",
-        "models": [{"lang_code": "pt", "model_name": "pt_core_news_lg"}]
-    }
-    provider = NlpEngineProvider(nlp_configuration=provider_config)
-    nlp_engine = provider.create_engine()
-    
-    analyzer = AnalyzerEngine(
-        nlp_engine=nlp_engine,
-        supported_languages=["pt"]
-    )
-    return analyzer
+    """Cria e configura o motor de análise do Presidio (com os termos de negócio de PRIVACY_PARTNER_TERMS, se houver)."""
+    return build_presidio_analyzer(terms_path=os.environ.get("PRIVACY_PARTNER_TERMS"))
+
+@st.cache_resource
+def get_scan_pool():
+    """Opt-in: com PRIVACY_PARTNER_SCAN_WORKERS > 1, as janelas de textos longos são analisadas em paralelo."""
+    workers = int(os.environ.get("PRIVACY_PARTNER_SCAN_WORKERS", "0"))
+    return ParallelScanner(workers=workers, factory=build_presidio_analyzer, factory_kwargs={"terms_path": os.environ.get("PRIVACY_PARTNER_TERMS")}) if workers > 1 else None
 
 @st.cache_resource
 def get_anonymizer():
     """Cria o motor de anonimização."""
     return AnonymizerEngine()
 
+@st.cache_resource
+def get_vault():
+    """Abre o cofre local de pseudônimos (SQLite), compartilhado entre as sessões."""
+    return PseudonymVault(os.environ.get("PRIVACY_PARTNER_VAULT", DEFAULT_VAULT_PATH))
+
+@st.cache_resource
+def get_scan_client():
+    """Com PRIVACY_PARTNER_SCAN_SERVICE (ex.: http://127.0.0.1:8765), a análise roda no serviço local (python -m privacy_partner.service)."""
+    url = os.environ.get("PRIVACY_PARTNER_SCAN_SERVICE")
+    return ScanClient(url) if url else None
+
 # --- Carregamento dos Motores ---
 try:
-    analyzer = get_analyzer()
+    scan_client = get_scan_client()
+    # Com o serviço de varredura o modelo não é carregado neste processo
+    analyzer = get_analyzer() if scan_client is None else None
     anonymizer = get_anonymizer()
+    vault = get_vault()
     st.set_page_config(page_title="Privacy Partner Demo", layout="wide")
 except Exception as e:
     st.error(f"Ocorreu um erro ao carregar os modelos de IA. Verifique se o download do 'pt_core_news_lg' foi concluído com sucesso. Erro: {e}")
@@ -54,20 +67,29 @@ O telefone dele é (11) 99999-8888.
 if st.button("Analisar e Proteger Texto"):
     if text_to_analyze:
         with st.spinner("Analisando o texto..."):
-            analyzer_results = analyzer.analyze(text=text_to_analyze, language="pt")
+            operators = {"DEFAULT": OperatorConfig("replace", {"new_value": "******"})}
+            if scan_client is not None:
+                # Análise e anonimização num só pedido ao serviço local
+                try:
+                    protected_text, analyzer_results = scan_client.anonymize(text_to_analyze, operators=operators)
+                except ScanServiceError as e:
+                    st.error(f"O serviço de varredura não respondeu. Erro: {e}")
+                    st.stop()
+            else:
+                # Textos longos são divididos em janelas; os offsets voltam relativos ao texto inteiro
+                analyzer_results = analyze_long_text(analyzer, text_to_analyze, pool=get_scan_pool())
+                # Anonimizar o texto para exibição segura
+                protected_text = anonymizer.anonymize(
+                    text=text_to_analyze,
+                    analyzer_results=analyzer_results,
+                    operators=operators
+                ).text
             
             st.subheader("Resultados da Análise:")
             if analyzer_results:
                 st.write(f"🚨 **{len(analyzer_results)} riscos de privacidade foram detectados!**")
                 
-                # Anonimizar o texto para exibição segura
-                anonymized_result = anonymizer.anonymize(
-                    text=text_to_analyze,
-                    analyzer_results=analyzer_results,
-                    operators={"DEFAULT": OperatorConfig("replace", {"new_value": "******"})}
-                )
-                
-                st.text_area("Texto Protegido:", anonymized_result.text, height=150)
+                st.text_area("Texto Protegido:", protected_text, height=150)
 
                 st.write("Detalhes dos riscos encontrados:")
                 for result in analyzer_results:
@@ -99,10 +121,9 @@ with col1:
     custom_text = st.text_input("Dado a ser protegido:", "Privacy Partner, o seu parceiro de privacidade.")
     
     if st.button("Pseudonimizar 🕵️"):
-        # Simula a criação de um "token" - na vida real, seria um hash ou ID único
-        pseudonym = f"<PROJETO_CONFIDENCIAL_{hash(custom_text)}>"
+        # Token determinístico e com chave, guardado no cofre: o mesmo termo gera sempre o mesmo token
+        pseudonym = vault.tokenize(custom_text, "PROJETO_CONFIDENCIAL")
         st.session_state.pseudonym = pseudonym
-        st.session_state.original_text = custom_text
 
     if 'pseudonym' in st.session_state and st.session_state.pseudonym:
         st.success(f"**Texto Pseudonimizado:**\n\n`{st.session_state.pseudonym}`")
@@ -112,4 +133,5 @@ with col2:
     if 'pseudonym' in st.session_state and st.session_state.pseudonym:
         st.write(f"O sistema agora só vê o token: `{st.session_state.pseudonym}`")
         if st.button("Reverter para Original 🔑"):
-            st.info(f"**Texto Original Restaurado:**\n\n`{st.session_state.original_text}`")
\ No newline at end of file
+            # A reversão consulta o cofre, não a sessão: funciona em qualquer processo com a mesma chave
+            st.info(f"**Texto Original Restaurado:**\n\n`{vault.detokenize(st.session_state.pseudonym)}`")
\ No newline at end of file
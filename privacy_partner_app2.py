@@ -1,63 +1,62 @@
+import os
 import streamlit as st
 import pandas as pd
 import re
+import uuid
 import google.generativeai as genai
-from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
-from presidio_analyzer.nlp_engine import NlpEngineProvider
-from presidio_analyzer.recognizer_registry import RecognizerRegistry
-from presidio_analyzer.predefined_recognizers import EmailRecognizer
-
-# --- Reconhecedores Customizados ---
-class CustomBrCpfRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="cpf", regex=r"\b(\d{3}\.?\d{3}\.?\d{3}-?\d{2}|\d{11})\b", score=0.9)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="BR_CPF", name="Custom CPF Recognizer", patterns=self.PATTERNS, **kwargs)
-
-class CustomAddressRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="endereco", regex=r"\b(Rua|Av\.|Avenida|Travessa|Praça|Est|Estrada)\s[\w\s,.-]+", score=0.7)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="STREET_ADDRESS", name="Custom Address Recognizer", patterns=self.PATTERNS, **kwargs)
-
-class CustomBrPhoneRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="telefone_formatado", regex=r"\b(\(\d{2}\)\s?\d{4,5}-?\d{4}|\d{2}\s\d{4,5}-?\d{4})\b", score=0.4)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="PHONE_NUMBER", name="Custom Phone Recognizer", patterns=self.PATTERNS, **kwargs)
+from privacy_partner.cache import content_hash, estimate_scan_size, scan_cache, scan_key
+from privacy_partner.chat import ChatPipeline, FakeModelClient, GeminiClient
+from privacy_partner.context import DEFAULT_TOKEN_BUDGET, FileContext
+from privacy_partner.engines import DEFAULT_CONFIG, analyzer_fingerprint, build_analyzer, default_entities, warm_up
+from privacy_partner.metrics import instrument_analyzer, metrics
+from privacy_partner.parallel import ParallelScanner
+from privacy_partner.ingest import UPLOAD_TYPES, read_table
+from privacy_partner.service import ScanClient, ScanServiceError
+from privacy_partner.storage import artifact_store, session_state_usage
+from privacy_partner.streaming import GATE, scan_file_stream
 
 # --- Carregamento dos Motores e Configuração ---
+# Os reconhecedores customizados e o registry ficam no núcleo compartilhado.
+# Lazy: as entidades deste app são só de padrão, então o spaCy só carrega se algo pedir NER.
+# PRIVACY_PARTNER_TERMS aponta para a lista de termos de negócio (um por linha), recarregada ao mudar.
+# Os processos do pool usam os mesmos argumentos: o mesmo analisador, e o mesmo fingerprint no cache.
+ANALYZER_KWARGS = {
+    "config": os.environ.get("PRIVACY_PARTNER_ANALYZER_CONFIG", DEFAULT_CONFIG),
+    "lazy": True,
+    "terms_path": os.environ.get("PRIVACY_PARTNER_TERMS"),
+}
+
 @st.cache_resource
 def get_analyzer():
-    registry = RecognizerRegistry(supported_languages=["pt"])
-    registry.load_predefined_recognizers(languages=["pt"])
-    
-    # Adicionamos nossos especialistas, garantindo que eles suportem português
-    registry.add_recognizer(CustomBrCpfRecognizer(supported_language="pt"))
-    registry.add_recognizer(CustomAddressRecognizer(supported_language="pt"))
-    registry.add_recognizer(CustomBrPhoneRecognizer(supported_language="pt"))
-    
-    # Removemos os reconhecedores padrão que são muito genéricos
-    registry.remove_recognizer("PhoneRecognizer")
-    registry.remove_recognizer("DateRecognizer")
-    
-    # O motor de linguagem agora será usado apenas para contexto, não para detecção direta de Nomes
-    provider_config = {"nlp_engine_name": "spacy", "models": [{"lang_code": "pt", "model_name": "pt_core_news_lg"}]}
-    provider = NlpEngineProvider(nlp_configuration=provider_config)
-    nlp_engine = provider.create_engine()
-    
-    analyzer = AnalyzerEngine(
-        registry=registry,
-        nlp_engine=nlp_engine,
-        supported_languages=["pt"]
-    )
+    analyzer = build_analyzer(**ANALYZER_KWARGS)
+    instrument_analyzer(analyzer)
+    if os.environ.get("PRIVACY_PARTNER_WARMUP") == "1":
+        warm_up(analyzer)
     return analyzer
 
 @st.cache_resource
-def get_gemini_model():
+def get_scan_pool():
+    # Opt-in: com PRIVACY_PARTNER_SCAN_WORKERS > 1 os blocos do upload são varridos em paralelo
+    workers = int(os.environ.get("PRIVACY_PARTNER_SCAN_WORKERS", "0"))
+    return ParallelScanner(workers=workers, factory_kwargs=ANALYZER_KWARGS) if workers > 1 else None
+
+@st.cache_resource
+def get_model_client():
+    # PRIVACY_PARTNER_MODEL=fake usa o backend local (sem chave de API nem rede)
+    if os.environ.get("PRIVACY_PARTNER_MODEL") == "fake":
+        return FakeModelClient(delay=0.05)
     genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-    return genai.GenerativeModel('gemini-1.5-flash-latest')
+    return GeminiClient(genai.GenerativeModel('gemini-1.5-flash-latest'))
+
+@st.cache_resource
+def get_scan_client():
+    # PRIVACY_PARTNER_SCAN_SERVICE=http://127.0.0.1:8765 checa os prompts no serviço local (python -m privacy_partner.service)
+    url = os.environ.get("PRIVACY_PARTNER_SCAN_SERVICE")
+    return ScanClient(url) if url else None
 
 try:
     analyzer = get_analyzer()
-    gemini_model = get_gemini_model()
+    model_client = get_model_client()
     st.set_page_config(page_title="Privacy Partner Demo", layout="centered")
     with open(".streamlit/style.css") as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -77,27 +76,60 @@ st.write("")
 
 if 'messages' not in st.session_state: st.session_state.messages = []
 if 'file_is_safe' not in st.session_state: st.session_state.file_is_safe = True
-if 'file_content' not in st.session_state: st.session_state.file_content = None
+if 'context_key' not in st.session_state: st.session_state.context_key = None
+if 'session_id' not in st.session_state: st.session_state.session_id = uuid.uuid4().hex
 
 # Lista de entidades que consideramos PII de alto risco (REMOVEMOS 'PERSON')
-entidades_pii = ["BR_CPF", "PHONE_NUMBER", "EMAIL_ADDRESS", "STREET_ADDRESS"]
+entidades_pii = default_entities(ner=False, terms_path=os.environ.get("PRIVACY_PARTNER_TERMS"))
+# Orçamento (em tokens estimados) do contexto do arquivo enviado ao modelo a cada pergunta
+context_budget = int(os.environ.get("PRIVACY_PARTNER_CONTEXT_TOKENS", DEFAULT_TOKEN_BUDGET))
+if 'chat_pipeline' not in st.session_state: st.session_state.chat_pipeline = ChatPipeline(analyzer, model_client, entidades_pii, scan_client=get_scan_client())
 
-uploaded_file = st.file_uploader("Attach a file (.csv):", type=["csv"])
+def load_file_context(uploaded_file, context_key):
+    """Contexto do arquivo a partir do armazém; se expirou (ou é a primeira vez), é recalculado do upload."""
+    file_context = artifact_store.get(context_key, st.session_state.session_id)
+    if file_context is None:
+        uploaded_file.seek(0)
+        # Resumo e índice das linhas calculados uma vez por arquivo; cada pergunta envia só o relevante
+        file_context = FileContext(read_table(uploaded_file, uploaded_file.name))
+        artifact_store.put(context_key, file_context, st.session_state.session_id)
+    return file_context
+
+uploaded_file = st.file_uploader("Attach a file (.csv, .parquet, .xlsx):", type=UPLOAD_TYPES)
 if uploaded_file:
-    with st.spinner("Analisando arquivo..."):
-        df = pd.read_csv(uploaded_file)
-        file_content_string = df.to_string()
-        analyzer_results = analyzer.analyze(text=file_content_string, language="pt", entities=entidades_pii)
-        if analyzer_results:
-            st.error(f"🚨 **PRIVACY PARTNER:** The file `{uploaded_file.name}` contains sensitive information.\n\n **Recommended Action:** To proceed, please anonymize or pseudononymize the data. You can use the **Privacy Partner Add-in for Excel** to help. ")
-            st.session_state.file_is_safe = False
-        else:
-            st.success(f"✅ **PRIVACY PARTNER:** The file `{uploaded_file.name}` is safe to use.")
-            st.session_state.file_is_safe = True
-            st.session_state.file_content = file_content_string
+    # O bloco roda a cada rerun do script: o resultado fica em cache pelo hash do conteúdo
+    file_hash = content_hash(uploaded_file)
+    key = scan_key(file_hash, entidades_pii, analyzer_fingerprint(analyzer), mode=GATE)
+    scan = scan_cache.get(key)
+    if scan is None:
+        # Modo gate: basta o primeiro achado para travar o chat, então a leitura para ali
+        progress_bar = st.progress(0.0, text="Analisando arquivo...")
+        # Formato e codificação detectados do arquivo; colunas sem texto nem são lidas
+        scan = scan_file_stream(
+            analyzer, uploaded_file, entidades_pii, name=uploaded_file.name, mode=GATE, pool=get_scan_pool(),
+            progress=lambda fraction, rows: progress_bar.progress(fraction or 0.0, text=f"Analisando arquivo... {rows} linhas")
+        )
+        progress_bar.empty()
+        scan_cache.put(key, scan, size=estimate_scan_size(scan))
+    else:
+        cache_stats = scan_cache.stats()
+        st.caption(f"♻️ Resultado da análise reaproveitado do cache ({cache_stats['hits']} acertos / {cache_stats['misses']} faltas)")
+    if scan["findings"]:
+        st.error(f"🚨 **PRIVACY PARTNER:** The file `{uploaded_file.name}` contains sensitive information.\n\n **Recommended Action:** To proceed, please anonymize or pseudononymize the data. You can use the **Privacy Partner Add-in for Excel** to help. ")
+        st.session_state.file_is_safe = False
+        st.session_state.context_key = None
+    else:
+        st.success(f"✅ **PRIVACY PARTNER:** The file `{uploaded_file.name}` is safe to use.")
+        st.session_state.file_is_safe = True
+        # A sessão guarda só a chave; o contexto fica no armazém, compartilhado entre sessões com o mesmo arquivo
+        st.session_state.context_key = f"context-{file_hash}"
+        if st.session_state.get("file_hash") != file_hash:
+            load_file_context(uploaded_file, st.session_state.context_key)
+    st.session_state.file_hash = file_hash
 else:
     st.session_state.file_is_safe = True
-    st.session_state.file_content = None
+    st.session_state.context_key = None
+    st.session_state.file_hash = None
 
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -109,12 +141,25 @@ if prompt:
     if not st.session_state.file_is_safe:
         st.warning("It is not possible to process your prompt because the attached file contains sensitive data. Please remove the file to continue.")
     else:
+        file_context = load_file_context(uploaded_file, st.session_state.context_key) if st.session_state.context_key else None
+        # A checagem de PII e a montagem do contexto já começam enquanto a mensagem do usuário é desenhada
+        turn = st.session_state.chat_pipeline.start(prompt, file_context, context_budget)
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
         with st.spinner("Privacy Partner analisando..."):
-            analyzer_results = analyzer.analyze(text=prompt, language="pt", entities=entidades_pii)
-        if analyzer_results:
+            try:
+                analyzer_results = turn.findings
+                service_error = None
+            except ScanServiceError as e:
+                analyzer_results, service_error = None, e
+        if service_error is not None:
+            # Sem checagem o prompt não sai: fica bloqueado até o serviço de varredura responder
+            error_message = f"⚠️ The Privacy Partner scan service is unavailable, so your prompt was not sent. Please try again in a moment.\n\nDetails: {service_error}"
+            st.session_state.messages.append({"role": "assistant", "content": error_message})
+            with st.chat_message("assistant"):
+                st.error(error_message)
+        elif analyzer_results:
             tipos_de_risco = list(set([res.entity_type for res in analyzer_results]))
             riscos_formatados = "\n".join([f"- {tipo}" for tipo in tipos_de_risco])
             
@@ -134,15 +179,29 @@ if prompt:
                 st.warning(alert_message, icon="⚠️")
                 st.markdown(link_markdown, unsafe_allow_html=True)
         else:
-            with st.spinner("Safe prompt. Sending to Generative AI..."):
+            with st.chat_message("assistant"):
                 try:
-                    full_prompt = prompt
-                    if st.session_state.file_content:
-                        full_prompt = f"Com base neste contexto:\n---\n{st.session_state.file_content}\n---\n\nResponda à seguinte pergunta: {prompt}"
-                    response = gemini_model.generate_content(full_prompt)
-                    response_text = response.text
+                    # Os pedaços aparecem conforme chegam; uma nova pergunta cancela esta geração
+                    response_text = st.write_stream(turn.stream())
                 except Exception as e:
                     response_text = f"Ocorreu um erro ao chamar a API da IA. Detalhes: {e}"
-                st.session_state.messages.append({"role": "assistant", "content": response_text})
-                with st.chat_message("assistant"):
                     st.markdown(response_text)
+            st.session_state.messages.append({"role": "assistant", "content": response_text})
+
+# --- Painel de Debug (PRIVACY_PARTNER_METRICS=1) ---
+if metrics.enabled:
+    with st.sidebar.expander("🔧 Debug: scan metrics"):
+        st.dataframe(pd.DataFrame(metrics.rows()), hide_index=True, use_container_width=True)
+        st.download_button("Prometheus export", metrics.to_prometheus(), file_name="privacy_partner_metrics.prom", mime="text/plain")
+
+# --- Uso de Memória: desta sessão e do armazém compartilhado ---
+with st.sidebar.expander("💾 Memory usage"):
+    store_usage = artifact_store.usage()
+    st.caption(
+        f"Shared store: {store_usage['memory_bytes'] / 2**20:.1f} MB in memory ({store_usage['memory_entries']} entries) · "
+        f"{store_usage['disk_bytes'] / 2**20:.1f} MB on disk ({store_usage['disk_entries']} files) · {store_usage['sessions']} active sessions"
+    )
+    st.dataframe(pd.DataFrame(session_state_usage(st.session_state)), hide_index=True, use_container_width=True)
+    session_artifacts = artifact_store.session_usage(st.session_state.session_id)
+    if session_artifacts:
+        st.dataframe(pd.DataFrame(session_artifacts), hide_index=True, use_container_width=True)
@@ -1,60 +1,47 @@
+import os
 import streamlit as st
 import pandas as pd
 import re
+import uuid
 import google.generativeai as genai
-from presidio_analyzer import AnalyzerEngine, Pattern, PatternRecognizer
-from presidio_analyzer.nlp_engine import NlpEngineProvider
-from presidio_analyzer.recognizer_registry import RecognizerRegistry
-from presidio_analyzer.predefined_recognizers import EmailRecognizer
-
-# --- Reconhecedores Customizados ---
-class CustomBrCpfRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="cpf", regex=r"\b(\d{3}\.?\d{3}\.?\d{3}-?\d{2}|\d{11})\b", score=0.9)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="BR_CPF", name="Custom CPF Recognizer", patterns=self.PATTERNS, **kwargs)
-
-class CustomAddressRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="endereco", regex=r"\b(Rua|Av\.|Avenida|Travessa|Praça|Est|Estrada)\s[\w\s,.-]+", score=0.8)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="STREET_ADDRESS", name="Custom Address Recognizer", patterns=self.PATTERNS, **kwargs)
-
-class CustomBrPhoneRecognizer(PatternRecognizer):
-    PATTERNS = [Pattern(name="telefone_formatado", regex=r"\b(\(\d{2}\)\s?\d{4,5}-?\d{4}|\d{2}\s\d{4,5}-?\d{4})\b", score=0.9)]
-    def __init__(self, **kwargs):
-        super().__init__(supported_entity="PHONE_NUMBER", name="Custom Phone Recognizer", patterns=self.PATTERNS, **kwargs)
+from privacy_partner.cache import analysis_cache, content_hash, estimate_scan_size, scan_cache, scan_key
+from privacy_partner.chat import ChatPipeline, FakeModelClient, GeminiClient
+from privacy_partner.context import DEFAULT_TOKEN_BUDGET, FileContext
+from privacy_partner.engines import DEFAULT_CONFIG, analyzer_fingerprint, build_analyzer, default_entities
+from privacy_partner.findings import MIME_TYPES, REPORT_FORMATS, TXT
+from privacy_partner.metrics import instrument_analyzer, metrics
+from privacy_partner.ingest import UPLOAD_TYPES, read_table
+from privacy_partner.service import ScanClient, ScanServiceError
+from privacy_partner.storage import artifact_store, session_state_usage
+from privacy_partner.streaming import REPORT, scan_file_stream
 
 # --- Carregamento dos Motores e Configuração ---
 @st.cache_resource
 def get_analyzer():
-    registry = RecognizerRegistry(supported_languages=["pt"])
-    registry.load_predefined_recognizers(languages=["pt"])
-    
-    registry.add_recognizer(CustomBrCpfRecognizer(supported_language="pt"))
-    registry.add_recognizer(CustomAddressRecognizer(supported_language="pt"))
-    registry.add_recognizer(CustomBrPhoneRecognizer(supported_language="pt"))
-    
-    registry.remove_recognizer("PhoneRecognizer")
-    registry.remove_recognizer("DateRecognizer")
-    
-    provider_config = {"nlp_engine_name": "spacy", "models": [{"lang_code": "pt", "model_name": "pt_core_news_lg"}]}
-    provider = NlpEngineProvider(nlp_configuration=provider_config)
-    nlp_engine = provider.create_engine()
-    
-    analyzer = AnalyzerEngine(
-        registry=registry,
-        nlp_engine=nlp_engine,
-        supported_languages=["pt"]
-    )
-    return analyzer
+    # Mesmo núcleo do app2 e da linha de comando (privacy_partner.engines): reconhecedores e registry
+    # num só lugar. PRIVACY_PARTNER_TERMS aponta para a lista de termos de negócio, recarregada ao mudar.
+    # Com o serviço de varredura os prompts são checados lá: o spaCy só carrega aqui se um upload precisar de NER.
+    lazy = bool(os.environ.get("PRIVACY_PARTNER_SCAN_SERVICE"))
+    analyzer = build_analyzer(os.environ.get("PRIVACY_PARTNER_ANALYZER_CONFIG", DEFAULT_CONFIG), lazy=lazy, terms_path=os.environ.get("PRIVACY_PARTNER_TERMS"))
+    return instrument_analyzer(analyzer)
 
 @st.cache_resource
-def get_gemini_model():
+def get_model_client():
+    # PRIVACY_PARTNER_MODEL=fake usa o backend local (sem chave de API nem rede)
+    if os.environ.get("PRIVACY_PARTNER_MODEL") == "fake":
+        return FakeModelClient(delay=0.05)
     genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-    return genai.GenerativeModel('gemini-1.5-flash-latest')
+    return GeminiClient(genai.GenerativeModel('gemini-1.5-flash-latest'))
+
+@st.cache_resource
+def get_scan_client():
+    # PRIVACY_PARTNER_SCAN_SERVICE=http://127.0.0.1:8765 checa os prompts no serviço local (python -m privacy_partner.service)
+    url = os.environ.get("PRIVACY_PARTNER_SCAN_SERVICE")
+    return ScanClient(url) if url else None
 
 try:
     analyzer = get_analyzer()
-    gemini_model = get_gemini_model()
+    model_client = get_model_client()
     st.set_page_config(page_title="Privacy Partner Demo", layout="centered")
     with open(".streamlit/style.css") as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -74,39 +61,61 @@ st.write("")
 
 if 'messages' not in st.session_state: st.session_state.messages = []
 if 'file_is_safe' not in st.session_state: st.session_state.file_is_safe = True
-if 'file_content' not in st.session_state: st.session_state.file_content = None
-
-entidades_pii = ["BR_CPF", "PHONE_NUMBER", "EMAIL_ADDRESS", "STREET_ADDRESS", "PERSON"]
-
-# --- BLOCO DE UPLOAD DE ARQUIVO COM GERAÇÃO DE RELATÓRIO TXT ---
-uploaded_file = st.file_uploader("Attach a file (.csv):", type=["csv"])
+if 'context_key' not in st.session_state: st.session_state.context_key = None
+if 'session_id' not in st.session_state: st.session_state.session_id = uuid.uuid4().hex
+
+entidades_pii = default_entities(terms_path=os.environ.get("PRIVACY_PARTNER_TERMS"))
+# Orçamento (em tokens estimados) do contexto do arquivo enviado ao modelo a cada pergunta
+context_budget = int(os.environ.get("PRIVACY_PARTNER_CONTEXT_TOKENS", DEFAULT_TOKEN_BUDGET))
+if 'chat_pipeline' not in st.session_state: st.session_state.chat_pipeline = ChatPipeline(analyzer, model_client, entidades_pii, scan_client=get_scan_client())
+
+def load_file_context(uploaded_file, context_key):
+    """Contexto do arquivo a partir do armazém; se expirou (ou é a primeira vez), é recalculado do upload."""
+    file_context = artifact_store.get(context_key, st.session_state.session_id)
+    if file_context is None:
+        uploaded_file.seek(0)
+        # Resumo e índice das linhas calculados uma vez por arquivo; cada pergunta envia só o relevante
+        file_context = FileContext(read_table(uploaded_file, uploaded_file.name))
+        artifact_store.put(context_key, file_context, st.session_state.session_id)
+    return file_context
+
+# --- BLOCO DE UPLOAD DE ARQUIVO COM GERAÇÃO DE RELATÓRIO ---
+uploaded_file = st.file_uploader("Attach a file (.csv, .parquet, .xlsx):", type=UPLOAD_TYPES)
+exhaustive_scan = st.checkbox("Exhaustive scan (audit mode)", help="Scan every column cell by cell, ignoring the column profile.")
 
 if uploaded_file:
-    with st.spinner("Analyzing file cell by cell..."):
+    with st.spinner("Analyzing file in chunks..."):
         try:
-            df = pd.read_csv(uploaded_file, encoding='latin-1')
-            findings = []
-
-            for index, row in df.iterrows():
-                for col_name, cell_value in row.items():
-                    if cell_value and isinstance(cell_value, str):
-                        analyzer_results = analyzer.analyze(text=cell_value, language="pt", entities=entidades_pii)
-                        if analyzer_results:
-                            for result in analyzer_results:
-                                findings.append({
-                                    "row": index + 2,
-                                    "column": col_name,
-                                    "type": result.entity_type
-                                })
+            # O bloco roda a cada rerun do script: o resultado fica em cache pelo hash do conteúdo
+            file_hash = content_hash(uploaded_file)
+            key = scan_key(file_hash, entidades_pii, analyzer_fingerprint(analyzer), mode=REPORT, exhaustive=exhaustive_scan)
+            scan = scan_cache.get(key)
+            if scan is None:
+                # Modo report: o arquivo é lido em blocos e todos os achados entram no relatório
+                progress_bar = st.progress(0.0, text="Scanning...")
+                scan = scan_file_stream(
+                    analyzer, uploaded_file, entidades_pii, name=uploaded_file.name, mode=REPORT, exhaustive=exhaustive_scan,
+                    progress=lambda fraction, rows: progress_bar.progress(fraction or 0.0, text=f"Scanning... {rows} rows")
+                )
+                progress_bar.empty()
+                scan_cache.put(key, scan, size=estimate_scan_size(scan))
+            else:
+                st.caption("♻️ Scan result reused from cache.")
+            findings = scan["findings"]
+            column_profile = scan["profile"]
+            with st.expander("Column profile"):
+                st.dataframe(pd.DataFrame(column_profile), hide_index=True, use_container_width=True)
+            cache_stats = analysis_cache.stats()
+            file_cache_stats = scan_cache.stats()
+            st.caption(
+                f"Analysis cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['size']} entries) · "
+                f"File scan cache: {file_cache_stats['hits']} hits / {file_cache_stats['misses']} misses ({file_cache_stats['size']} files)"
+            )
             
             if findings:
                 st.session_state.file_is_safe = False
+                st.session_state.context_key = None
                 st.error(f"🚨 **PRIVACY PARTNER:** The file `{uploaded_file.name}` contains sensitive data. The chat has been locked.")
-                
-                log_lines = [f"Privacy Risk Report - File: {uploaded_file.name}", "="*50]
-                for find in findings:
-                    log_lines.append(f"- Row {find['row']}, Column '{find['column']}': Found data of type {find['type']}.")
-                log_content = "\n".join(log_lines)
 
                 warning_message = (
                     f"**Found {len(findings)} potential privacy risks.**\n\n"
@@ -114,23 +123,40 @@ if uploaded_file:
                 )
                 st.warning(warning_message, icon="⚠️")
 
+                # Resumo agregado por coluna e tipo; do detalhe, só a página visível vira DataFrame
+                st.dataframe(pd.DataFrame(findings.summary()), hide_index=True, use_container_width=True)
+                with st.expander("Findings detail"):
+                    page_number = st.number_input("Page", min_value=1, max_value=findings.page_count(), value=1)
+                    st.dataframe(findings.page(page_number - 1), hide_index=True, use_container_width=True)
+
+                def build_report(report_format):
+                    # Gerado em blocos só no clique, numa thread separada do script
+                    with metrics.phase("report"):
+                        return findings.export(report_format, title=f"Privacy Risk Report - File: {uploaded_file.name}", profile=column_profile)
+
+                report_format = st.selectbox("Report format", REPORT_FORMATS, index=REPORT_FORMATS.index(TXT))
                 st.download_button(
-                    label="Download Detailed Report (.txt)",
-                    data=log_content,
-                    file_name=f"privacy_report_{uploaded_file.name}.txt",
-                    mime="text/plain"
+                    label=f"Download Detailed Report (.{report_format})",
+                    data=lambda: build_report(report_format),
+                    file_name=f"privacy_report_{uploaded_file.name}.{report_format}",
+                    mime=MIME_TYPES[report_format]
                 )
             else:
                 st.success(f"✅ **PRIVACY PARTNER:** The file `{uploaded_file.name}` is safe to use.")
                 st.session_state.file_is_safe = True
-                st.session_state.file_content = df.to_string()
+                # A sessão guarda só a chave; o contexto fica no armazém, compartilhado entre sessões com o mesmo arquivo
+                st.session_state.context_key = f"context-{file_hash}"
+                if st.session_state.get("file_hash") != file_hash:
+                    load_file_context(uploaded_file, st.session_state.context_key)
+            st.session_state.file_hash = file_hash
         
         except Exception as e:
-            st.error(f"Could not read the CSV file. Please ensure it is a valid CSV. Error: {e}")
+            st.error(f"Could not read the file. Please ensure it is a valid CSV, Parquet or XLSX file. Error: {e}")
             st.session_state.file_is_safe = False
 else:
     st.session_state.file_is_safe = True
-    st.session_state.file_content = None
+    st.session_state.context_key = None
+    st.session_state.file_hash = None
 
 # --- Lógica do Chat ---
 for message in st.session_state.messages:
@@ -143,12 +169,25 @@ if prompt:
     if not st.session_state.file_is_safe:
         st.warning("It is not possible to process your prompt because the attached file contains sensitive data. Please remove the file to continue.")
     else:
+        file_context = load_file_context(uploaded_file, st.session_state.context_key) if st.session_state.context_key else None
+        # A checagem de PII e a montagem do contexto já começam enquanto a mensagem do usuário é desenhada
+        turn = st.session_state.chat_pipeline.start(prompt, file_context, context_budget)
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
         with st.spinner("Privacy Partner analyzing..."):
-            analyzer_results = analyzer.analyze(text=prompt, language="pt", entities=entidades_pii)
-        if analyzer_results:
+            try:
+                analyzer_results = turn.findings
+                service_error = None
+            except ScanServiceError as e:
+                analyzer_results, service_error = None, e
+        if service_error is not None:
+            # Sem checagem o prompt não sai: fica bloqueado até o serviço de varredura responder
+            error_message = f"⚠️ The Privacy Partner scan service is unavailable, so your prompt was not sent. Please try again in a moment.\n\nDetails: {service_error}"
+            st.session_state.messages.append({"role": "assistant", "content": error_message})
+            with st.chat_message("assistant"):
+                st.error(error_message)
+        elif analyzer_results:
             tipos_de_risco = list(set([res.entity_type for res in analyzer_results]))
             riscos_formatados = "\n".join([f"- {tipo}" for tipo in tipos_de_risco])
             
@@ -167,15 +206,29 @@ if prompt:
                 st.warning(alert_message, icon="⚠️")
                 st.markdown(link_markdown, unsafe_allow_html=True)
         else:
-            with st.spinner("Safe prompt. Sending to Generative AI..."):
+            with st.chat_message("assistant"):
                 try:
-                    full_prompt = prompt
-                    if st.session_state.file_content:
-                        full_prompt = f"Com base neste contexto:\n---\n{st.session_state.file_content}\n---\n\nResponda à seguinte pergunta: {prompt}"
-                    response = gemini_model.generate_content(full_prompt)
-                    response_text = response.text
+                    # Os pedaços aparecem conforme chegam; uma nova pergunta cancela esta geração
+                    response_text = st.write_stream(turn.stream())
                 except Exception as e:
                     response_text = f"An error occurred while calling the AI API. Details: {e}"
-                st.session_state.messages.append({"role": "assistant", "content": response_text})
-                with st.chat_message("assistant"):
                     st.markdown(response_text)
+            st.session_state.messages.append({"role": "assistant", "content": response_text})
+
+# --- Painel de Debug (PRIVACY_PARTNER_METRICS=1) ---
+if metrics.enabled:
+    with st.sidebar.expander("🔧 Debug: scan metrics"):
+        st.dataframe(pd.DataFrame(metrics.rows()), hide_index=True, use_container_width=True)
+        st.download_button("Prometheus export", metrics.to_prometheus(), file_name="privacy_partner_metrics.prom", mime="text/plain")
+
+# --- Uso de Memória: desta sessão e do armazém compartilhado ---
+with st.sidebar.expander("💾 Memory usage"):
+    store_usage = artifact_store.usage()
+    st.caption(
+        f"Shared store: {store_usage['memory_bytes'] / 2**20:.1f} MB in memory ({store_usage['memory_entries']} entries) · "
+        f"{store_usage['disk_bytes'] / 2**20:.1f} MB on disk ({store_usage['disk_entries']} files) · {store_usage['sessions']} active sessions"
+    )
+    st.dataframe(pd.DataFrame(session_state_usage(st.session_state)), hide_index=True, use_container_width=True)
+    session_artifacts = artifact_store.session_usage(st.session_state.session_id)
+    if session_artifacts:
+        st.dataframe(pd.DataFrame(session_artifacts), hide_index=True, use_container_width=True)
@@ -0,0 +1,29 @@
+import pytest
+import spacy
+
+from privacy_partner.engines import build_analyzer
+
+# Nomes que o pipeline mínimo reconhece como PER (o pt_core_news_lg não é necessário nos testes)
+TEST_PEOPLE = ["Ana Silva", "Carlos Souza"]
+
+
+def tiny_nlp():
+    """Pipeline spaCy em branco com um entity_ruler: faz o papel do NER do modelo grande."""
+    nlp = spacy.blank("pt")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([{"label": "PER", "pattern": [{"TEXT": part} for part in name.split()]} for name in TEST_PEOPLE])
+    return nlp
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    """Analisador do projeto com lazy=True: as entidades de padrão rodam sem carregar o spaCy."""
+    return build_analyzer(lazy=True)
+
+
+@pytest.fixture
+def ner_analyzer():
+    """Analisador do projeto com o pipeline mínimo no lugar do modelo, para os caminhos que usam NER."""
+    analyzer = build_analyzer(lazy=True)
+    analyzer.nlp_engine.nlp = {"pt": tiny_nlp()}
+    return analyzer
@@ -0,0 +1,44 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from presidio_analyzer import RecognizerResult
+from presidio_anonymizer.entities import OperatorConfig
+
+from privacy_partner.anonymize import SpanAnonymizer
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.incremental import IncrementalScanner
+
+
+def _cells(analyzer, df):
+    return IncrementalScanner(analyzer, PATTERN_ENTITIES).scan(df)
+
+
+def test_only_the_spans_are_rewritten(analyzer):
+    df = pd.DataFrame({"obs": ["CPF 123.456.789-00 e email ana@exemplo.com", "sem dados"]})
+    anonymizer = SpanAnonymizer({"EMAIL_ADDRESS": OperatorConfig("mask", {"chars_to_mask": 3, "masking_char": "#"})})
+    result = anonymizer.anonymize_frame(df, _cells(analyzer, df))
+    assert result["obs"].tolist() == ["CPF <BR_CPF> e email ###@exemplo.com", "sem dados"]
+    assert df["obs"][0].startswith("CPF 123")
+
+
+def test_pseudonymize_needs_a_vault():
+    with pytest.raises(ValueError):
+        SpanAnonymizer({"DEFAULT": OperatorConfig("pseudonymize")})
+
+
+def test_parquet_export_keeps_one_schema_across_chunks(analyzer):
+    df = pd.DataFrame({
+        "obs": [None] * 3 + ["ana@exemplo.com", "texto"],
+        "cpf": [12345678900, 1, 2, 3, 4],
+    })
+    cells = _cells(analyzer, df) + [(0, "cpf", "12345678900", [RecognizerResult("BR_CPF", 0, 11, 1.0)])]
+    output = SpanAnonymizer().export(df, cells, file_format="parquet", chunk_rows=2)
+    table = pq.read_table(output)
+    assert table.column("obs").to_pylist() == [None, None, None, "<EMAIL_ADDRESS>", "texto"]
+    assert table.column("cpf").to_pylist() == ["<BR_CPF>", "1", "2", "3", "4"]
+
+
+def test_csv_export_writes_the_header_once(analyzer):
+    df = pd.DataFrame({"email": [f"pessoa{i}@exemplo.com" for i in range(5)]})
+    output = SpanAnonymizer().export(df, _cells(analyzer, df), chunk_rows=2)
+    assert output.read().decode("utf-8").splitlines() == ["email"] + ["<EMAIL_ADDRESS>"] * 5
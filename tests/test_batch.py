@@ -0,0 +1,88 @@
+import json
+
+import pandas as pd
+
+from privacy_partner.batch import ERROR, MANIFEST_NAME, OK, ScanManifest, scan_tree
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.findings import JSON
+
+
+def _tree(tmp_path):
+    root = tmp_path / "dados"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.csv").write_text("nome,email\nAna,ana@exemplo.com\n", encoding="utf-8")
+    (root / "b.csv").write_text("produto,vendas\nbatom,10\n", encoding="utf-8")
+    pd.DataFrame({"cpf": ["123.456.789-00"]}).to_parquet(root / "sub" / "c.parquet", index=False)
+    (root / "notas.txt").write_text("ignorado", encoding="utf-8")
+    return root, tmp_path / "relatorios"
+
+
+def _scan(root, output, **kwargs):
+    return scan_tree(str(root), str(output), PATTERN_ENTITIES, workers=1, log=lambda message: None, **kwargs)
+
+
+def _paths(entries):
+    return sorted(entry["path"] for entry in entries)
+
+
+def test_first_run_scans_every_file_and_writes_reports(tmp_path):
+    root, output = _tree(tmp_path)
+    recorded = {entry["path"]: entry for entry in _scan(root, output)}
+    assert sorted(recorded) == ["a.csv", "b.csv", "sub/c.parquet"]
+    assert recorded["a.csv"]["by_type"] == {"EMAIL_ADDRESS": 1} and recorded["b.csv"]["findings"] == 0
+    assert all(entry["status"] == OK and (output / entry["report"]).exists() for entry in recorded.values())
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    root, output = _tree(tmp_path)
+    _scan(root, output)
+    assert _scan(root, output) == []
+
+    (root / "b.csv").write_text("produto,vendas\nbatom,10\ncontato,carlos@exemplo.com\n", encoding="utf-8")
+    [entry] = _scan(root, output)
+    assert (entry["path"], entry["findings"]) == ("b.csv", 1)
+    assert _scan(root, output, force=True) and _scan(root, output) == []
+
+
+def test_config_changes_rescan_everything(tmp_path):
+    root, output = _tree(tmp_path)
+    _scan(root, output)
+    assert _paths(_scan(root, output, report_format=JSON)) == ["a.csv", "b.csv", "sub/c.parquet"]
+
+    terms = tmp_path / "termos.txt"
+    terms.write_text("batom\n", encoding="utf-8")
+    recorded = {entry["path"]: entry for entry in _scan(root, output, report_format=JSON, terms_path=str(terms))}
+    assert sorted(recorded) == ["a.csv", "b.csv", "sub/c.parquet"]
+    assert recorded["b.csv"]["findings"] == 0  # BUSINESS_TERM não está nas entidades pedidas
+
+    terms.write_text("batom\nshampoo\n", encoding="utf-8")  # outra lista de termos, outro fingerprint
+    assert _paths(_scan(root, output, report_format=JSON, terms_path=str(terms))) == ["a.csv", "b.csv", "sub/c.parquet"]
+
+
+def test_interrupted_run_resumes_from_the_manifest(tmp_path):
+    root, output = _tree(tmp_path)
+    _scan(root, output)
+    manifest_path = output / MANIFEST_NAME
+    first_line = manifest_path.read_text(encoding="utf-8").splitlines()[0]
+    # Interrupção: só o primeiro arquivo chegou ao manifesto, e a linha seguinte ficou pela metade
+    manifest_path.write_text(first_line + "\n" + first_line[: len(first_line) // 2], encoding="utf-8")
+
+    assert list(ScanManifest(str(manifest_path)).entries) == [json.loads(first_line)["path"]]
+    resumed = _scan(root, output)
+    assert _paths(resumed) == sorted({"a.csv", "b.csv", "sub/c.parquet"} - {json.loads(first_line)["path"]})
+    assert _scan(root, output) == []
+
+
+def test_failed_files_are_retried(tmp_path):
+    root, output = _tree(tmp_path)
+    (root / "quebrado.parquet").write_bytes(b"PAR1 isto nao e parquet")
+    failed = {entry["path"]: entry for entry in _scan(root, output)}
+    assert failed["quebrado.parquet"]["status"] == ERROR and "error" in failed["quebrado.parquet"]
+    assert _paths(_scan(root, output)) == ["quebrado.parquet"]
+
+
+def test_pool_matches_the_serial_run(tmp_path):
+    root, output = _tree(tmp_path)
+    serial = {entry["path"]: entry["by_type"] for entry in _scan(root, output)}
+    pooled = scan_tree(str(root), str(tmp_path / "pool"), PATTERN_ENTITIES, workers=2, log=lambda message: None)
+    assert {entry["path"]: entry["by_type"] for entry in pooled} == serial
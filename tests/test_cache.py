@@ -0,0 +1,59 @@
+import io
+
+from privacy_partner import cache
+from privacy_partner.cache import LRUCache, TTLCache, content_hash, scan_key
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_the_least_recently_used_and_counts_hits():
+    lru = LRUCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # "b" passa a ser o menos usado
+    lru.put("c", 3)
+    assert lru.get("b") is None and lru.get("c") == 3
+    assert lru.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_ttl_entries_expire(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    ttl = TTLCache(ttl=10)
+    ttl.put("a", 1, size=5)
+    clock.now += 9
+    assert ttl.get("a") == 1 and "a" in ttl
+    clock.now += 2
+    assert "a" not in ttl
+    assert ttl.get("a") is None
+    assert ttl.stats() == {"size": 0, "bytes": 0, "hits": 1, "misses": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+def test_ttl_cache_respects_the_byte_and_entry_budgets():
+    ttl = TTLCache(max_entries=3, max_bytes=100)
+    ttl.put("a", 1, size=40)
+    ttl.put("b", 2, size=40)
+    ttl.put("c", 3, size=40)  # passa de 100 bytes: "a" sai
+    assert "a" not in ttl and ttl.total_bytes == 80
+    ttl.put("grande", 4, size=101)  # maior que o orçamento inteiro: nem entra
+    assert "grande" not in ttl and "b" in ttl
+    ttl.put("d", 5, size=1)
+    ttl.put("e", 6, size=1)  # quatro entradas: a mais antiga ("b") sai
+    assert "b" not in ttl and len(ttl) == 3
+    assert ttl.stats()["evictions"] == 2
+
+
+def test_scan_key_depends_on_content_entities_and_options():
+    fileobj = io.BytesIO(b"nome,cpf\n")
+    fileobj.seek(3)
+    file_hash = content_hash(fileobj)
+    assert fileobj.tell() == 3 and file_hash == content_hash(io.BytesIO(b"nome,cpf\n"))
+    assert scan_key(file_hash, ["B", "A"], "f1", mode="gate") == scan_key(file_hash, ["A", "B"], "f1", mode="gate")
+    assert scan_key(file_hash, ["A"], "f1", mode="gate") != scan_key(file_hash, ["A"], "f2", mode="gate")
+    assert scan_key(file_hash, ["A"], "f1", mode="gate") != scan_key(file_hash, ["A"], "f1", mode="report")
@@ -0,0 +1,43 @@
+import pytest
+
+from privacy_partner.chat import ChatPipeline, FakeModelClient, ModelClient
+from privacy_partner.engines import PATTERN_ENTITIES
+
+
+def test_model_client_is_abstract():
+    with pytest.raises(TypeError):
+        ModelClient()
+
+
+def test_prompt_with_findings_never_reaches_the_model(analyzer):
+    client = FakeModelClient(reply="não deveria aparecer")
+    turn = ChatPipeline(analyzer, client, PATTERN_ENTITIES).start("meu email é ana@exemplo.com, pode ajudar?")
+    assert list(turn.stream()) == []
+    assert [result.entity_type for result in turn.findings] == ["EMAIL_ADDRESS"]
+    assert client.prompts == []
+
+
+def test_clean_prompt_is_streamed(analyzer):
+    client = FakeModelClient(reply="resposta completa", chunk_chars=4)
+    turn = ChatPipeline(analyzer, client, PATTERN_ENTITIES).start("qual produto vendeu mais?")
+    assert "".join(turn.stream()) == "resposta completa"
+    assert client.prompts == ["qual produto vendeu mais?"]
+
+
+def test_cancel_stops_the_turn(analyzer):
+    client = FakeModelClient(reply="x" * 100, chunk_chars=10)
+    turn = ChatPipeline(analyzer, client, PATTERN_ENTITIES).start("resuma o arquivo")
+    stream = turn.stream()
+    assert next(stream) == "x" * 10
+    turn.cancel()
+    assert list(stream) == []
+    assert turn.cancelled
+
+
+def test_new_question_cancels_the_previous_turn(analyzer):
+    pipeline = ChatPipeline(analyzer, FakeModelClient(reply="ok"), PATTERN_ENTITIES)
+    first = pipeline.start("primeira pergunta")
+    second = pipeline.start("segunda pergunta")
+    assert first.cancelled and not second.cancelled
+    assert list(first.stream()) == []
+    assert "".join(second.stream()) == "ok"
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from privacy_partner.context import FileContext, build_prompt, estimate_tokens, normalize
+
+
+def _sales():
+    return pd.DataFrame({
+        "produto": ["Shampoo Elseve", "Condicionador Elseve", "Batom Color Riche", "Máscara Elseve", "Base True Match"],
+        "regiao": ["Sul", "Norte", "Sul", "Sudeste", "Norte"],
+        "vendas": [120, 80, 45, 60, 30],
+    })
+
+
+def test_normalize_ignores_case_and_accents():
+    assert normalize("PREÇO Máscara") == "preco mascara"
+
+
+def test_search_ranks_rows_with_the_question_terms_first():
+    context = FileContext(_sales())
+    assert context.search("vendas do batom")[:1] == [2]
+    assert set(context.search("elseve")) == {0, 1, 3}
+    assert context.search("perfume") == []
+
+
+def test_relevant_columns_come_from_names_and_matching_rows():
+    context = FileContext(_sales())
+    assert context.relevant_columns("quais as vendas?") == ["vendas"]
+    assert context.relevant_columns("elseve no sul", context.search("elseve no sul")) == ["produto", "regiao"]
+
+
+def test_context_respects_the_token_budget():
+    df = pd.DataFrame({"descricao": [f"produto numero {i} da linha elseve" for i in range(5_000)]})
+    context = FileContext(df)
+    text = context.build("elseve", token_budget=300)
+    assert estimate_tokens(text) <= 300 + 20
+    assert "linha " in text and text.count("\nlinha ") < 5_000
+
+
+def test_prompt_without_file_is_the_question():
+    assert build_prompt("olá") == "olá"
+    assert build_prompt("batom?", FileContext(_sales())).endswith("Responda à seguinte pergunta: batom?")
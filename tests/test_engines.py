@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+import spacy
+
+from privacy_partner import engines
+from privacy_partner.engines import ANALYZER_CONFIGS, PATTERN_ENTITIES, build_analyzer
+from privacy_partner.fastpath import analyze_text
+from privacy_partner.scanner import scan_dataframe
+
+
+def test_lazy_analyzer_does_not_load_spacy_for_pattern_entities():
+    analyzer = build_analyzer(lazy=True)
+    assert [r.entity_type for r in analyze_text(analyzer, "CPF 123.456.789-00", PATTERN_ENTITIES)] == ["BR_CPF"]
+    scan_dataframe(analyzer, pd.DataFrame({"email": ["ana@exemplo.com"]}), PATTERN_ENTITIES)
+    assert analyzer.nlp_engine.nlp is None
+
+
+@pytest.mark.parametrize("config", sorted(ANALYZER_CONFIGS))
+def test_configs_load_their_model_without_the_excluded_components(config, monkeypatch):
+    calls = []
+    monkeypatch.setattr(engines.FastStartSpacyNlpEngine, "_download_spacy_model_if_needed", lambda self, name: None)
+    monkeypatch.setattr(engines.FastStartSpacyNlpEngine, "_enable_gpu", lambda self: calls.append("gpu"))
+    monkeypatch.setattr(engines.spacy, "load", lambda name, exclude: calls.append((name, exclude)) or spacy.blank("pt"))
+
+    analyzer = build_analyzer(config, lazy=True)
+    assert calls == []
+    analyzer.nlp_engine.ensure_loaded()
+    analyzer.nlp_engine.ensure_loaded()
+    settings = ANALYZER_CONFIGS[config]
+    assert calls == ["gpu", (settings["model_name"], settings["exclude"])]
+    assert analyzer.nlp_engine.load_seconds is not None
@@ -0,0 +1,37 @@
+from privacy_partner.engines import PATTERN_ENTITIES, build_analyzer
+from privacy_partner.fastpath import analyze_text, get_pattern_scanner
+from privacy_partner.terms import BUSINESS_TERM
+
+
+def test_pattern_entities_use_the_fast_path_and_ner_does_not(analyzer):
+    assert get_pattern_scanner(analyzer, PATTERN_ENTITIES) is not None
+    assert get_pattern_scanner(analyzer, PATTERN_ENTITIES + ["PERSON"]) is None
+
+
+def test_fast_path_finds_the_same_spans_as_the_full_pipeline(ner_analyzer):
+    text = "CPF 123.456.789-00, e-mail ana@exemplo.com, tel (11) 99999-8888"
+    spans = lambda results: sorted((r.entity_type, r.start, r.end) for r in results)
+    full = ner_analyzer.analyze(text=text, language="pt", entities=PATTERN_ENTITIES)
+    assert spans(analyze_text(ner_analyzer, text, PATTERN_ENTITIES)) == spans(full)
+
+
+def test_scanners_are_kept_per_analyzer(analyzer):
+    other = build_analyzer(lazy=True)
+    scanner = get_pattern_scanner(analyzer, PATTERN_ENTITIES)
+    assert get_pattern_scanner(analyzer, PATTERN_ENTITIES) is scanner
+    assert get_pattern_scanner(other, PATTERN_ENTITIES) is not scanner
+
+
+def test_scanner_is_rebuilt_when_the_term_list_reloads(tmp_path):
+    terms = tmp_path / "termos.txt"
+    terms.write_text("projeto aurora\n", encoding="utf-8")
+    analyzer = build_analyzer(lazy=True, terms_path=str(terms))
+    entities = ["BR_CPF", BUSINESS_TERM]
+    scanner = get_pattern_scanner(analyzer, entities)
+    assert scanner is not None
+
+    terms.write_text("projeto aurora\nformula boreal\n", encoding="utf-8")
+    analyzer.registry.get_recognizers(language="pt", entities=[BUSINESS_TERM])[0].reload()
+    rebuilt = get_pattern_scanner(analyzer, entities)
+    assert rebuilt is not scanner
+    assert [r.entity_type for r in rebuilt.analyze("a Fórmula Boreal")] == [BUSINESS_TERM]
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+
+from privacy_partner.findings import CSV, JSON, PARQUET, TXT, FindingsStore
+
+FINDINGS = [
+    {"row": 0, "column": "email", "type": "EMAIL_ADDRESS", "start": 0, "end": 15, "score": 1.0},
+    {"row": 3, "column": "obs", "type": "BR_CPF", "start": 4, "end": 18, "score": 0.9},
+    {"row": 5, "column": "email", "type": "EMAIL_ADDRESS", "start": 2, "end": 20, "score": 0.8},
+]
+
+
+def _store():
+    return FindingsStore().extend(FINDINGS)
+
+
+def test_iteration_gives_back_the_dicts():
+    assert list(_store()) == FINDINGS
+    assert list(FindingsStore().extend(_store())) == FINDINGS
+
+
+def test_counts_and_summary():
+    store = _store()
+    assert store.count_by("type") == {"EMAIL_ADDRESS": 2, "BR_CPF": 1}
+    assert store.count_by("column", row_range=(1, 10)) == {"email": 1, "obs": 1}
+    assert store.summary() == [
+        {"column": "email", "type": "EMAIL_ADDRESS", "count": 2, "first_row": 0, "last_row": 5, "mean_score": 0.9},
+        {"column": "obs", "type": "BR_CPF", "count": 1, "first_row": 3, "last_row": 3, "mean_score": 0.9},
+    ]
+    assert FindingsStore().summary() == [] and FindingsStore().count_by() == {}
+
+
+def test_pages():
+    store = _store()
+    assert store.page_count(page_rows=2) == 2
+    assert store.page(1, page_rows=2)["row"].tolist() == [5]
+
+
+@pytest.mark.parametrize("file_format", [CSV, PARQUET])
+def test_tabular_exports_hold_every_finding_across_chunks(file_format):
+    output = _store().export(file_format, chunk_rows=2)
+    table = pq.read_table(output) if file_format == PARQUET else pa_csv.read_csv(output)
+    assert table.column("row").to_pylist() == [0, 3, 5]
+    assert [str(value) for value in table.column("type").to_pylist()] == ["EMAIL_ADDRESS", "BR_CPF", "EMAIL_ADDRESS"]
+
+
+def test_json_and_text_exports():
+    report = json.load(_store().export(JSON, title="Relatório", chunk_rows=2))
+    assert report["title"] == "Relatório"
+    assert [finding["row"] for finding in report["findings"]] == [0, 3, 5]
+    assert json.load(FindingsStore().export(JSON))["findings"] == []
+
+    text = io.TextIOWrapper(_store().export(TXT, chunk_rows=2), encoding="utf-8").read()
+    assert "- Row 5, Column 'obs': Found data of type BR_CPF.\n" in text
+    assert text.count("- Row ") == 3
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        _store().export("xml")
+
+
+def test_non_string_column_names():
+    store = FindingsStore().extend([{**FINDINGS[0], "column": 2024}, {**FINDINGS[1], "column": 3.5}])
+    assert store.page(0)["column"].astype(str).tolist() == ["2024", "3.5"]
+    assert pa_csv.read_csv(store.export(CSV)).column("column").to_pylist() == [2024, 3.5]
+    assert list(store)[0]["column"] == 2024
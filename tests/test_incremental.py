@@ -0,0 +1,31 @@
+import pandas as pd
+
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.incremental import IncrementalScanner
+
+
+def _types(cells):
+    return [(index, column, [result.entity_type for result in results]) for index, column, _, results in cells]
+
+
+def test_only_changed_cells_are_rescanned(analyzer):
+    scanner = IncrementalScanner(analyzer, PATTERN_ENTITIES)
+    df = pd.DataFrame({"a": ["CPF 123.456.789-00", "nada"], "b": ["ok", "ana@exemplo.com"]})
+    assert _types(scanner.scan(df)) == [(0, "a", ["BR_CPF"]), (1, "b", ["EMAIL_ADDRESS"])]
+    assert scanner.last_scanned_cells == 4
+
+    edited = df.copy()
+    edited.loc[1, "a"] = "carlos@exemplo.com"
+    assert _types(scanner.scan(edited)) == [(0, "a", ["BR_CPF"]), (1, "a", ["EMAIL_ADDRESS"]), (1, "b", ["EMAIL_ADDRESS"])]
+    assert scanner.last_scanned_cells == 1
+
+
+def test_findings_of_removed_or_cleaned_cells_are_dropped(analyzer):
+    scanner = IncrementalScanner(analyzer, PATTERN_ENTITIES)
+    df = pd.DataFrame({"a": ["CPF 123.456.789-00", "ana@exemplo.com"], "b": ["x", "y"]})
+    scanner.scan(df)
+
+    edited = df.drop(index=1)
+    edited.loc[0, "a"] = "CPF removido"
+    assert scanner.scan(edited) == []
+    assert scanner.scan(edited.drop(columns="b")) == []
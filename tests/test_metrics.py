@@ -0,0 +1,68 @@
+import pytest
+
+from privacy_partner.metrics import Metrics, instrument_analyzer, metrics
+
+TEXT = "Ana Silva, CPF 123.456.789-00"
+
+
+@pytest.fixture
+def enabled_metrics(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def _calls(name):
+    return {row["name"]: row for row in metrics.rows() if row["kind"] == "recognizer"}.get(name)
+
+
+def test_instrumented_analyzer_records_each_recognizer(ner_analyzer, enabled_metrics):
+    instrument_analyzer(ner_analyzer)
+    instrument_analyzer(ner_analyzer)  # idempotente: os wrappers não se acumulam
+    ner_analyzer.analyze(text=TEXT, language="pt", entities=["BR_CPF", "PERSON"])
+
+    cpf = _calls("Custom CPF Recognizer")
+    assert (cpf["calls"], cpf["input_chars"], cpf["findings"]) == (1, len(TEXT), 1)
+    assert _calls("spacy")["findings"] == 1
+
+    # Wrappers instalados, métricas desligadas: nada é contado
+    enabled_metrics.enabled = False
+    ner_analyzer.analyze(text=TEXT, language="pt", entities=["BR_CPF"])
+    assert _calls("Custom CPF Recognizer")["calls"] == 1
+
+
+def test_disabled_metrics_leave_the_analyzer_untouched(ner_analyzer, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    recognizer = ner_analyzer.registry.recognizers[0]
+    analyze = recognizer.analyze
+    instrument_analyzer(ner_analyzer)
+    assert recognizer.analyze == analyze
+    assert not getattr(ner_analyzer, "_instrumented", False)
+
+
+def test_disabled_phases_cost_nothing():
+    registry = Metrics(enabled=False)
+    with registry.phase("scan"):
+        pass
+    assert list(registry.timed_iter([1, 2], "read")) == [1, 2]
+    assert registry.rows() == []
+
+
+def test_prometheus_text_format():
+    registry = Metrics(enabled=True)
+    registry.record_recognizer('Meu "reconhecedor"', 0.5, 10, 2)
+    registry.record_phase("scan", 1.25)
+    text = registry.to_prometheus()
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert "# TYPE privacy_partner_recognizer_calls_total counter" in lines
+    assert 'privacy_partner_recognizer_calls_total{recognizer="Meu \\"reconhecedor\\""} 1' in lines
+    assert 'privacy_partner_recognizer_seconds_total{recognizer="Meu \\"reconhecedor\\""} 0.500000' in lines
+    assert 'privacy_partner_phase_seconds_total{phase="scan"} 1.250000' in lines
+    assert "# TYPE privacy_partner_scan_cache_entries gauge" in lines
+    assert any(line.startswith("privacy_partner_analysis_cache_hits_total ") for line in lines)
+    # Toda amostra vem depois do HELP e do TYPE da sua família
+    families = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+    samples = {line.split("{")[0].split()[0] for line in lines if not line.startswith("#")}
+    assert samples <= set(families)
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.parallel import ParallelScanner
+from privacy_partner.scanner import scan_dataframe
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ParallelScanner(workers=2, factory_kwargs={"lazy": True}) as pool:
+        yield pool
+
+
+def _frame(rows):
+    return pd.DataFrame({"texto": [f"cliente {i}, CPF 123.456.{i % 1000:03d}-00" if i % 3 == 0 else f"linha {i}" for i in range(rows)]})
+
+
+def test_parallel_scan_matches_serial_scan(pool, analyzer):
+    df = _frame(1_000)
+    serial = scan_dataframe(analyzer, df, PATTERN_ENTITIES, cache=None)
+    assert pool.scan_dataframe(df, PATTERN_ENTITIES, shard_rows=150) == serial
+
+
+def test_scans_after_an_early_exit_are_complete(pool, analyzer):
+    chunks = pool.imap_chunks(((_frame(2_000), None) for _ in range(10)), PATTERN_ENTITIES)
+    next(chunks)
+    chunks.close()
+    # O slot de cancelamento da varredura interrompida volta para o pool sem afetar as próximas
+    for _ in range(3):
+        df = _frame(500)
+        assert pool.scan_dataframe(df, PATTERN_ENTITIES, shard_rows=100) == scan_dataframe(analyzer, df, PATTERN_ENTITIES, cache=None)
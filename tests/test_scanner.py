@@ -0,0 +1,34 @@
+import pandas as pd
+
+from privacy_partner.cache import LRUCache
+from privacy_partner.engines import PATTERN_ENTITIES, analyzer_fingerprint, build_analyzer
+from privacy_partner.scanner import analyze_distinct, scan_dataframe, scan_dataframe_per_cell
+from privacy_partner.terms import BUSINESS_TERM
+
+
+def test_batched_scan_matches_per_cell_scan(ner_analyzer):
+    df = pd.DataFrame({
+        "cliente": ["CPF 123.456.789-00", "sem dados", "ana@exemplo.com", "CPF 123.456.789-00"],
+        "obs": ["ligar (11) 99999-8888", None, "", "ok"],
+    })
+    key = lambda finding: (finding["row"], finding["column"], finding["start"], finding["type"])
+    batched = scan_dataframe(ner_analyzer, df, PATTERN_ENTITIES, cache=None)
+    assert batched
+    assert sorted(batched, key=key) == sorted(scan_dataframe_per_cell(ner_analyzer, df, PATTERN_ENTITIES), key=key)
+
+
+def test_equivalent_analyzers_share_the_fingerprint(analyzer):
+    assert analyzer_fingerprint(build_analyzer(lazy=True)) == analyzer_fingerprint(analyzer)
+
+
+def test_cached_results_are_not_shared_between_configurations(analyzer, tmp_path):
+    cache = LRUCache()
+    text = "Relatório do Projeto Aurora"
+    entities = ["BR_CPF", BUSINESS_TERM]
+    assert analyze_distinct(analyzer, [text], entities, cache=cache)[text] == []
+
+    terms = tmp_path / "termos.txt"
+    terms.write_text("projeto aurora\n", encoding="utf-8")
+    with_terms = build_analyzer(lazy=True, terms_path=str(terms))
+    results = analyze_distinct(with_terms, [text], entities, cache=cache)[text]
+    assert [result.entity_type for result in results] == [BUSINESS_TERM]
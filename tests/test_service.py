@@ -0,0 +1,79 @@
+import asyncio
+import http.server
+import threading
+import time
+
+import pytest
+
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.service import ScanClient, ScanService, ScanServiceError
+
+
+def _start(analyzer):
+    """Sobe o serviço numa thread (porta livre) e retorna um cliente apontado para ele."""
+    address = []
+    ready = threading.Event()
+    service = ScanService(analyzer)
+
+    def ready_callback(socket_address):
+        address.append(socket_address)
+        ready.set()
+
+    thread = threading.Thread(target=asyncio.run, args=(service.serve("127.0.0.1", 0, ready=ready_callback),), daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    return ScanClient(f"http://127.0.0.1:{address[0][1]}", timeout=10)
+
+
+class _BrokenAnalyzer:
+    @property
+    def registry(self):
+        raise ValueError("falha interna do analisador")
+
+
+def test_analyze_and_anonymize(analyzer):
+    client = _start(analyzer)
+    results = client.analyze("escreva para ana@exemplo.com", PATTERN_ENTITIES)
+    assert [(r.entity_type, r.start, r.end) for r in results] == [("EMAIL_ADDRESS", 13, 28)]
+    text, _ = client.anonymize("CPF 123.456.789-00", PATTERN_ENTITIES)
+    assert text == "CPF <BR_CPF>"
+
+
+def test_invalid_requests_are_400(analyzer):
+    client = _start(analyzer)
+    with pytest.raises(ScanServiceError, match="respondeu 400"):
+        client.analyze(123)
+    with pytest.raises(ScanServiceError, match="respondeu 400"):
+        client._request("POST", "/anonymize", {"text": "x", "operators": {"DEFAULT": {"type": "pseudonymize"}}})
+
+
+def test_analyzer_failures_are_500():
+    client = _start(_BrokenAnalyzer())
+    with pytest.raises(ScanServiceError, match="respondeu 500"):
+        client.analyze("texto", ["EMAIL_ADDRESS"])
+
+
+def test_client_waits_for_retry_after():
+    calls = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(time.monotonic())
+            status, body = (503, b"{}") if len(calls) == 1 else (200, b'{"ok": true}')
+            self.send_response(status)
+            if status == 503:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert ScanClient(f"http://127.0.0.1:{server.server_address[1]}").health() == {"ok": True}
+    finally:
+        server.shutdown()
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.9
@@ -0,0 +1,77 @@
+import os
+import pickle
+import stat
+
+import pandas as pd
+import pytest
+
+from privacy_partner.context import FileContext
+from privacy_partner.storage import ArtifactStore, estimate_size, private_dir
+
+
+class _Explode:
+    def __reduce__(self):
+        return (os.system, ("touch should-not-exist",))
+
+
+def test_values_round_trip_through_disk(tmp_path):
+    store = ArtifactStore(root=str(tmp_path / "store"), memory_bytes=0)  # tudo volta do disco
+    df = pd.DataFrame({"nome": ["a", "b"]}, index=[10, 20])
+    store.put("sheet-1", df)
+    store.put("context-1", {"linhas": [1, 2]})
+    pd.testing.assert_frame_equal(store.get("sheet-1"), df)
+    assert store.get("context-1") == {"linhas": [1, 2]}
+
+
+def test_pickles_from_elsewhere_are_never_loaded(tmp_path, monkeypatch):
+    root = tmp_path / "store"
+    private_dir(str(root))
+    with open(root / "context-x.pkl", "wb") as f:
+        pickle.dump(_Explode(), f)
+    monkeypatch.chdir(tmp_path)
+
+    store = ArtifactStore(root=str(root), memory_bytes=0)
+    assert "context-x" not in store
+    assert store.get("context-x") is None
+    assert not (tmp_path / "should-not-exist").exists()
+    # Um put com a mesma chave sobrescreve o arquivo e passa a valer
+    store.put("context-x", [1])
+    assert store.get("context-x") == [1]
+
+
+def test_memory_only_values_never_touch_the_disk(tmp_path):
+    root = tmp_path / "store"
+    store = ArtifactStore(root=str(root))
+    store.put("sheet-raw", pd.DataFrame({"cpf": ["123.456.789-00"]}), persist=False)
+    assert not root.exists()
+    assert store.get("sheet-raw")["cpf"][0] == "123.456.789-00"
+
+
+def test_directory_is_created_on_the_first_disk_write(tmp_path):
+    root = tmp_path / "store"
+    store = ArtifactStore(root=str(root))
+    assert "context-1" not in store and store.get("context-1") is None
+    assert not root.exists()
+    store.put("context-1", [1, 2])
+    assert stat.S_IMODE(os.stat(root).st_mode) == 0o700
+
+
+def test_memory_budget_uses_the_live_object_size(tmp_path):
+    store = ArtifactStore(root=str(tmp_path / "store"))
+    context = FileContext(pd.DataFrame({"texto": [f"linha {i} com algum texto" for i in range(2_000)]}))
+    store.put("context-big", context)
+    assert store.memory.total_bytes == estimate_size(context)
+    # O índice BM25 vivo ocupa várias vezes o pickle que vai para o disco
+    assert estimate_size(context) > 3 * os.path.getsize(tmp_path / "store" / "context-big.pkl")
+
+
+def test_store_directory_is_private(tmp_path):
+    root = tmp_path / "aberto"
+    root.mkdir(mode=0o755)
+    private_dir(str(root))
+    assert stat.S_IMODE(os.stat(root).st_mode) == 0o700
+
+    link = tmp_path / "link"
+    link.symlink_to(root)
+    with pytest.raises(PermissionError):
+        private_dir(str(link))
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import pandas as pd
+
+from privacy_partner.engines import PATTERN_ENTITIES
+from privacy_partner.ingest import SAMPLE_BYTES, read_table
+from privacy_partner.profiler import PATTERN_ONLY, SKIP, profile_dataframe
+from privacy_partner.streaming import GATE, HEADER_ROW, REPORT, scan_file_stream
+
+
+def _numeric_cpfs():
+    return pd.DataFrame({
+        "id": range(4),
+        "cpf": [12345678900, 98765432100, 11122233344, 55566677788],
+        "ativo": [True, False, True, True],
+        "criado_em": pd.to_datetime(["2024-01-01"] * 4),
+    })
+
+
+def test_numeric_columns_are_scanned_as_text_and_typed_ones_skipped():
+    modes = {column_profile["column"]: column_profile["mode"] for column_profile in profile_dataframe(_numeric_cpfs())}
+    assert modes == {"id": PATTERN_ONLY, "cpf": PATTERN_ONLY, "ativo": SKIP, "criado_em": SKIP}
+
+
+def test_report_finds_cpfs_stored_as_integers(analyzer, tmp_path):
+    for name, write in (("dados.csv", lambda df, path: df.to_csv(path, index=False)),
+                        ("dados.parquet", lambda df, path: df.to_parquet(path, index=False))):
+        path = tmp_path / name
+        write(_numeric_cpfs(), path)
+        scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=REPORT)
+        assert scan["findings"].count_by("type") == {"BR_CPF": 4}, name
+
+
+def test_gate_stops_on_a_cpf_stored_as_integer(analyzer, tmp_path):
+    path = tmp_path / "dados.parquet"
+    _numeric_cpfs().to_parquet(path, index=False)
+    scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=GATE)
+    assert scan["findings"] and not scan["complete"]
+
+
+def test_column_names_are_scanned(analyzer, tmp_path):
+    path = tmp_path / "dados.csv"
+    path.write_text("nome,ana@exemplo.com\nx,1\n", encoding="utf-8")
+    findings = list(scan_file_stream(analyzer, path, PATTERN_ENTITIES)["findings"])
+    assert [(f["row"], f["column"], f["type"]) for f in findings] == [(HEADER_ROW, "ana@exemplo.com", "EMAIL_ADDRESS")]
+
+
+def test_csv_text_after_a_typed_first_block_is_scanned(analyzer, tmp_path):
+    path = tmp_path / "dados.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,ativo,criado_em\n")
+        f.writelines(f"{i},true,2024-01-01\n" for i in range(200_000))
+        f.write("200000,ana@exemplo.com,CPF 123.456.789-00\n")
+    scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=GATE)
+    assert not scan["complete"]
+    assert {(f["row"], f["column"], f["type"]) for f in scan["findings"]} == {
+        (200_000, "ativo", "EMAIL_ADDRESS"), (200_000, "criado_em", "BR_CPF"),
+    }
+
+
+def test_header_only_files_have_their_column_names_scanned(analyzer, tmp_path):
+    path = tmp_path / "vazio.csv"
+    path.write_text("nome,ana@exemplo.com\n", encoding="utf-8")
+    scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=GATE)
+    assert scan["rows"] == 0
+    assert [(f["row"], f["column"], f["type"]) for f in scan["findings"]] == [(HEADER_ROW, "ana@exemplo.com", "EMAIL_ADDRESS")]
+
+
+def test_float_measurements_are_not_cpfs(analyzer, tmp_path):
+    # Como as médias do DLM/FClimate: frações com 11+ dígitos casariam o \d{11} do CPF
+    df = pd.DataFrame({
+        "umid_med": [79.94869123456, 81.20456789012, 77.5],
+        "temp_med": [22.123456789012, 23.0, 21.98765432109],
+        "cpf": [12345678900.0, None, 98765432100.0],
+    })
+    modes = {column_profile["column"]: column_profile["mode"] for column_profile in profile_dataframe(df)}
+    assert modes == {"umid_med": SKIP, "temp_med": SKIP, "cpf": PATTERN_ONLY}
+
+    path = tmp_path / "clima.parquet"
+    df.to_parquet(path, index=False)
+    findings = list(scan_file_stream(analyzer, path, PATTERN_ENTITIES)["findings"])
+    assert [(f["row"], f["column"], f["type"]) for f in findings] == [(0, "cpf", "BR_CPF"), (2, "cpf", "BR_CPF")]
+
+
+def test_latin1_accents_after_the_sample_window(analyzer, tmp_path):
+    path = tmp_path / "latin1.csv"
+    with open(path, "wb") as f:
+        f.write(b"nome,obs\n")
+        f.writelines(f"linha {i},ok\n".encode("ascii") for i in range(20_000))
+        f.write("João da Conceição,CPF 123.456.789-00\n".encode("latin-1"))
+    assert path.stat().st_size > SAMPLE_BYTES
+
+    scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES)
+    assert scan["rows"] == 20_001
+    assert scan["findings"].count_by("type") == {"BR_CPF": 1}
+    assert read_table(path)["nome"].iloc[-1] == "João da Conceição"
+
+
+def test_csv_float_measurements_are_not_cpfs(analyzer, tmp_path):
+    path = tmp_path / "clima.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('"","geocode","temp_med","umid_med","cpf"\n')
+        f.writelines(f'"{i}",3550308,23.7653139214928,79.9486912345{i % 10},\n' for i in range(1_000))
+        f.write('"1000",3550308,,82.769224089148,01234567890\n')
+    findings = list(scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=GATE)["findings"])
+    assert [(f["row"], f["column"], f["type"]) for f in findings] == [(1_000, "cpf", "BR_CPF")]
+
+
+def test_dlm_climate_file_is_clean(analyzer):
+    path = Path(__file__).resolve().parent.parent / "DLM" / "FClimate_SP_3550308.csv"
+    scan = scan_file_stream(analyzer, path, PATTERN_ENTITIES, mode=GATE)
+    assert scan["complete"] and not scan["findings"]
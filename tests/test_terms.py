@@ -0,0 +1,52 @@
+import os
+import time
+
+from privacy_partner.cache import analysis_cache
+from privacy_partner.engines import build_analyzer
+from privacy_partner.scanner import analyze_distinct
+from privacy_partner.terms import BUSINESS_TERM, TermAutomaton, find_terms, normalize_term
+
+
+def _spans(terms, text):
+    return [text[start:end] for start, end in find_terms(TermAutomaton([normalize_term(t) for t in terms]), text)]
+
+
+def test_terms_match_ignoring_case_and_accents():
+    assert _spans(["Projeto Áurora"], "Sobre o PROJETO  aurora e o projeto áurora.") == ["PROJETO  aurora", "projeto áurora"]
+
+
+def test_only_whole_words_and_the_longest_term_match():
+    terms = ["alfa", "alfa beta", "beta"]
+    assert _spans(terms, "alfabeto; alfa beta; beta") == ["alfa beta", "beta"]
+
+
+def test_cached_texts_see_an_updated_term_list(tmp_path):
+    path = tmp_path / "termos.txt"
+    path.write_text("# projetos\nAurora\n", encoding="utf-8")
+    analyzer = build_analyzer(lazy=True, terms_path=str(path))
+    [recognizer] = [r for r in analyzer.registry.recognizers if BUSINESS_TERM in r.supported_entities]
+    recognizer.check_seconds = 0
+    texts = ["projeto aurora", "projeto boreal"]
+
+    def found():
+        return {text: [r.entity_type for r in results] for text, results in analyze_distinct(analyzer, texts, [BUSINESS_TERM]).items()}
+
+    assert found() == {"projeto aurora": [BUSINESS_TERM], "projeto boreal": []}
+
+    path.write_text("Boreal\n", encoding="utf-8")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    deadline = time.monotonic() + 5
+    # A recarga roda numa thread; os dois textos já estão em cache e mesmo assim passam a ver a lista nova
+    while found() != {"projeto aurora": [], "projeto boreal": [BUSINESS_TERM]} and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert found() == {"projeto aurora": [], "projeto boreal": [BUSINESS_TERM]}
+
+
+def test_building_a_term_analyzer_keeps_the_shared_cache(tmp_path):
+    path = tmp_path / "termos.txt"
+    path.write_text("Aurora\n", encoding="utf-8")
+    analysis_cache.put("chave", [])
+    analysis_cache.get("chave")
+    hits = analysis_cache.stats()["hits"]
+    build_analyzer(lazy=True, terms_path=str(path))
+    assert analysis_cache.get("chave") == [] and analysis_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,50 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from privacy_partner.vault import PseudonymVault, load_or_create_key
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    monkeypatch.delenv("PRIVACY_PARTNER_VAULT_KEY", raising=False)
+    with PseudonymVault(str(tmp_path / "vault.sqlite3")) as vault:
+        yield vault
+
+
+def test_tokens_are_deterministic_and_reversible(vault):
+    tokens = vault.tokenize_many(["Ana", "Bia", "Ana"], "PERSON")
+    assert tokens[0] == tokens[2] != tokens[1]
+    assert vault.detokenize_many(tokens + ["PERSON_desconhecido"]) == ["Ana", "Bia", "Ana", None]
+    assert len(vault) == 2
+
+
+def test_stored_token_survives_a_key_change(tmp_path, monkeypatch):
+    monkeypatch.delenv("PRIVACY_PARTNER_VAULT_KEY", raising=False)
+    path = str(tmp_path / "vault.sqlite3")
+    with PseudonymVault(path, key=b"chave antiga") as old:
+        token = old.tokenize("123.456.789-00", "BR_CPF")
+    with PseudonymVault(path, key=b"chave nova") as new:
+        assert new.tokenize("123.456.789-00", "BR_CPF") == token
+        assert new.detokenize(token) == "123.456.789-00"
+
+
+def test_series_and_text_round_trip(vault):
+    series = pd.Series(["ana@exemplo.com", None, "bia@exemplo.com"])
+    tokens = vault.tokenize_series(series, "EMAIL_ADDRESS")
+    assert tokens.isna().tolist() == [False, True, False]
+    assert vault.detokenize_series(tokens).tolist()[::2] == series.tolist()[::2]
+    assert vault.detokenize_text(f"Escreva para {tokens[0]}.") == "Escreva para ana@exemplo.com."
+
+
+def test_concurrent_key_creation_agrees_on_one_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("PRIVACY_PARTNER_VAULT_KEY", raising=False)
+    path = str(tmp_path / "vault.key")
+    keys = []
+    threads = [threading.Thread(target=lambda: keys.append(load_or_create_key(path))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(keys)) == 1 and len(keys[0]) == 32
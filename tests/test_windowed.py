@@ -0,0 +1,31 @@
+import pytest
+
+from privacy_partner.windowed import analyze_long_text, split_windows
+
+
+def test_windows_cover_the_text_with_overlap():
+    text = " ".join(f"frase {i}." for i in range(2_000))
+    windows = split_windows(text, window_chars=400, overlap_chars=50)
+    assert windows[0][0] == 0 and windows[-1][1] == len(text)
+    for (start, end), (next_start, _) in zip(windows, windows[1:]):
+        assert end - start <= 400
+        assert start < next_start < end
+
+
+def test_overlap_must_be_small():
+    with pytest.raises(ValueError):
+        split_windows("texto", window_chars=100, overlap_chars=30)
+
+
+def test_long_text_matches_a_single_pass(ner_analyzer):
+    filler = "Texto de preenchimento sem dados pessoais. "
+    text = (filler * 7 + "Ana Silva mandou email para carlos@exemplo.com. ") * 40
+    entities = ["PERSON", "EMAIL_ADDRESS"]
+
+    windowed = analyze_long_text(ner_analyzer, text, entities, window_chars=1_000, overlap_chars=200)
+    reference = ner_analyzer.analyze(text=text, entities=entities, language="pt")
+
+    spans = lambda results: sorted((r.start, r.end, r.entity_type) for r in results)
+    assert spans(windowed) == spans(reference)
+    assert all(text[r.start:r.end] in ("Ana Silva", "carlos@exemplo.com") for r in windowed)
+    assert sum(r.entity_type == "PERSON" for r in windowed) == 40